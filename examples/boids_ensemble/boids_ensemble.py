@@ -441,6 +441,24 @@ model.newLayer().addAgentFunction("Boid", "outputdata");
 # Layer #2
 model.newLayer().addAgentFunction("Boid", "inputdata");
 
+"""
+  RTC Cache Warmup
+  With --rtc-warmup [report.csv], pre-compile every RTC agent function into the FLAME GPU 2 JIT cache,
+  report the cache status of each function and exit without simulating
+"""
+if "--rtc-warmup" in sys.argv:
+    warmup = exp.RTCCacheWarmup();
+    warmup.verbose = True;
+    report = warmup.warmup(model, exp.findRTCSources(globals()), "Ensemble_Boids_BruteForce");
+    print(warmup.formatReport(report));
+    report_index = sys.argv.index("--rtc-warmup")+1;
+    if report_index<len(sys.argv) and not sys.argv[report_index].startswith("-"):
+        report_file = open(sys.argv[report_index],"w");
+        report_file.write(warmup.formatReport(report)+"\n");
+        report_file.close();
+    sys.exit(0);
+
+
 """
   Create Run Plan Vector
 """   
@@ -526,7 +544,9 @@ if (not TESTING):
 
     # Create and configure logging details 
     logging_config = pyflamegpu.LoggingConfig(model);
-    agent_log = logging_config.agent("Boid");
+    # Configure logging through an extractor, which records what is logged so step logs can be read into arrays in a single pass
+    log_extractor = exp.LogExtractor(logging_config);
+    agent_log = log_extractor.agent("Boid");
     agent_log.logMeanFloat("x");
     agent_log.logMeanFloat("y");
     agent_log.logMeanFloat("z");
@@ -601,37 +621,19 @@ if (not TESTING):
         velocities_mean = [None]*ENSEMBLE_RUNS
         velocities_std = [None]*ENSEMBLE_RUNS
         text_pos = [None]*ENSEMBLE_RUNS
-        # Read logs
+        # Read logs of every run in a single pass, as arrays shaped (runs, steps)
+        log_data = log_extractor.extract(logs);
         for i in range(len(logs)):
-            sl = logs[i].getStepLog();
-            positions_mean[i] = [[],[],[]];
-            velocities_mean[i] = [[],[],[]];
-            velocities_std[i] = [[],[],[]];
+            # The first logged step holds the initial state and is skipped
+            steps = log_data["steps"][i];
+            positions_mean[i] = [log_data["Boid_mean_"+v][i,1:steps].tolist() for v in ["x","y","z"]];
+            velocities_mean[i] = [log_data["Boid_mean_"+v][i,1:steps].tolist() for v in ["fx","fy","fz"]];
+            velocities_std[i] = [log_data["Boid_standard_dev_"+v][i,1:steps].tolist() for v in ["fx","fy","fz"]];
+            #Set start and finish positions for graph text placement
             text_pos[i] = [[0,0,0,"start"],[0,0,0,"finish"]];
-            counter = 0;
-            for step in sl:
-                if counter>0:
-                    agents = step.getAgent("Boid");
-                    # Collect agent data
-                    positions_mean[i][0].append(agents.getMean("x"));
-                    positions_mean[i][1].append(agents.getMean("y"));
-                    positions_mean[i][2].append(agents.getMean("z"));
-                    velocities_mean[i][0].append(agents.getMean("fx"));
-                    velocities_mean[i][1].append(agents.getMean("fy"));
-                    velocities_mean[i][2].append(agents.getMean("fz"));
-                    velocities_std[i][0].append(agents.getStandardDev("fx"));
-                    velocities_std[i][1].append(agents.getStandardDev("fy"));
-                    velocities_std[i][2].append(agents.getStandardDev("fz"));
-                    #Set start and finish positions for graph text placement
-                    if counter==1:
-                        text_pos[i][0][0] = agents.getMean("x");
-                        text_pos[i][0][1] = agents.getMean("y");
-                        text_pos[i][0][2] = agents.getMean("z");
-                    elif counter==len(sl)-1:
-                        text_pos[i][1][0] = agents.getMean("x");
-                        text_pos[i][1][1] = agents.getMean("y");
-                        text_pos[i][1][2] = agents.getMean("z");
-                counter+=1;
+            if steps>1:
+                text_pos[i][0][:3] = [positions_mean[i][0][0], positions_mean[i][1][0], positions_mean[i][2][0]];
+                text_pos[i][1][:3] = [positions_mean[i][0][-1], positions_mean[i][1][-1], positions_mean[i][2][-1]];
 
         # Generate graphs 
         for j in range(ENSEMBLE_RUNS):
@@ -0,0 +1,86 @@
+from pyflamegpu import *
+import sys, random, time
+import numpy as np
+import ppg_ga_experiment as ppg
+
+"""
+  Benchmark creating the initial Prey population one agent at a time within an init function, against drawing every variable
+  in one shot with NumPy and injecting the population in bulk with setPopulationData.
+  Usage: python benchmark_population_init.py [population sizes...]
+"""
+POPULATION_SIZES = [5000, 50000, 500000];
+REPEATS = 3;
+
+# Reference per agent population creation, one newAgent call and one random draw per variable per agent
+class perAgentPreyPopulation(pyflamegpu.HostFunctionCallback):
+  def run(self,FLAMEGPU):
+    populationSize = FLAMEGPU.environment.getPropertyUInt("PREY_POPULATION_TO_GENERATE");
+    min_pos = FLAMEGPU.environment.getPropertyFloat("MIN_POSITION");
+    max_pos = FLAMEGPU.environment.getPropertyFloat("MAX_POSITION");
+    min_speed = FLAMEGPU.environment.getPropertyFloat("MIN_SPEED");
+    max_speed = FLAMEGPU.environment.getPropertyFloat("MAX_SPEED");
+    current_id = FLAMEGPU.environment.getPropertyUInt("CURRENT_ID");
+    for i in range(populationSize):
+      instance = FLAMEGPU.agent("Prey").newAgent();
+      instance.setVariableInt("id", current_id+i);
+      instance.setVariableFloat("x", random.uniform(min_pos, max_pos));
+      instance.setVariableFloat("y", random.uniform(min_pos, max_pos));
+      instance.setVariableFloat("type", 2.0);
+      instance.setVariableFloat("fx", random.uniform(min_speed, max_speed));
+      instance.setVariableFloat("fy", random.uniform(min_speed, max_speed));
+      instance.setVariableFloat("steer_x", 0.0);
+      instance.setVariableFloat("steer_y", 0.0);
+      instance.setVariableInt("life", random.randint(200,5000));
+    return
+
+"""
+  Create a single step simulation of the model with only a Prey population of the given size
+"""
+def create_simulation(population_size, per_agent):
+  model, logging_config = ppg.create_model(1, False, False);
+  env = model.Environment();
+  env.setPropertyUInt("PREY_POPULATION_TO_GENERATE", population_size);
+  env.setPropertyUInt("PREDATOR_POPULATION_TO_GENERATE", 0);
+  env.setPropertyUInt("GRASS_POPULATION_TO_GENERATE", 0);
+  callback = None;
+  if per_agent:
+    callback = perAgentPreyPopulation();
+    model.addInitFunctionCallback(callback);
+  simulation = pyflamegpu.CUDASimulation(model);
+  simulation.SimulationConfig().steps = 1;
+  return model, simulation, callback;
+
+"""
+  Time drawing the variable values of a population, per agent with the random module and in one shot with NumPy. Runs without a GPU
+"""
+def time_draws(population_size):
+  start = time.perf_counter();
+  for i in range(population_size):
+    values = [random.uniform(-1.0, 1.0), random.uniform(-1.0, 1.0), random.uniform(-1.0, 1.0), random.uniform(-1.0, 1.0), random.randint(200,5000)];
+  per_agent = time.perf_counter()-start;
+  start = time.perf_counter();
+  columns = ppg.generate_population_columns("Prey", population_size, 0, -1.0, 1.0, -1.0, 1.0);
+  bulk = time.perf_counter()-start;
+  return per_agent, bulk;
+
+"""
+  Time creating the population and simulating the first step, which is when init functions are run
+"""
+def time_population_init(population_size, per_agent):
+  model, simulation, callback = create_simulation(population_size, per_agent);
+  start = time.perf_counter();
+  if not per_agent:
+    ppg.set_initial_populations(simulation, model);
+  simulation.step();
+  elapsed = time.perf_counter()-start;
+  assert simulation.getPopulationData(model.getAgent("Prey")).size()>0 or population_size==0
+  return elapsed;
+
+if __name__ == "__main__":
+  sizes = [int(a) for a in sys.argv[1:]] if len(sys.argv)>1 else POPULATION_SIZES;
+  print("agents,draw_per_agent,draw_numpy,init_per_agent,init_bulk,speedup");
+  for population_size in sizes:
+    draws = [time_draws(population_size) for r in range(REPEATS)];
+    per_agent = min(time_population_init(population_size, True) for r in range(REPEATS));
+    bulk = min(time_population_init(population_size, False) for r in range(REPEATS));
+    print(population_size, min(d[0] for d in draws), min(d[1] for d in draws), per_agent, bulk, per_agent/bulk, sep=",");
@@ -8,6 +8,15 @@ import queue
 import datetime
 import numpy as np
 import copy
+import collections
+import multiprocessing
+import re
+import json
+import hashlib
+import tempfile
+import time
+import pickle
+import math
 from deap import base
 from deap import creator
 from deap import tools
@@ -28,6 +37,15 @@ class Experiment(object):
 	log = None;
 	sim_log = None;
 	simulation = None;
+	ensemble = None;
+	run_plan_vector = None;
+	property_types = {};
+	session = False;
+	session_key = None;
+	environment_override = None;
+	steps_property = None;
+	initial_states = None;
+	fitness_function = None;
 	verbose = False;
 
 	def __init__(self, *args, **kwargs):
@@ -72,6 +90,12 @@ class Experiment(object):
 		:param steps: Simulation steps"""
 		self.steps = steps;
 
+	def setStepsProperty(self, property_name):
+		r"""Allows user to set an environment property to the number of simulation steps of every run, so host functions and fitness functions which extrapolate to the end of a run use the steps actually simulated, e.g. when a search shortens the experiment for a partial fitness
+		:type property_name: string
+		:param property_name: Name of the environment property"""
+		self.steps_property = property_name;
+
 	def setModel(self, model):
 		r"""Allows user to specifically set the FLAME-GPU2 model to be used in the experiment
 		:type model: py:class:`pyflamegpu.ModelDescription`
@@ -100,25 +124,212 @@ class Experiment(object):
 		:param model: Initial population and global value generator"""
 		self.generator = generator;
 
+	def setEnsemble(self, ensemble, run_plan_vector=None):
+		r"""Allows user to provide the ensemble used by batched experiments in place of a new pyflamegpu.CUDAEnsemble, e.g. a stub ensemble for CPU-only testing
+		:type ensemble: py:class:`pyflamegpu.CUDAEnsemble`
+		:param ensemble: Object providing simulate(run_plan_vector) and getLogs()
+		:type run_plan_vector: function
+		:param run_plan_vector: Function called as run_plan_vector(model, runs) to create the run plan vector. Defaults to pyflamegpu.RunPlanVec"""
+		self.ensemble = ensemble;
+		self.run_plan_vector = run_plan_vector;
+
+	def setSession(self, session=True):
+		r"""Allows user to keep the simulation or ensemble, its logging configuration and compiled agent functions alive between calls to begin() and beginBatch(). Only the population, environment properties and step count are reset between evaluations. Single simulations with global values can only be reused with an environment override, see setEnvironmentOverride
+		:type session: boolean
+		:param session: Reuse the simulation between evaluations. Defaults to True"""
+		self.session = session;
+		if not session:
+			self.endSession();
+
+	def endSession(self):
+		r"""Releases the simulation kept alive by session mode"""
+		self.simulation = None;
+		self.session_key = None;
+
+	def setEnvironmentOverride(self, override):
+		r"""Allows user to apply the global values of single simulation runs through an init function callback rather than through the model description, so a session can reuse one simulation whatever the global values of each run.
+		The override must be added to the model as its first init function callback, so the global values are applied before any init function reads them
+		:type override: py:class:`EnvironmentOverride`
+		:param override: Init function callback added to the model of the experiment"""
+		self.environment_override = override;
+		if not override==None:
+			override.set_property = self.__setPlanProperty;
+
+	def __resumeSession(self, key):
+		r"""Returns True if the current simulation was created by a previous call of the same kind within the session and can be reused, otherwise records the new session key
+		:type key: tuple
+		:param key: Identifies the kind of simulation required"""
+		if self.session and not self.simulation==None and self.session_key==key:
+			return True
+		self.session_key = key if self.session else None;
+		return False
+
+	def setFitnessFunction(self, function):
+		r"""Compute the fitness components of each run from its logs once simulated, rather than reading the 'fitnesses' environment property from the exit log
+		:type function: function
+		:param function: Function called with the logs of every run, returning the fitness components of each run in the same order"""
+		self.fitness_function = function;
+		return
+
+	def fitnessComponents(self, logs=None):
+		r"""Fitness components of each run of the last simulation
+		:type logs: py:class:`pyflamegpu.RunLogVec`
+		:param logs: Logs of an ensemble, or the log of a single simulation. Defaults to the logs of the last simulation
+		:rtype: list
+		:return: Fitness components of each run"""
+		logs = self.sim_log if logs==None else logs;
+		if hasattr(logs, "getExitLog"):
+			logs = [logs];
+		if not self.fitness_function==None:
+			return [tuple(components) for components in self.fitness_function(logs)]
+		return [tuple(log.getExitLog().getEnvironmentPropertyArrayFloat("fitnesses")) for log in logs]
+
+	def setPropertyType(self, property_name, property_type):
+		r"""Allows user to specify the environment property type used when applying a parameter value to a run plan. Integer values default to 'UInt' and float values to 'Float'
+		:type property_name: string
+		:param property_name: Name of the environment property
+		:type property_type: string
+		:param property_type: Property type suffix of the RunPlan setter, e.g. 'Int', 'UInt', 'Float'"""
+		self.property_types = dict(self.property_types);
+		self.property_types[property_name] = property_type;
+
+	def __propertyType(self, property_name, value):
+		r"""Whether a value is an array, and the property type suffix of its environment property, inferred from the value if not specified by setPropertyType"""
+		array = type(value)==type(list()) or type(value)==type(np.ndarray(0));
+		element = value[0] if array and len(value)>0 else value;
+		if property_name in self.property_types:
+			return array, self.property_types[property_name]
+		return array, 'UInt' if isinstance(element, (int, np.integer)) else 'Float'
+
+	def __setPlanProperty(self, plan, property_name, value):
+		r"""Sets an environment property of a run plan, environment description or host environment, inferring the property type from the value if not specified by setPropertyType. Lists set array properties and strings are ignored"""
+		if type(value)==type(''):
+			return
+		array, property_type = self.__propertyType(property_name, value);
+		if array:
+			getattr(plan, "setPropertyArray"+property_type)(property_name, list(value));
+		else:
+			getattr(plan, "setProperty"+property_type)(property_name, value);
+
+	def __createSimulation(self, global_values):
+		r"""Creates a simulation of the model with the provided global values. The simulation copies the environment of the model when created, so the values are only applied to the model environment while the simulation is created, leaving the model description unchanged
+		:type global_values: dict
+		:param global_values: Environment property names and values of the run"""
+		environment = self.model.Environment() if len(global_values)>0 else None;
+		defaults = dict((name, self.__getPlanProperty(environment, name, value)) for name, value in global_values.items() if not type(value)==type(''));
+		try:
+			for item in global_values.items():
+				self.__setPlanProperty(environment, item[0], item[1]);
+			return pyflamegpu.CUDASimulation(self.model)
+		finally:
+			for item in defaults.items():
+				self.__setPlanProperty(environment, item[0], item[1]);
+
+	def __getPlanProperty(self, environment, property_name, value):
+		r"""Gets an environment property of an environment description, with the property type of the provided value"""
+		array, property_type = self.__propertyType(property_name, value);
+		if array:
+			return list(getattr(environment, "getPropertyArray"+property_type)(property_name))
+		return getattr(environment, "getProperty"+property_type)(property_name)
+
+	def __setPopulations(self, populations):
+		r"""Replaces the agent populations of the single simulation with materialised initial state populations
+		:type populations: list
+		:param populations: Tuples of agent name, agent state and population structured array, see InitialStateGenerator.materialise"""
+		for agent_name, agent_state, population in populations:
+			agents = createAgentVector(self.model.getAgent(agent_name), population);
+			self.simulation.setPopulationData(agents, agent_state);
+
+	def beginBatch(self, parameter_sets):
+		r"""Simulate every provided set of parameter values as one run plan of a single ensemble launch. Logs of each run are stored in sim_log in the same order as the parameter sets
+		:type parameter_sets: list
+		:param parameter_sets: A dictionary of environment property names and values per run, keys named 'chromosome_id' are ignored"""
+		runs = len(parameter_sets);
+		if (self.verbose):
+			print("Preparing batched experiment run plan vector with", runs, "runs");
+		resumed = self.__resumeSession(("batch", id(self.model)));
+		if not resumed:
+			if self.ensemble==None:
+				self.simulation = pyflamegpu.CUDAEnsemble(self.model);
+			else:
+				self.simulation = self.ensemble;
+		run_plan_vector = pyflamegpu.RunPlanVec if self.run_plan_vector==None else self.run_plan_vector;
+		run_plans = run_plan_vector(self.model, runs);
+		run_plans.setSteps(self.steps);
+		simulation_seed = random.randint(0,sys.maxsize);
+		seed_step = random.randint(1,sys.maxsize//runs);
+		run_plans.setRandomSimulationSeed(simulation_seed,seed_step);
+		#Run plans hold the values of every run, so an environment override must not replace them with those of the last single run
+		if not self.environment_override==None:
+			self.environment_override.values = {};
+		for i in range(runs):
+			plan = run_plans[i];
+			for item in parameter_sets[i].items():
+				if not item[0]=='chromosome_id':
+					self.__setPlanProperty(plan, item[0], item[1]);
+			if not self.steps_property==None:
+				self.__setPlanProperty(plan, self.steps_property, self.steps);
+		if not self.log==None and not resumed:
+			step_log = pyflamegpu.StepLoggingConfig(self.log);
+			step_log.setFrequency(1);
+			self.simulation.setStepLog(step_log)
+			self.simulation.setExitLog(self.log)
+		self.simulation.simulate(run_plans);
+		self.sim_log = self.simulation.getLogs();
+		if (self.verbose):
+			print("Completed batched experiment:", self.name);
+
 	def begin(self):
 		r"""Begin the experiment with current experiment values"""
 		if (self.verbose):
 			print("Beginning experiment");
+		#Materialise the initial state described by the generator, once per run
+		self.initial_states = [self.generator.materialise(run, self.runs==1) for run in range(self.runs)] if not self.generator==None else [];
 		if (self.runs>1):
+			#The steps of each launch are set by its run plans, so changing them keeps the ensemble
+			resumed = self.__resumeSession(("begin", id(self.model), self.runs));
 			if (self.verbose):
 				print("Preparing experiment ensemble run plan vector");
-			self.simulation = pyflamegpu.CUDAEnsemble(self.model);
+			if not resumed:
+				self.simulation = pyflamegpu.CUDAEnsemble(self.model);
+			if not self.environment_override==None:
+				self.environment_override.values = {};
 			run_plan_vector = pyflamegpu.RunPlanVec(self.model, self.runs);
 			run_plan_vector.setSteps(self.steps);
 			simulation_seed = random.randint(0,sys.maxsize);
-			seed_step = random.randint(1,sys.maxsize/self.runs);
+			seed_step = random.randint(1,sys.maxsize//self.runs);
 			run_plan_vector.setRandomSimulationSeed(simulation_seed,seed_step);
+			#Ensemble runs can only be given their own global values, agent populations are created by the model's init functions
+			for i in range(len(self.initial_states)):
+				for item in self.initial_states[i][0].items():
+					self.__setPlanProperty(run_plan_vector[i], item[0], item[1]);
+			if not self.steps_property==None:
+				for i in range(self.runs):
+					self.__setPlanProperty(run_plan_vector[i], self.steps_property, self.steps);
 		else:
 			if (self.verbose):
 				print("Performing single simulation experiment, with steps", self.steps);
-			self.simulation = pyflamegpu.CUDASimulation(self.model);
+			global_values = self.initial_states[0][0] if len(self.initial_states)>0 else {};
+			#A simulation takes its environment from the model when created, so without an environment override it can only be reused for runs without global values,
+			#and for the steps its steps property was created with
+			steps_key = (self.steps,) if self.environment_override==None and not self.steps_property==None else ();
+			resumed = self.__resumeSession(("begin", id(self.model), self.runs)+steps_key) and (len(global_values)==0 or not self.environment_override==None);
+			if not self.steps_property==None:
+				global_values = dict(global_values);
+				global_values[self.steps_property] = self.steps;
+			if resumed:
+				#Restore the initial population, environment properties and step counter, keeping the compiled agent functions
+				self.simulation.reset();
+			elif self.environment_override==None:
+				self.simulation = self.__createSimulation(global_values);
+			else:
+				self.simulation = pyflamegpu.CUDASimulation(self.model);
+			if not self.environment_override==None:
+				self.environment_override.values = dict(global_values);
 			self.simulation.SimulationConfig().steps = self.steps
-		if not self.log==None:
+			if len(self.initial_states)>0:
+				self.__setPopulations(self.initial_states[0][1]);
+		if not self.log==None and not resumed:
 			step_log = pyflamegpu.StepLoggingConfig(self.log);
 			step_log.setFrequency(1);
 			self.simulation.setStepLog(step_log)
@@ -150,6 +361,18 @@ class Experiment(object):
 		if (self.verbose):
 			print("Completed experiment:", self.name);
 
+class EnvironmentOverride(pyflamegpu.HostFunctionCallback):
+	r"""Init function callback applying the global values of each run of an Experiment to the simulation environment, see Experiment.setEnvironmentOverride. Applies nothing until used by an experiment"""
+
+	def __init__(self):
+		super(EnvironmentOverride, self).__init__();
+		self.values = {};
+		self.set_property = None;
+
+	def run(self, FLAMEGPU):
+		for item in self.values.items():
+			self.set_property(FLAMEGPU.environment, item[0], item[1]);
+
 class InitialStateGenerator(object):
 	r"""This class allows users to define the construction of a valid inital state for a FLAME-GPU2 model including global variables and agent populations
 	TODO: User defined logging, multiple initial state files for experiment, Exceptions of invalid tuple/list input for variables during random generation"""
@@ -160,6 +383,10 @@ class InitialStateGenerator(object):
 	agent_list = [];
 
 	def __init__(self, *args, **kwargs):
+		#Each generator describes its own globals and populations
+		self.global_list = {};
+		self.global_ranges = {};
+		self.agent_list = [];
 		if len(kwargs)==0:
 			if len(args)>=1:
 				self.file = args[0] if type(args[0])==type('') else None;
@@ -175,8 +402,10 @@ class InitialStateGenerator(object):
 	def __setVariable(self, global_name, global_range, distribution=random.uniform):
 		if type(global_range)==type(tuple()):
 			self.global_list[global_name] = distribution(global_range[0], global_range[1]);
+			self.global_ranges[global_name] = (global_range, distribution);
 		else:
 			self.global_list[global_name] = global_range;
+			self.global_ranges.pop(global_name, None);
 			
 		
 	def setGlobalFloat(self, global_name, global_range, distribution=random.uniform):
@@ -279,6 +508,21 @@ class InitialStateGenerator(object):
 		:type agent: py:class:`AgentPopulation`
 		:param agent: Description of how to generate a valid population of a specific agent"""
 		self.agent_list.append(agent);
+
+	def materialise(self, run=0, populations=True):
+		r"""Resolves the described initial state. Globals described by a range are drawn again, and every agent population is materialised as a NumPy structured array
+		:type run: uint
+		:param run: Index of the run the initial state is for, selecting population sizes from population size lists
+		:type populations: boolean
+		:param populations: Materialise the agent populations as well as the globals. Defaults to True
+		:rtype: tuple
+		:return: Dictionary of global values, and list of (agent name, agent state, structured array) per agent population"""
+		global_values = dict(self.global_list);
+		for item in self.global_ranges.items():
+			global_range, distribution = item[1];
+			global_values[item[0]] = distribution(global_range[0], global_range[1]);
+		agent_populations = [(agent.name, agent.agent_state, agent.materialise(run)) for agent in self.agent_list] if populations else [];
+		return global_values, agent_populations
 	
 class AgentPopulation(object):
 	r"""This class provides an interface to a reproducible parameter search experiment for a FLAME-GPU2 model"""
@@ -292,6 +536,11 @@ class AgentPopulation(object):
 	variable_list = {};
 
 	def __init__(self, *args, **kwargs):
+		#Each population describes its own variables
+		self.pop_list = [];
+		self.variable_list = {};
+		self.variable_ranges = {};
+		self.per_agent_list = {};
 		if len(kwargs.items())==0:
 			args_items = len(args);
 			if args_items>=1:
@@ -370,8 +619,11 @@ class AgentPopulation(object):
 		# 	self.variable_list.append(variable);
 		if type(variable_range)==type(tuple()):# and variable_update:
 			self.variable_list[variable_name] = distribution(variable_range[0], variable_range[1]);
+			self.variable_ranges[variable_name] = (variable_range, distribution);
 		else:
 			self.variable_list[variable_name] = variable_range;
+			self.variable_ranges.pop(variable_name, None);
+		self.per_agent_list.pop(variable_name, None);
 
 	def setVariable(self, variable_name, variable_range):
 		if type(variable_range)==type(float()):
@@ -471,7 +723,9 @@ class AgentPopulation(object):
 		:type distribution: py:class:`random.uniform`
 		:param distribution: User may specify a function via which to generate the value. Defaults to python's random.uniform
 		"""
-		self.__setVariable(variable_name, variable_range);
+		self.variable_list.pop(variable_name, None);
+		self.variable_ranges.pop(variable_name, None);
+		self.per_agent_list[variable_name] = (variable_range, random.uniform if distribution=='random.uniform' else distribution);
 		# variable = (variable_name, variable_range, distribution, False);
 		# variable_names = [var[0] for var in self.variable_list];
 		# if variable_name in variable_names:
@@ -480,6 +734,537 @@ class AgentPopulation(object):
 		# else:
 		# 	self.variable_list.append(variable);
 
+	def popSize(self, run=0):
+		r"""Resolves the number of agents to generate for the population
+		:type run: uint
+		:param run: Index of the run, selecting the population size from the population size list if one was provided. Otherwise the size is drawn between the minimum and maximum population sizes
+		"""
+		if len(self.pop_list)>0:
+			return int(self.pop_list[run%len(self.pop_list)])
+		return int(random.randint(self.pop_min, self.pop_max))
+
+	def materialise(self, run=0):
+		r"""Materialise the described population as a NumPy structured array with one field per agent variable and one element per agent. Per agent variables are drawn for the whole population at once, and variables described by a range are drawn once for the population
+		:type run: uint
+		:param run: Index of the run, see popSize
+		:rtype: py:class:`numpy.ndarray`
+		:return: Structured array of the agent population
+		"""
+		pop_size = self.popSize(run);
+		columns = {};
+		for item in self.variable_list.items():
+			value = item[1];
+			if item[0] in self.variable_ranges:
+				variable_range, distribution = self.variable_ranges[item[0]];
+				value = distribution(variable_range[0], variable_range[1]);
+			if type(value)==type(''):
+				continue
+			columns[item[0]] = np.full((pop_size,)+np.shape(value), value, dtype=variable_dtype(value));
+		for item in self.per_agent_list.items():
+			variable_range, distribution = item[1];
+			columns[item[0]] = draw_values(distribution, variable_range, pop_size);
+		population = np.zeros(pop_size, dtype=[(name, columns[name].dtype, columns[name].shape[1:]) for name in columns]);
+		for name in columns:
+			population[name] = columns[name];
+		return population
+
+def variable_dtype(value):
+	r"""NumPy type used to store a constant agent variable value, matching FLAME-GPU2's default int and float types"""
+	element = value[0] if type(value)==type(list()) and len(value)>0 else value;
+	return np.int32 if isinstance(element, (int, np.integer)) else np.float32
+
+def draw_values(distribution, value_range, size):
+	r"""Draws a value per agent in a single vectorised call. The python random module's uniform and randint (inclusive of the maximum) are drawn with their NumPy equivalents, NumPy distributions are called with a size, and any other distribution function is called once per agent
+	:type distribution: function
+	:param distribution: Function called as distribution(minimum, maximum) to generate a value
+	:type value_range: tuple
+	:param value_range: Minimum and maximum values
+	:type size: uint
+	:param size: Number of values to draw
+	"""
+	if distribution==random.uniform:
+		return np.random.uniform(value_range[0], value_range[1], size).astype(np.float32)
+	if distribution==random.randint:
+		return np.random.randint(value_range[0], value_range[1]+1, size).astype(np.int32)
+	if getattr(distribution, "__module__", None)=="numpy.random" or isinstance(getattr(distribution, "__self__", None), np.random.RandomState):
+		values = np.asarray(distribution(value_range[0], value_range[1], size));
+	else:
+		values = np.array([distribution(value_range[0], value_range[1]) for i in range(size)]);
+	return values.astype(np.int32 if np.issubdtype(values.dtype, np.integer) else np.float32)
+
+def createAgentVector(agent_description, population):
+	r"""Creates a FLAME-GPU2 agent vector holding a materialised agent population, ready for setPopulationData
+	:type agent_description: py:class:`pyflamegpu.AgentDescription`
+	:param agent_description: Description of the agent
+	:type population: py:class:`numpy.ndarray`
+	:param population: Structured array of the agent population, see AgentPopulation.materialise
+	"""
+	agents = pyflamegpu.AgentVector(agent_description, len(population));
+	setters = [];
+	for name in population.dtype.names:
+		field = population.dtype.fields[name][0];
+		variable_type = 'Int' if np.issubdtype(field.base, np.integer) else 'Float';
+		setters.append(("setVariable"+("Array" if len(field.shape)>0 else "")+variable_type, name, population[name].tolist()));
+	for i in range(len(population)):
+		agent = agents[i];
+		for setter, name, values in setters:
+			getattr(agent, setter)(name, values[i]);
+	return agents
+
+class AgentLogExtractor(object):
+	r"""Forwards the configuration of the agent statistics to log to a FLAME-GPU2 agent logging config, recording each statistic for extraction"""
+
+	#Statistics read from an agent log frame without a type suffix
+	untyped_statistics = ["Mean", "StandardDev"];
+
+	def __init__(self, agent_logging_config, agent_name, agent_state=None):
+		self.agent_logging_config = agent_logging_config;
+		self.agent_name = agent_name;
+		self.agent_state = agent_state;
+		self.statistics = [];
+
+	def logCount(self):
+		r"""Log the number of agents each step"""
+		if not self.agent_logging_config==None:
+			self.agent_logging_config.logCount();
+		self.statistics.append(("count", "getCount", None));
+
+	def __getattr__(self, name):
+		r"""Forwards log<Statistic><Type>(variable_name) calls, e.g. logMeanInt("life") or logMaxFloat("x")"""
+		statistic = re.match(r"^log(Mean|StandardDev|Min|Max|Sum)(\w+)$", name);
+		if statistic==None:
+			raise AttributeError(name)
+		def log(variable_name):
+			if not self.agent_logging_config==None:
+				getattr(self.agent_logging_config, name)(variable_name);
+			getter = "get"+statistic.group(1)+("" if statistic.group(1) in self.untyped_statistics else statistic.group(2));
+			key = re.sub(r"(?<!^)(?=[A-Z])", "_", statistic.group(1)).lower()+"_"+variable_name;
+			self.statistics.append((key, getter, variable_name));
+		return log
+
+class LogExtractor(object):
+	r"""This class wraps a FLAME-GPU2 logging config, recording every environment property and agent statistic configured through it. Step logs of any number of runs can then be extracted in a single pass into dense NumPy arrays shaped (runs, steps)"""
+
+	#Environment property getter suffixes tried, in order, when the type of a logged property is not provided
+	property_types = ["Float", "UInt", "Int", "Double", "UChar", "Char", "ArrayFloat", "ArrayUInt", "ArrayInt", "ArrayDouble", "ArrayUChar", "ArrayChar"];
+
+	def __init__(self, logging_config=None):
+		r"""
+		:type logging_config: py:class:`pyflamegpu.LoggingConfig`
+		:param logging_config: Logging config to forward configuration to, if None only the extraction schema is recorded
+		"""
+		self.logging_config = logging_config;
+		self.environment = [];
+		self.agents = [];
+
+	def logEnvironment(self, property_name, property_type=None):
+		r"""Log an environment property each step
+		:type property_name: string
+		:param property_name: Name of the environment property
+		:type property_type: string
+		:param property_type: Getter suffix of the property type, e.g. 'Float', 'UInt' or 'ArrayFloat'. Detected from the first logged step if not provided"""
+		if not self.logging_config==None:
+			self.logging_config.logEnvironment(property_name);
+		self.environment.append([property_name, property_type]);
+
+	def agent(self, agent_name, agent_state=None):
+		r"""Log statistics of an agent (state) population each step
+		:type agent_name: string
+		:param agent_name: Name of the agent
+		:type agent_state: string
+		:param agent_state: Name of the agent state, defaults to all states
+		:rtype: py:class:`AgentLogExtractor`
+		:return: Object on which to configure the agent statistics to log"""
+		agent_logging_config = None;
+		if not self.logging_config==None:
+			agent_logging_config = self.logging_config.agent(agent_name) if agent_state==None else self.logging_config.agent(agent_name, agent_state);
+		agent_log = AgentLogExtractor(agent_logging_config, agent_name, agent_state);
+		self.agents.append(agent_log);
+		return agent_log
+
+	def __detectPropertyType(self, frame, property_name):
+		for property_type in self.property_types:
+			try:
+				getattr(frame, "getEnvironmentProperty"+property_type)(property_name);
+				return property_type
+			except Exception:
+				continue
+		raise KeyError("Environment property '"+property_name+"' is not logged")
+
+	def extract(self, logs):
+		r"""Extract the step logs of one or more runs in a single pass over the logged steps. Runs with fewer logged steps, e.g. ended early by an exit condition, are padded with NaN
+		:type logs: py:class:`pyflamegpu.RunLogVec`
+		:param logs: Logs of an ensemble, or the log of a single simulation
+		:rtype: dict
+		:return: NumPy array per logged statistic, keyed '<agent>_<statistic>[_<variable>]' for agent statistics, e.g. 'Prey_count' or 'Prey_mean_life', and by property name for environment properties. Also 'step', the step count of each logged step, and 'steps', the number of logged steps per run"""
+		if hasattr(logs, "getStepLog"):
+			logs = [logs];
+		step_logs = [log.getStepLog() for log in logs];
+		runs = len(step_logs);
+		steps = np.array([len(step_log) for step_log in step_logs], dtype=np.int64);
+		max_steps = int(steps.max()) if runs>0 else 0;
+		data = {"step":np.full((runs, max_steps), -1, dtype=np.int64), "steps":steps};
+		agents = [];
+		for agent_log in self.agents:
+			prefix = agent_log.agent_name if agent_log.agent_state==None else agent_log.agent_name+"_"+agent_log.agent_state;
+			for key, getter, variable_name in agent_log.statistics:
+				data[prefix+"_"+key] = np.full((runs, max_steps), np.nan);
+				agents.append((data[prefix+"_"+key], agent_log.agent_name, agent_log.agent_state, getter, variable_name));
+		environment = [];
+		for run in range(runs):
+			for step in range(steps[run]):
+				frame = step_logs[run][step];
+				data["step"][run, step] = frame.getStepCount();
+				if len(environment)<len(self.environment):
+					#Property types and array lengths are resolved from the first logged step
+					for logged in self.environment:
+						if logged[1]==None:
+							logged[1] = self.__detectPropertyType(frame, logged[0]);
+						value = getattr(frame, "getEnvironmentProperty"+logged[1])(logged[0]);
+						data[logged[0]] = np.full((runs, max_steps)+np.shape(value), np.nan);
+						environment.append((data[logged[0]], "getEnvironmentProperty"+logged[1], logged[0]));
+				for array, getter, property_name in environment:
+					array[run, step] = getattr(frame, getter)(property_name);
+				for array, agent_name, agent_state, getter, variable_name in agents:
+					agent_frame = frame.getAgent(agent_name) if agent_state==None else frame.getAgent(agent_name, agent_state);
+					array[run, step] = getattr(agent_frame, getter)() if variable_name==None else getattr(agent_frame, getter)(variable_name);
+		return data
+
+	def dataFrame(self, data):
+		r"""Optional pandas view of extracted logs, with one row per run and logged step and one column per scalar statistic
+		:type data: dict
+		:param data: Arrays returned by extract
+		:rtype: py:class:`pandas.DataFrame`"""
+		import pandas as pd
+		runs, max_steps = data["step"].shape;
+		logged = np.arange(max_steps)[np.newaxis,:]<data["steps"][:,np.newaxis];
+		columns = {"run":np.repeat(np.arange(runs), max_steps)[logged.ravel()], "step":data["step"][logged]};
+		for key in data:
+			if not key in ["step", "steps"] and data[key].ndim==2:
+				columns[key] = data[key][logged];
+		return pd.DataFrame(columns)
+
+def simulate_parameters(experiment, parameter_names, parameters):
+	r"""Default simulate function of a PoolEvaluator worker. Runs a single simulation of the worker's experiment with the provided parameter values and returns the logged fitness components
+	:type experiment: py:class:`Experiment`
+	:param experiment: The worker's persistent experiment
+	:type parameter_names: list
+	:param parameter_names: Names of the environment properties in parameter vector order
+	:type parameters: tuple
+	:param parameters: Parameter values of a single GA individual
+	"""
+	experiment.beginBatch([dict(zip(parameter_names, parameters))]);
+	return experiment.fitnessComponents()[0][:3]
+
+#Per-process state of a PoolEvaluator worker, created once by the worker initialiser
+pool_worker_experiment = None;
+pool_worker_simulate = None;
+pool_worker_parameter_names = None;
+pool_worker_slot = None;
+pool_worker_steps = None;
+
+def pool_worker_initialise(experiment_factory, simulate, parameter_names, slot_queue):
+	r"""PoolEvaluator worker initialiser. Claims a device or CPU slot then builds the worker's experiment (and model) once, to be kept warm for every evaluation sent to the worker"""
+	global pool_worker_experiment, pool_worker_simulate, pool_worker_parameter_names, pool_worker_slot, pool_worker_steps
+	pool_worker_slot = slot_queue.get();
+	if not pool_worker_slot==None:
+		#Restrict the worker to its device before any CUDA context is created
+		os.environ["CUDA_VISIBLE_DEVICES"] = str(pool_worker_slot);
+	pool_worker_simulate = simulate;
+	pool_worker_parameter_names = parameter_names;
+	pool_worker_experiment = experiment_factory() if not experiment_factory==None else None;
+	pool_worker_steps = pool_worker_experiment.steps if not pool_worker_experiment==None else None;
+
+def pool_worker_evaluate(parameters, steps=None):
+	r"""PoolEvaluator worker task. Evaluates a single parameter vector, returning only its fitness components. Simulations are shortened to steps if provided, otherwise the worker experiment's own number of steps is simulated"""
+	if not pool_worker_experiment==None:
+		pool_worker_experiment.setSimulationSteps(pool_worker_steps if steps==None else steps);
+	return tuple(pool_worker_simulate(pool_worker_experiment, pool_worker_parameter_names, parameters))
+
+class PoolEvaluator(object):
+	r"""This class provides a process pool backend for evaluating GA populations. Each worker builds its experiment once and keeps it warm, receiving compact parameter vectors and returning only fitness components"""
+
+	#Register default internal values
+	workers = 1;
+	slots = None;
+	experiment_factory = None;
+	simulate = None;
+	start_method = 'spawn';
+	pool = None;
+	parameter_names = None;
+	completed_queue = None;
+
+	def __init__(self, experiment_factory=None, workers=None, slots=None, simulate=simulate_parameters, start_method=None):
+		r"""
+		:type experiment_factory: function
+		:param experiment_factory: Picklable module level function called once per worker to create its py:class:`Experiment`
+		:type workers: uint
+		:param workers: Number of worker processes. Defaults to one per slot, or to the CPU count when no slots are given
+		:type slots: list
+		:param slots: Device id assigned to each worker, None entries are CPU slots. Devices may be repeated to run concurrent workers per device
+		:type simulate: function
+		:param simulate: Picklable module level function called as simulate(experiment, parameter_names, parameters) returning the fitness components. Defaults to simulate_parameters
+		:type start_method: string
+		:param start_method: multiprocessing start method, defaults to 'spawn' so no worker inherits a CUDA context
+		"""
+		self.experiment_factory = experiment_factory;
+		self.simulate = simulate;
+		if not slots==None:
+			self.slots = list(slots);
+			self.workers = len(self.slots) if workers==None else workers;
+		else:
+			self.workers = multiprocessing.cpu_count() if workers==None else workers;
+			self.slots = [None]*self.workers;
+		self.start_method = start_method if not start_method==None else self.start_method;
+
+	def start(self, parameter_names):
+		r"""Start the worker processes, each of which builds its experiment once
+		:type parameter_names: list
+		:param parameter_names: Names of the parameters in parameter vector order"""
+		if not self.pool==None:
+			if list(parameter_names)==self.parameter_names:
+				return
+			self.close();
+		self.parameter_names = list(parameter_names);
+		context = multiprocessing.get_context(self.start_method);
+		slot_queue = context.Queue();
+		for i in range(self.workers):
+			slot_queue.put(self.slots[i%len(self.slots)]);
+		self.pool = context.Pool(self.workers, pool_worker_initialise, (self.experiment_factory, self.simulate, self.parameter_names, slot_queue));
+
+	def evaluate(self, parameter_vectors, steps=None):
+		r"""Evaluate parameter vectors across the worker pool
+		:type parameter_vectors: list
+		:param parameter_vectors: Tuples of parameter values in parameter_names order
+		:type steps: uint
+		:param steps: Number of simulation steps, defaults to the steps of each worker's experiment
+		:rtype: list
+		:return: Tuple of fitness components per parameter vector, in the same order"""
+		return self.pool.starmap(pool_worker_evaluate, [(parameters, steps) for parameters in parameter_vectors], chunksize=1);
+
+	def submit(self, parameters, tag=None):
+		r"""Asynchronously evaluate a single parameter vector on the next free worker. The result is retrieved with completed()
+		:type parameters: tuple
+		:param parameters: Parameter values in parameter_names order
+		:type tag: object
+		:param tag: Value returned alongside the fitness components to identify the evaluation"""
+		if self.completed_queue==None:
+			self.completed_queue = queue.Queue();
+		completed_queue = self.completed_queue;
+		self.pool.apply_async(pool_worker_evaluate, (parameters,), callback=lambda result: completed_queue.put((tag, result)), error_callback=lambda error: completed_queue.put((tag, error)));
+
+	def completed(self):
+		r"""Blocks until any submitted evaluation completes
+		:rtype: tuple
+		:return: The tag and fitness components of the completed evaluation"""
+		tag, result = self.completed_queue.get();
+		if isinstance(result, BaseException):
+			raise result
+		return tag, result
+
+	def close(self):
+		r"""Stop the worker processes"""
+		if not self.pool==None:
+			self.pool.close();
+			self.pool.join();
+			self.pool = None;
+
+class ResultStore(object):
+	r"""Append-only columnar binary store of GA population records. Each column is stored in its own raw binary file within the store directory, described by a JSON schema, so every column of any number of GA runs can be memory mapped for analysis"""
+
+	#Number of records buffered before a chunk is appended to the column files
+	chunk_size = 1024;
+
+	def __init__(self, path, gene_names=None, components=None, chunk_size=None):
+		r"""
+		:type path: string
+		:param path: Directory of the store, an existing store is opened for reading and appending
+		:type gene_names: list
+		:param gene_names: Names of the GA parameters, in gene order. Only required to create a new store
+		:type components: uint
+		:param components: Number of fitness components recorded per chromosome. Only required to create a new store
+		:type chunk_size: uint
+		:param chunk_size: Number of records buffered before they are written"""
+		self.path = path;
+		self.chunk_size = self.chunk_size if chunk_size==None else chunk_size;
+		self.pending = [];
+		if os.path.exists(os.path.join(path, "schema.json")):
+			with open(os.path.join(path, "schema.json")) as schema_file:
+				schema = json.load(schema_file);
+			self.gene_names = schema["gene_names"];
+			self.components = schema["components"];
+		else:
+			self.gene_names = list(gene_names);
+			self.components = components;
+			os.makedirs(path, exist_ok=True);
+			#Write the schema atomically, so a store is never left with a partial schema
+			temporary = os.path.join(path, "schema.json.tmp");
+			with open(temporary, "w") as schema_file:
+				json.dump({"gene_names":self.gene_names, "components":self.components, "columns":{name:[np.dtype(dtype).str, list(shape)] for name, (dtype, shape) in self.schema().items()}}, schema_file);
+			os.replace(temporary, os.path.join(path, "schema.json"));
+
+	def schema(self):
+		r"""Data type and per-record shape of each column
+		:rtype: dict"""
+		return collections.OrderedDict([
+			("generation", (np.int32, ())),
+			("chromosome_id", (np.int64, ())),
+			("genes", (np.float64, (len(self.gene_names),))),
+			("fitness", (np.float64, ())),
+			("fitness_components", (np.float64, (self.components,))),
+			("wallclock", (np.float64, ())),
+			("parent_ids", (np.int64, (2,))),
+			("replicates", (np.int32, ())),
+			("fitness_standard_error", (np.float64, ()))]);
+
+	def append(self, generation, chromosome_id, genes, fitness, fitness_components, wallclock, parent_ids=(-1,-1), replicates=1, fitness_standard_error=float("nan")):
+		r"""Buffer the record of a single chromosome, writing a chunk once chunk_size records are buffered
+		:type generation: uint
+		:param generation: GA generation of the record
+		:type chromosome_id: uint
+		:param chromosome_id: Id of the chromosome
+		:type genes: list
+		:param genes: Parameter values in gene order
+		:type fitness: float
+		:param fitness: GA fitness value
+		:type fitness_components: list
+		:param fitness_components: Fitness components logged by the simulation, NaN if unknown
+		:type wallclock: float
+		:param wallclock: Seconds since the start of the GA when the chromosome was evaluated
+		:type parent_ids: tuple
+		:param parent_ids: Ids of the crossover parents, -1 if the chromosome was randomly initialised
+		:type replicates: uint
+		:param replicates: Number of replicate simulations the fitness is the mean of
+		:type fitness_standard_error: float
+		:param fitness_standard_error: Standard error of the mean fitness of the replicates, NaN if unknown"""
+		self.pending.append((generation, chromosome_id, genes, fitness, fitness_components, wallclock, parent_ids, replicates, fitness_standard_error));
+		if len(self.pending)>=self.chunk_size:
+			self.flush();
+
+	def flush(self):
+		r"""Append the buffered records to the column files as a single chunk"""
+		if len(self.pending)==0:
+			return
+		columns = list(zip(*self.pending));
+		for (name, (dtype, shape)), values in zip(self.schema().items(), columns):
+			chunk = np.asarray(values, dtype=dtype).reshape((len(values),)+shape);
+			with open(os.path.join(self.path, name+".bin"), "ab") as column_file:
+				column_file.write(chunk.tobytes());
+		self.pending = [];
+
+	def truncate(self, records):
+		r"""Discard every record after the first records, e.g. those written after a GA checkpoint
+		:type records: uint
+		:param records: Number of records to keep"""
+		self.pending = [];
+		for name, (dtype, shape) in self.schema().items():
+			column_path = os.path.join(self.path, name+".bin");
+			if os.path.exists(column_path):
+				os.truncate(column_path, records*np.dtype(dtype).itemsize*int(np.prod(shape)));
+
+	def __len__(self):
+		r"""Number of complete records written. A chunk interrupted part way through being written is ignored"""
+		records = [];
+		for name, (dtype, shape) in self.schema().items():
+			column_path = os.path.join(self.path, name+".bin");
+			record_size = np.dtype(dtype).itemsize*int(np.prod(shape));
+			size = os.path.getsize(column_path) if os.path.exists(column_path) else 0;
+			records.append(size//record_size if record_size>0 else sys.maxsize);
+		return min(records)
+
+	def read(self, mmap=True):
+		r"""Read every written record, as one NumPy array per column with a row per record
+		:type mmap: boolean
+		:param mmap: Memory map the column files rather than loading them. Defaults to True
+		:rtype: dict
+		:return: Array of each column, keyed by column name"""
+		records = len(self);
+		data = {};
+		for name, (dtype, shape) in self.schema().items():
+			column_path = os.path.join(self.path, name+".bin");
+			if records==0 or int(np.prod(shape))==0:
+				data[name] = np.empty((records,)+shape, dtype=dtype);
+			elif mmap:
+				data[name] = np.memmap(column_path, dtype=dtype, mode="r", shape=(records,)+shape);
+			else:
+				data[name] = np.fromfile(column_path, dtype=dtype, count=records*int(np.prod(shape))).reshape((records,)+shape);
+		return data
+
+	def exportCSV(self, csv_path):
+		r"""Export the records in the population record format of the GA
+		:type csv_path: string
+		:param csv_path: Path of the CSV file to write"""
+		data = self.read();
+		with open(csv_path, "w") as csv_file:
+			generation = None;
+			for i in range(len(data["generation"])):
+				if not data["generation"][i]==generation:
+					generation = data["generation"][i];
+					csv_file.write("SimulationGA,generation,"+str(generation)+"\n");
+				csv_file.write("\tChromosome_ID,"+str(data["chromosome_id"][i])+",Parameters,");
+				csv_file.write("".join(str(value)+"," for value in data["genes"][i]));
+				csv_file.write("Fitness,"+str(data["fitness"][i])+"\n");
+
+def readResultStores(paths, mmap=True):
+	r"""Read the records of many GA runs, e.g. every store within a GA working directory
+	:type paths: list
+	:param paths: Directories of the result stores
+	:type mmap: boolean
+	:param mmap: Memory map the column files rather than loading them. Defaults to True
+	:rtype: dict
+	:return: Columns of each store, keyed by store path"""
+	return {path:ResultStore(path).read(mmap) for path in paths}
+
+class SurrogateModel(object):
+	r"""Regression surrogate of GA fitness, a scaled MLPRegressor as trained by the surrogate modelling experiments. Each update continues training from the previous weights on every sample seen so far, so the model is refined incrementally between generations. Requires scikit-learn"""
+
+	#Register default internal values
+	hidden_layers = (32, 32);
+	epochs = 50;
+
+	def __init__(self, hidden_layers=None, epochs=None, random_state=None):
+		r"""
+		:type hidden_layers: tuple
+		:param hidden_layers: Number of neurons in each hidden layer
+		:type epochs: uint
+		:param epochs: Training epochs per update
+		:type random_state: int
+		:param random_state: Seed of the network weight initialisation"""
+		from sklearn.neural_network import MLPRegressor
+		from sklearn.preprocessing import StandardScaler
+		self.hidden_layers = hidden_layers if not hidden_layers==None else self.hidden_layers;
+		self.epochs = epochs if not epochs==None else self.epochs;
+		self.scaler = StandardScaler();
+		self.target_scaler = StandardScaler();
+		self.network = MLPRegressor(hidden_layer_sizes=self.hidden_layers, max_iter=self.epochs, warm_start=True, random_state=random_state);
+		self.samples = 0;
+
+	def update(self, X, Y):
+		r"""Continue training on every sample seen so far
+		:type X: numpy.ndarray
+		:param X: Gene values of each evaluated chromosome, shaped (samples, genes)
+		:type Y: numpy.ndarray
+		:param Y: Simulated fitness of each chromosome"""
+		import warnings
+		from sklearn.exceptions import ConvergenceWarning
+		X = np.asarray(X, dtype=np.float64);
+		Y = np.asarray(Y, dtype=np.float64).reshape(-1, 1);
+		self.scaler.fit(X);
+		self.target_scaler.fit(Y);
+		with warnings.catch_warnings():
+			#Few epochs are run per update, so training is not expected to converge within a single update
+			warnings.simplefilter("ignore", ConvergenceWarning);
+			self.network.fit(self.scaler.transform(X), self.target_scaler.transform(Y).ravel());
+		self.samples = len(X);
+
+	def predict(self, X):
+		r"""Predict the fitness of chromosomes
+		:type X: numpy.ndarray
+		:param X: Gene values of each chromosome, shaped (chromosomes, genes)
+		:rtype: numpy.ndarray"""
+		X = np.asarray(X, dtype=np.float64);
+		return self.target_scaler.inverse_transform(self.network.predict(self.scaler.transform(X)).reshape(-1, 1)).ravel()
+
 class Search(object):
 	r"""This class provides an interface to a genetic algorithm(GA) based search experiment intended to be used for a FLAME-GPU2 model"""
 
@@ -506,6 +1291,50 @@ class Search(object):
 	cwd=os.getcwd()+"/";
 	logged_stats=["mean", "std", "min", "max"];
 	evaluator_experiment = None;
+	batch_evaluation = False;
+	pool_evaluator = None;
+	#GA fitness memoization
+	memoize_fitness = False;
+	fitness_cache_size = 1024;
+	fitness_cache_precision = 6;
+	fitness_cache = None;
+	fitness_cache_hits = 0;
+	fitness_cache_misses = 0;
+	logbook = None;
+	#GA result store
+	result_store = False;
+	results = None;
+	results_path = None;
+	chromosome_evaluations = None;
+	chromosome_parents = None;
+	start_time = None;
+	#GA multi-fidelity evaluation
+	fidelity_schedule = None;
+	promotion_ratio = 0.5;
+	fidelity_evaluations = None;
+	#GA replicate racing
+	racing = False;
+	racing_initial = 2;
+	racing_maximum = 8;
+	racing_confidence = 1.96;
+	racing_replicates = 0;
+	chromosome_replicates = None;
+	#GA surrogate pre-screening
+	surrogate = None;
+	surrogate_factor = 4;
+	surrogate_minimum_samples = None;
+	surrogate_X = None;
+	surrogate_Y = None;
+	surrogate_screened = 0;
+	#GA checkpointing
+	checkpoint_path = None;
+	checkpoint_generations = 1;
+	checkpoint_seconds = None;
+	checkpoint_time = None;
+	#GA steady state evaluation
+	steady_state = False;
+	steady_state_in_flight = 0;
+	steady_state_completed = None;
 	verbose = False;
 
 	def __init__(*args, **kwargs):
@@ -519,6 +1348,294 @@ class Search(object):
 		:param evaluator: FLAME-GPU2 ensemble experiment"""
 		self.evaluator_experiment = evaluator;
 
+	def setBatchEvaluation(self, batch=True):
+		r"""Allows user to evaluate each GA population as a single ensemble launch of the evaluation experiment, with one run plan per individual, rather than one simulation per individual
+		:type batch: boolean
+		:param batch: Evaluate populations in a single batched ensemble. Defaults to True"""
+		self.batch_evaluation = batch;
+
+	def setPoolEvaluator(self, evaluator):
+		r"""Allows user to evaluate GA populations across a process pool of persistent, per-worker model instances
+		:type evaluator: py:class:`PoolEvaluator`
+		:param evaluator: Process pool evaluator backend"""
+		self.pool_evaluator = evaluator;
+
+	def setSteadyState(self, steady_state=True):
+		r"""Allows user to run the GA asynchronously in steady state, where each offspring is inserted into the population with (mu+1) replacement as soon as its evaluation completes and a new offspring is dispatched in its place. A generation is recorded every lambda completed evaluations.
+		Steady state offspring are evaluated one at a time, so it cannot be combined with multi-fidelity evaluation, replicate racing or surrogate screening
+		:type steady_state: boolean
+		:param steady_state: Run the GA in asynchronous steady state. Defaults to True"""
+		self.steady_state = steady_state;
+
+	def setFitnessMemoization(self, memoize=True, cache_size=None, precision=None):
+		r"""Allows user to reuse the fitness of previously evaluated chromosomes within a GA run rather than re-simulating duplicate parameter sets
+		:type memoize: boolean
+		:param memoize: Memoize evaluated fitnesses. Defaults to True
+		:type cache_size: uint
+		:param cache_size: Maximum number of remembered chromosomes, least recently used chromosomes are evicted first
+		:type precision: uint
+		:param precision: Number of decimal places float parameters are rounded to when comparing chromosomes"""
+		self.memoize_fitness = memoize;
+		if not cache_size==None:
+			self.fitness_cache_size = cache_size;
+		if not precision==None:
+			self.fitness_cache_precision = precision;
+
+	def setResultStore(self, store=True):
+		r"""Allows user to record every GA population in a columnar binary ResultStore alongside the CSV population record, named by the seed of the GA run within the ga_temp directory. Populations are only recorded in the CSV population record unless enabled
+		:type store: boolean
+		:param store: Record populations in a result store. Defaults to True"""
+		self.result_store = store;
+
+	def setMultiFidelity(self, schedule, promotion_ratio=0.5):
+		r"""Allows user to evaluate generational GA offspring by successive halving. All offspring are first simulated for the shortest horizon of the schedule, and only the best fraction by partial fitness is promoted to each longer horizon. Promoted offspring are finally simulated for the full number of steps of the evaluation experiment, and only those compete for a place in the population.
+		Fitness which extrapolates to the end of a run should read the steps simulated from the property set by the evaluation experiment's setStepsProperty
+		:type schedule: list
+		:param schedule: Increasing numbers of simulation steps of the partial fidelity evaluations, e.g. [100, 300]. None disables multi-fidelity evaluation
+		:type promotion_ratio: float
+		:param promotion_ratio: Fraction of the offspring promoted from each fidelity to the next, at least one offspring is always promoted. Defaults to 0.5"""
+		self.fidelity_schedule = sorted(schedule) if not schedule==None else None;
+		self.promotion_ratio = promotion_ratio;
+
+	def __count_fidelity(self, steps, evaluations):
+		r"""Counts the evaluations performed at a fidelity, for the logbook
+		:type steps: uint
+		:param steps: Simulation steps of the evaluations, None for full length evaluations
+		:type evaluations: uint
+		:param evaluations: The number of evaluations performed
+		"""
+		if self.fidelity_schedule==None:
+			return
+		if self.fidelity_evaluations==None:
+			self.fidelity_evaluations = collections.OrderedDict()
+		column = "evaluations_full" if steps==None else "evaluations_"+str(steps)
+		self.fidelity_evaluations[column] = self.fidelity_evaluations.get(column, 0)+evaluations
+
+	def __evaluate_offspring_multifidelity(self, offspring, population):
+		r"""Evaluates GA offspring by successive halving over the fidelity schedule, returning only the offspring promoted to a full length evaluation and their fitnesses
+		:type offspring: list
+		:param offspring: The unevaluated GA offspring
+		:type population: list
+		:param population: The current GA population
+		"""
+		candidates = list(offspring)
+		promoted = []
+		if self.memoize_fitness:
+			#Chromosomes with a memoized full length fitness need no partial evaluation
+			promoted = [c for c in candidates if self.__chromosome_key(c) in self.fitness_cache]
+			candidates = [c for c in candidates if not self.__chromosome_key(c) in self.fitness_cache]
+		direction = 1.0 if self.fitness_weights[0]>=0 else -1.0
+		for steps in self.fidelity_schedule:
+			if len(candidates)<=1:
+				break
+			partial = self.__evaluate_population(candidates, steps=steps)
+			self.__count_fidelity(steps, len(candidates))
+			promotions = max(1, int(math.ceil(len(candidates)*self.promotion_ratio)))
+			ranking = sorted(range(len(candidates)), key=lambda i: direction*partial[i], reverse=True)
+			candidates = [candidates[i] for i in sorted(ranking[:promotions])]
+			if self.verbose:
+				print("\t",promotions,"of",len(partial),"offspring promoted after",steps,"steps")
+		candidates = promoted+candidates
+		evaluations = self.__evaluate_candidates(candidates, population)
+		self.__count_fidelity(None, len(candidates))
+		return candidates, evaluations
+
+	def setReplicateRacing(self, racing=True, initial=2, maximum=8, confidence=1.96):
+		r"""Allows user to score each chromosome by the mean fitness of replicate simulations, raced against the selection threshold. Each candidate starts with a few replicates, and replicates are only added while the confidence interval of its mean fitness contains the fitness of the mu-th best individual, so clearly good and clearly bad candidates stop early
+		:type racing: boolean
+		:param racing: Race replicate simulations. Defaults to True
+		:type initial: uint
+		:param initial: Replicates simulated for every candidate. Defaults to 2
+		:type maximum: uint
+		:param maximum: Maximum replicates of any candidate, greater than initial. Defaults to 8
+		:type confidence: float
+		:param confidence: Number of standard errors either side of the mean fitness within the confidence interval. Defaults to 1.96"""
+		if racing and not maximum>initial:
+			raise ValueError("Replicate racing maximum ("+str(maximum)+") must exceed the initial replicates ("+str(initial)+")")
+		self.racing = racing;
+		self.racing_initial = initial;
+		self.racing_maximum = maximum;
+		self.racing_confidence = confidence;
+
+	def __evaluate_population_racing(self, candidates, population):
+		r"""Evaluates GA candidates by racing replicate simulations against the selection threshold of the mu best of the population and candidates
+		:type candidates: list
+		:param candidates: The unevaluated GA candidates
+		:type population: list
+		:param population: The evaluated GA population the candidates compete with
+		"""
+		maximum = self.racing_maximum
+		direction = 1.0 if self.fitness_weights[0]>=0 else -1.0
+		replicates = [[] for candidate in candidates]
+		components = [[] for candidate in candidates]
+		racing = list(range(len(candidates)))
+		rounds = 0
+		while len(racing)>0:
+			#Each round evaluates every racing candidate once, so the fitness components of each replicate are known
+			evaluations = self.__evaluate_population([candidates[i] for i in racing], False)
+			for i, fitness in zip(racing, evaluations):
+				replicates[i].append(fitness)
+				fitness_log = self.__fitness_components(candidates[i])
+				if not fitness_log==None:
+					components[i].append(fitness_log)
+			self.racing_replicates += len(racing)
+			rounds += 1
+			means = [np.mean(r) for r in replicates]
+			errors = [np.std(r, ddof=1)/math.sqrt(len(r)) if len(r)>1 else float("inf") for r in replicates]
+			if rounds<self.racing_initial:
+				racing = [i for i in range(len(candidates)) if len(replicates[i])<maximum]
+				continue
+			ranked = sorted([direction*m for m in means]+[direction*p.fitness.values[0] for p in population], reverse=True)
+			threshold = direction*ranked[min(self.mu, len(ranked))-1]
+			racing = [i for i in range(len(candidates)) if len(replicates[i])<maximum and abs(means[i]-threshold)<=self.racing_confidence*errors[i]]
+		for i in range(len(candidates)):
+			self.chromosome_replicates[candidates[i]["chromosome_id"]] = (len(replicates[i]), errors[i] if not math.isinf(errors[i]) else float("nan"))
+			if len(components[i])>0:
+				self.__record_evaluation(candidates[i], tuple(np.mean(components[i], axis=0)))
+		if self.verbose:
+			print("\t",len(candidates),"candidates raced with",sum(len(r) for r in replicates),"replicates")
+		return [float(m) for m in means]
+
+	def __evaluate_candidates(self, candidates, population):
+		r"""Evaluates the full length fitness of GA candidates, racing replicates if replicate racing is enabled
+		:type candidates: list
+		:param candidates: The unevaluated GA candidates
+		:type population: list
+		:param population: The evaluated GA population the candidates compete with
+		"""
+		if self.racing and len(candidates)>0:
+			return self.__evaluate_population_racing(candidates, population)
+		return self.__evaluate_population(candidates)
+
+	def setSurrogateScreening(self, factor=4, model=None, minimum_samples=None):
+		r"""Allows user to pre-screen generational GA offspring with a regression surrogate trained on every simulation evaluated so far. Each generation factor*lambda offspring are created and only the lambda with the best predicted fitness are simulated, after which the surrogate is retrained
+		:type factor: uint
+		:param factor: Number of candidate offspring scored by the surrogate per simulated offspring. Defaults to 4
+		:type model: object
+		:param model: Surrogate with update(X, Y) and predict(X) methods taking gene values in parameter_limits order. Defaults to a py:class:`SurrogateModel`
+		:type minimum_samples: uint
+		:param minimum_samples: Simulated chromosomes required before offspring are screened. Defaults to mu"""
+		self.surrogate = model if not model==None else SurrogateModel();
+		self.surrogate_factor = factor;
+		self.surrogate_minimum_samples = minimum_samples;
+
+	def __genes(self, individuals):
+		r"""Gene values of GA individuals in parameter_limits order, shaped (individuals, genes)
+		:type individuals: list
+		:param individuals: The GA individuals
+		"""
+		return np.array([[float(individual[name]) for name in self.parameter_limits.keys()] for individual in individuals], dtype=np.float64).reshape(len(individuals), len(self.parameter_limits))
+
+	def __surrogate_ready(self):
+		r"""Whether enough chromosomes have been simulated to screen offspring with the surrogate"""
+		minimum_samples = self.mu if self.surrogate_minimum_samples==None else self.surrogate_minimum_samples
+		return not self.surrogate==None and not self.surrogate_Y is None and len(self.surrogate_Y)>=max(minimum_samples, 1)
+
+	def __train_surrogate(self, individuals):
+		r"""Adds the simulated fitness of GA individuals to the surrogate training data and retrains the surrogate
+		:type individuals: list
+		:param individuals: The evaluated GA individuals
+		"""
+		if self.surrogate==None or len(individuals)==0:
+			return
+		X = self.__genes(individuals)
+		Y = np.array([individual.fitness.values[0] for individual in individuals], dtype=np.float64)
+		self.surrogate_X = X if self.surrogate_X is None else np.concatenate((self.surrogate_X, X))
+		self.surrogate_Y = Y if self.surrogate_Y is None else np.concatenate((self.surrogate_Y, Y))
+		if self.__surrogate_ready():
+			self.surrogate.update(self.surrogate_X, self.surrogate_Y)
+
+	def __screen_offspring(self, offspring):
+		r"""Selects the lambda GA offspring with the best fitness predicted by the surrogate
+		:type offspring: list
+		:param offspring: The mutated candidate offspring
+		"""
+		predicted = np.asarray(self.surrogate.predict(self.__genes(offspring)), dtype=np.float64)
+		direction = 1.0 if self.fitness_weights[0]>=0 else -1.0
+		best = np.argsort(-direction*predicted, kind='stable')[:self.lamda]
+		self.surrogate_screened += len(offspring)
+		if self.verbose:
+			print("\t",len(offspring),"offspring screened by the surrogate")
+		return [offspring[i] for i in sorted(best)]
+
+	def setCheckpoint(self, path, generations=1, seconds=None):
+		r"""Allows user to periodically checkpoint the full GA state, so a search can be continued with GA(resume=path) after a crash. Checkpoints are written atomically, replacing the previous checkpoint
+		:type path: string
+		:param path: Path of the checkpoint file
+		:type generations: uint
+		:param generations: Write a checkpoint every this many generations, None to only checkpoint by time. Defaults to 1
+		:type seconds: float
+		:param seconds: Write a checkpoint once this many seconds have passed since the last checkpoint, None to only checkpoint by generation"""
+		self.checkpoint_path = path;
+		self.checkpoint_generations = generations;
+		self.checkpoint_seconds = seconds;
+
+	def __checkpoint_due(self, generation, now):
+		r"""Whether a checkpoint should be written at the end of the current generation
+		:type generation: uint
+		:param generation: The current GA generation
+		:type now: 'datetime.datetime'
+		:param now: The time at the end of the generation
+		"""
+		if self.checkpoint_path==None:
+			return False
+		if not self.checkpoint_generations==None and generation%self.checkpoint_generations==0:
+			return True
+		return not self.checkpoint_seconds==None and (now-self.checkpoint_time).total_seconds()>=self.checkpoint_seconds
+
+	def __save_checkpoint(self, population, logbook, generation, candidates_evaluated, unique_run_seed, seed_record, time_taken, optimal_solutions, optimal_count):
+		r"""Atomically writes the full GA state, including the state of the random number generators, to the checkpoint path
+		:type population: list
+		:param population: The current GA population
+		:type logbook: 'deap.base.Toolbox.Logbook'
+		:param logbook: The logbook recording information over the course of a GA run
+		:type generation: uint
+		:param generation: The current GA generation
+		"""
+		if self.checkpoint_path==None:
+			return
+		state = {"population":population, "logbook":logbook, "generation":generation, "candidates_evaluated":candidates_evaluated,
+			"unique_run_seed":unique_run_seed, "seed_record":seed_record, "seed_record_size":os.path.getsize(seed_record), "time_taken":time_taken,
+			"optimal_solutions":optimal_solutions, "optimal_count":optimal_count, "ga_individual_id":self.ga_individual_id,
+			"random_state":random.getstate(), "numpy_random_state":np.random.get_state(),
+			"fitness_cache":self.fitness_cache, "fitness_cache_hits":self.fitness_cache_hits, "fitness_cache_misses":self.fitness_cache_misses,
+			"chromosome_evaluations":self.chromosome_evaluations, "chromosome_parents":self.chromosome_parents, "chromosome_replicates":self.chromosome_replicates,
+			"surrogate":self.surrogate, "surrogate_X":self.surrogate_X, "surrogate_Y":self.surrogate_Y,
+			"results_path":self.results_path, "results_records":len(self.results) if not self.results==None else 0}
+		temporary = self.checkpoint_path+".tmp"
+		with open(temporary, "wb") as checkpoint_file:
+			pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+			checkpoint_file.flush()
+			os.fsync(checkpoint_file.fileno())
+		os.replace(temporary, self.checkpoint_path)
+		self.checkpoint_time = datetime.datetime.now()
+		if self.verbose:
+			print("\tcheckpoint written at generation",generation)
+
+	def __load_checkpoint(self, path):
+		r"""Reads a GA checkpoint, restoring the search state and random number generators. The GA state local to GA is returned
+		:type path: string
+		:param path: Path of the checkpoint file
+		"""
+		with open(path, "rb") as checkpoint_file:
+			state = pickle.load(checkpoint_file)
+		self.ga_individual_id = state["ga_individual_id"]
+		random.setstate(state["random_state"])
+		np.random.set_state(state["numpy_random_state"])
+		self.fitness_cache = state["fitness_cache"]
+		self.fitness_cache_hits = state["fitness_cache_hits"]
+		self.fitness_cache_misses = state["fitness_cache_misses"]
+		self.chromosome_evaluations = state["chromosome_evaluations"]
+		self.chromosome_parents = state["chromosome_parents"]
+		self.chromosome_replicates = state["chromosome_replicates"]
+		self.surrogate = state["surrogate"]
+		self.surrogate_X = state["surrogate_X"]
+		self.surrogate_Y = state["surrogate_Y"]
+		self.results_path = state["results_path"]
+		if self.verbose:
+			print("Resuming GA from generation",state["generation"])
+		return state
+
 	def __create_individual(self, container):
 		r"""Creates a new GA individual (chromosome) with values randomly generated based on the provided limits for each parameter
 		:type container: 'deap.creator.Individual'
@@ -560,21 +1677,126 @@ class Search(object):
 		"""
 		global statistics
 		record = statistics.compile(population) if statistics else {}
+		if self.memoize_fitness:
+			record["cache_hits"] = self.fitness_cache_hits
+			record["cache_misses"] = self.fitness_cache_misses
+			self.fitness_cache_hits = 0
+			self.fitness_cache_misses = 0
+		if not self.fidelity_schedule==None:
+			for column in ["evaluations_"+str(steps) for steps in self.fidelity_schedule]+["evaluations_full"]:
+				record[column] = self.fidelity_evaluations.get(column, 0) if not self.fidelity_evaluations==None else 0
+			self.fidelity_evaluations = None
+		if self.racing:
+			record["replicates"] = self.racing_replicates
+			self.racing_replicates = 0
+		if not self.surrogate==None:
+			record["screened"] = self.surrogate_screened
+			self.surrogate_screened = 0
 		logbook.record(generation=gen,evaluations=evals,**record)
 		return
 
-	def __evaluate_population(self, population):
+	def __apply_fitness(self, fitness_log, individual=None):
+		r"""Combines the logged fitness components of a simulation into a single GA fitness value
+		:type fitness_log: list
+		:param fitness_log: The fitness components logged at the end of a simulation
+		:type individual: dict
+		:param individual: The evaluated GA individual, whose fitness components and evaluation time are remembered for the result store
+		"""
+		if not individual==None:
+			self.__record_evaluation(individual, fitness_log)
+		return (0.001*fitness_log[0])+(0.01*fitness_log[1])-(0.00001*fitness_log[2])
+
+	def __record_evaluation(self, individual, fitness_log):
+		r"""Remembers the fitness components of an evaluated GA individual and the time of its evaluation, for the result store
+		:type individual: dict
+		:param individual: The evaluated GA individual
+		:type fitness_log: list
+		:param fitness_log: The fitness components of the individual
+		"""
+		if self.chromosome_evaluations==None:
+			return
+		wallclock = (datetime.datetime.now()-self.start_time).total_seconds() if not self.start_time==None else 0.0
+		self.chromosome_evaluations[individual["chromosome_id"]] = (tuple(fitness_log), wallclock)
+
+	def __chromosome_key(self, individual):
+		r"""Canonical form of a GA individual's parameters used to recognise duplicate chromosomes, excluding the chromosome_id
+		:type individual: dict
+		:param individual: The GA individual
+		"""
+		key = []
+		for name in sorted(individual.keys()):
+			if not name=='chromosome_id':
+				value = individual[name]
+				if type(value)==type(float()):
+					value = round(value, self.fitness_cache_precision)
+				key.append((name, value))
+		return tuple(key)
+
+	def __evaluate_population_memoized(self, population):
+		r"""Evaluates only the chromosomes of the GA population which have not previously been evaluated, reusing remembered fitnesses for the rest
+		:type population: list
+		:param population: The current GA population
+		"""
+		if self.fitness_cache==None:
+			self.fitness_cache = collections.OrderedDict()
+		keys = [self.__chromosome_key(individual) for individual in population]
+		unevaluated = {}
+		for i in range(len(population)):
+			if keys[i] in self.fitness_cache:
+				self.fitness_cache.move_to_end(keys[i])
+				self.fitness_cache_hits += 1
+			elif keys[i] in unevaluated:
+				self.fitness_cache_hits += 1
+			else:
+				unevaluated[keys[i]] = population[i]
+				self.fitness_cache_misses += 1
+		evaluations = self.__evaluate_population(list(unevaluated.values()), False) if len(unevaluated)>0 else []
+		fitnesses = dict(zip(unevaluated.keys(), evaluations))
+		evaluation = []
+		for i in range(len(population)):
+			if keys[i] in fitnesses:
+				evaluation.append(fitnesses[keys[i]])
+				fitness_log = self.__fitness_components(unevaluated[keys[i]])
+				if not fitness_log==None:
+					self.__record_evaluation(population[i], fitness_log)
+			else:
+				evaluation.append(self.__reuse_fitness(keys[i], population[i]))
+		for key in fitnesses.keys():
+			self.__remember_fitness(key, self.__fitness_components(unevaluated[key]), fitnesses[key])
+		if self.verbose:
+			print("\t",len(population)-len(unevaluated),"individuals reused memoized fitnesses")
+		return evaluation
+
+	def __evaluate_population(self, population, memoized=True, steps=None):
 		r"""Placeholder fitness evaluation function, should be replaced by user created function to determine fitness
 		:type population: list
 		:param population: The current GA population
+		:type memoized: boolean
+		:param memoized: Reuse memoized fitnesses if fitness memoization is enabled. Defaults to True
+		:type steps: uint
+		:param steps: Simulate a shortened number of steps for a partial fitness, which is never memoized. Defaults to the steps of the evaluation experiment
 		"""
+		if not steps==None and not self.evaluator_experiment==None and self.pool_evaluator==None:
+			#Temporarily shorten the evaluation experiment
+			full_steps = self.evaluator_experiment.steps
+			self.evaluator_experiment.setSimulationSteps(steps)
+			try:
+				return self.__evaluate_population(population, False)
+			finally:
+				self.evaluator_experiment.setSimulationSteps(full_steps)
+		if memoized and self.memoize_fitness and steps==None:
+			return self.__evaluate_population_memoized(population)
 		n = len(population)
 		evaluation = [0.0]*n
+		if not self.pool_evaluator==None:
+			return self.__evaluate_population_pool(population, steps)
 		if not self.evaluator_experiment==None:
+			if self.batch_evaluation:
+				return self.__evaluate_population_batch(population)
 			for i in range(n):
 				individual = population[i].items();
 				for item in individual:
-					if not item[0]=='chromsome_id':
+					if not item[0]=='chromosome_id':
 						if type(population[i][item[0]])==type(int()):
 							self.evaluator_experiment.generator.setGlobalInt(item[0],population[i][item[0]]);
 						else:
@@ -583,14 +1805,169 @@ class Search(object):
 				# self.evaluator_experiment.generator.setGlobalInt("PREDATOR_POPULATION_TO_GENERATE", individual[1][1]);
 				# self.evaluator_experiment.generator.setGlobalInt("GRASS_POPULATION_TO_GENERATE", individual[2][1]);
 				self.evaluator_experiment.begin();
-				log = self.evaluator_experiment.sim_log;
-				final_log = log.getExitLog()
-				fitness_log = final_log.getEnvironmentPropertyArrayFloat("fitnesses")
-				evaluation[i] = (0.001*fitness_log[0])+(0.01*fitness_log[1])-(0.00001*fitness_log[2])
+				fitness_log = self.evaluator_experiment.fitnessComponents()[0]
+				evaluation[i] = self.__apply_fitness(fitness_log, population[i])
 				if self.verbose:
 					print("\t individual",population[i]["chromosome_id"],"evaluated")
 		return evaluation
 
+	def __evaluate_population_batch(self, population):
+		r"""Evaluates the whole GA population as one ensemble launch of the evaluation experiment, with the genes of each individual applied to its own run plan
+		:type population: list
+		:param population: The current GA population
+		"""
+		n = len(population)
+		evaluation = [0.0]*n
+		if n==0:
+			return evaluation
+		self.evaluator_experiment.beginBatch(population);
+		fitness_logs = self.evaluator_experiment.fitnessComponents();
+		for i in range(n):
+			evaluation[i] = self.__apply_fitness(fitness_logs[i], population[i])
+		if self.verbose:
+			print("\t",n,"individuals evaluated in a single ensemble")
+		return evaluation
+
+	def __evaluate_population_pool(self, population, steps=None):
+		r"""Evaluates the GA population across the process pool evaluator, sending each worker only the parameter values of an individual
+		:type population: list
+		:param population: The current GA population
+		:type steps: uint
+		:param steps: Number of simulation steps, defaults to the steps of each worker's experiment
+		"""
+		parameter_names = list(self.parameter_limits.keys())
+		self.pool_evaluator.start(parameter_names)
+		parameter_vectors = [tuple(individual[name] for name in parameter_names) for individual in population]
+		fitnesses = self.pool_evaluator.evaluate(parameter_vectors, steps)
+		if self.verbose:
+			print("\t",len(population),"individuals evaluated by",self.pool_evaluator.workers,"pool workers")
+		return [self.__apply_fitness(fitnesses[i], population[i]) for i in range(len(population))]
+
+	def __fitness_components(self, individual):
+		r"""The remembered fitness components of an evaluated GA individual, None if they are not known
+		:type individual: dict
+		:param individual: The evaluated GA individual
+		"""
+		if self.chromosome_evaluations==None or not individual["chromosome_id"] in self.chromosome_evaluations:
+			return None
+		return self.chromosome_evaluations[individual["chromosome_id"]][0]
+
+	def __reuse_fitness(self, key, individual):
+		r"""Applies the memoized fitness of a chromosome to a GA individual, marking the chromosome as most recently used
+		:type key: tuple
+		:param key: Canonical form of the chromosome
+		:type individual: dict
+		:param individual: The GA individual with a previously evaluated chromosome
+		"""
+		self.fitness_cache.move_to_end(key)
+		fitness_log, fitness = self.fitness_cache[key]
+		if not fitness_log==None:
+			self.__record_evaluation(individual, fitness_log)
+		return fitness
+
+	def __remember_fitness(self, key, fitness_log, fitness):
+		r"""Memoizes the fitness of a chromosome, evicting the least recently used chromosomes beyond the cache size
+		:type key: tuple
+		:param key: Canonical form of the chromosome
+		:type fitness_log: list
+		:param fitness_log: The fitness components of the chromosome, None if they are not known
+		:type fitness: float
+		:param fitness: The evaluated fitness
+		"""
+		self.fitness_cache[key] = (fitness_log, fitness)
+		self.fitness_cache.move_to_end(key)
+		while len(self.fitness_cache)>self.fitness_cache_size:
+			self.fitness_cache.popitem(last=False)
+
+	def __create_offspring(self, population):
+		r"""Creates and mutates a single GA offspring, either randomly initialised or by crossover of two selected parents
+		:type population: list
+		:param population: The current GA population
+		"""
+		global toolbox
+		mate_chance = random.uniform(0,1)
+		if mate_chance<self.random_initialisation_chance:
+			child = toolbox.individual()
+		else:
+			parent1, parent2 = [toolbox.clone(x) for x in toolbox.select_parents(population)]
+			child = toolbox.mate(creator.Individual, parent1, parent2)
+		child, = toolbox.mutate(child)
+		return child
+
+	def __dispatch_offspring(self, population):
+		r"""Creates a new GA offspring and dispatches it for evaluation. Without a pool evaluator the offspring is evaluated immediately
+		:type population: list
+		:param population: The current GA population
+		"""
+		child = self.__create_offspring(population)
+		self.steady_state_in_flight += 1
+		if self.pool_evaluator==None:
+			self.steady_state_completed.append((child, self.__evaluate_population([child])[0]))
+			return
+		if self.memoize_fitness:
+			key = self.__chromosome_key(child)
+			if key in self.fitness_cache:
+				self.fitness_cache_hits += 1
+				self.steady_state_completed.append((child, self.__reuse_fitness(key, child)))
+				return
+			self.fitness_cache_misses += 1
+		self.pool_evaluator.submit(tuple(child[name] for name in self.parameter_limits.keys()), child)
+
+	def __collect_offspring(self):
+		r"""Blocks until any dispatched GA offspring has been evaluated
+		:rtype: tuple
+		:return: The evaluated offspring and its fitness
+		"""
+		if len(self.steady_state_completed)>0:
+			child, fitness = self.steady_state_completed.popleft()
+		else:
+			child, fitness_log = self.pool_evaluator.completed()
+			fitness = self.__apply_fitness(fitness_log, child)
+			if self.memoize_fitness:
+				self.__remember_fitness(self.__chromosome_key(child), tuple(fitness_log), fitness)
+		self.steady_state_in_flight -= 1
+		return child, fitness
+
+	def __record_population(self, generation, population):
+		r"""Appends a record of every individual of the GA population to the result store, creating the store once the number of fitness components is known
+		:type generation: uint
+		:param generation: The current GA generation
+		:type population: list
+		:param population: The current GA population
+		"""
+		gene_names = list(self.parameter_limits.keys())
+		if self.results==None:
+			components = [self.__fitness_components(p) for p in population]
+			components = max([len(c) for c in components if not c==None]+[0])
+			self.results = ResultStore(self.results_path, gene_names, components)
+		for p in population:
+			fitness_log, wallclock = self.chromosome_evaluations.get(p["chromosome_id"], (None, float("nan")))
+			if fitness_log==None or not len(fitness_log)==self.results.components:
+				fitness_log = [float("nan")]*self.results.components
+			parent_ids = self.chromosome_parents.get(p["chromosome_id"], (-1,-1))
+			replicates, standard_error = self.chromosome_replicates.get(p["chromosome_id"], (1, float("nan")))
+			self.results.append(generation, p["chromosome_id"], [p[name] for name in gene_names], p.fitness.values[0], fitness_log, wallclock, parent_ids, replicates, standard_error)
+		self.results.flush()
+
+	def __steady_state_generation(self, population):
+		r"""Performs lambda asynchronous steady state (mu+1) replacements. Each completed offspring immediately competes for a place in the population, favouring the offspring in the event of equal fitness values, and a new offspring is dispatched to the freed evaluator
+		:type population: list
+		:param population: The current GA population
+		"""
+		workers = 1
+		if not self.pool_evaluator==None:
+			self.pool_evaluator.start(list(self.parameter_limits.keys()))
+			workers = self.pool_evaluator.workers
+		offspring = []
+		while len(offspring)<self.lamda:
+			while self.steady_state_in_flight<workers:
+				self.__dispatch_offspring(population)
+			child, fitness = self.__collect_offspring()
+			child.fitness.values = (fitness,)
+			offspring.append(child)
+			population, new_individuals = self.__favour_offspring(population, [child], self.mu)
+		return population, offspring
+
 	def __mate(self, container, parent1, parent2):
 		r"""A function for crossover between 2 GA individuals (many are available in deap if individuals are in bitstring form)
 		:type parent1: list
@@ -606,6 +1983,8 @@ class Search(object):
 		child = parent1.copy();
 		child["chromosome_id"] = int(self.ga_individual_id)
 		self.ga_individual_id += 1
+		if not self.chromosome_parents==None:
+			self.chromosome_parents[child["chromosome_id"]] = (int(parent1["chromosome_id"]), int(parent2["chromosome_id"]))
 		child_items = child.items();
 		if p1!=p2:
 			print("Parents don't contain the same number of elements somehow",parent1,parent2)
@@ -637,7 +2016,8 @@ class Search(object):
 		#print(individual)
 		individual_items = individual.items();
 		for item in individual_items:
-			if count in ch:
+			#The chromosome_id identifies the individual and is never mutated
+			if count in ch and not item[0]=='chromosome_id':
 				if type(individual[item[0]])==type(int()):
 					individual[item[0]] += individual[item[0]]+int(individual[item[0]]*random.uniform(-self.mutation_rate,self.mutation_rate));
 				if type(individual[item[0]])==type(float()):
@@ -663,9 +2043,19 @@ class Search(object):
 			parents = [random.choice(population) for i in range(2)]
 		return [toolbox.clone(ind) for ind in parents]
 
-	def GA(self):
-		r"""Genetic algorithm setup and runner based on current internal values. User should set all values and functions before the call to GA"""
+	def GA(self, resume=None):
+		r"""Genetic algorithm setup and runner based on current internal values. User should set all values and functions before the call to GA
+		:type resume: string
+		:param resume: Path of a checkpoint to continue the GA from, with the same values and functions set as when the checkpoint was written. Checkpoints continue to be written to it unless another checkpoint path is set.
+			Resuming is only exact for a generational GA, offspring still being evaluated by a steady state GA or an evaluation pool when the checkpoint was written are not checkpointed, so are lost and replaced by new offspring"""
 		global statistics, toolbox
+		if self.steady_state:
+			#These evaluate a whole generation of offspring together, which steady state evaluation never has
+			generational = [name for name, enabled in [("setMultiFidelity", not self.fidelity_schedule==None), ("setReplicateRacing", self.racing), ("setSurrogateScreening", not self.surrogate==None)] if enabled]
+			if len(generational)>0:
+				raise ValueError("Steady state GA cannot be combined with "+", ".join(generational))
+		if not resume==None and self.checkpoint_path==None:
+			self.checkpoint_path = resume
 		if not os.path.exists(self.cwd+"ga_temp/"):
 			os.mkdir(self.cwd+"ga_temp/")
 		working_directory = self.cwd+"ga_temp/"
@@ -684,50 +2074,107 @@ class Search(object):
 			statistics.register(s,statmethod)
 		logbook = tools.Logbook()
 		logbook.header = ['generation', 'evaluations'] + (statistics.fields if statistics else [])
+		if self.memoize_fitness:
+			logbook.header += ['cache_hits', 'cache_misses']
+		if not self.fidelity_schedule==None:
+			logbook.header += ["evaluations_"+str(steps) for steps in self.fidelity_schedule]+["evaluations_full"]
+		if self.racing:
+			logbook.header += ['replicates']
+		if not self.surrogate==None:
+			logbook.header += ['screened']
+		self.surrogate_X = None
+		self.surrogate_Y = None
+		self.surrogate_screened = 0
+		self.racing_replicates = 0
+		self.chromosome_replicates = {}
+		self.fidelity_evaluations = None
+		self.logbook = logbook
+		#Memoized fitnesses are only reused within a single GA run
+		self.fitness_cache = collections.OrderedDict()
+		self.fitness_cache_hits = 0
+		self.fitness_cache_misses = 0
+		self.steady_state_in_flight = 0
+		self.steady_state_completed = collections.deque()
+		#Fitness components, evaluation times and crossover parents of each chromosome, recorded in the result store
+		self.results = None
+		self.chromosome_evaluations = {}
+		self.chromosome_parents = {}
 		toolbox.register("select_parents", self.__select_parents)
 		toolbox.register("mutate",self.__mutate)
 		toolbox.register("mate",self.__mate)
 
 		current_generation = 0
-		#Initialise a population of mu individuals
-		population = toolbox.population(n=self.mu)
-		start_time = datetime.datetime.now()
-		if (self.verbose):
-			print("Initial population evalauation (Generation 0)")
-		#Evaluate initial population
-		initial_fitnesses = self.__evaluate_population(population);
-		#if (self.verbose):
-			#print("initial_fitnesses",initial_fitnesses)
-		candidates_evaluated = self.mu
-		#Record results per GA in file named the same the current seed being used for the random module
-		unique_run_seed = random.randrange(sys.maxsize)
-		seed_record = working_directory+str(unique_run_seed)+".csv"
-		if os.path.exists(seed_record):
-			seed_record = working_directory+str(unique_run_seed)+"(1).csv"
-			population_record = open(seed_record,"w")
+		optimal_solutions = []
+		optimal_count = 0
+		if not resume==None:
+			#Continue from the GA state of the checkpoint, discarding anything recorded after it was written
+			state = self.__load_checkpoint(resume)
+			population = state["population"]
+			logbook = state["logbook"]
+			self.logbook = logbook
+			current_generation = state["generation"]
+			candidates_evaluated = state["candidates_evaluated"]
+			unique_run_seed = state["unique_run_seed"]
+			seed_record = state["seed_record"]
+			optimal_solutions = state["optimal_solutions"]
+			optimal_count = state["optimal_count"]
+			start_time = datetime.datetime.now()-datetime.timedelta(seconds=state["time_taken"])
+			self.start_time = start_time
+			if os.path.exists(seed_record):
+				os.truncate(seed_record, state["seed_record_size"])
+			if not self.results_path==None and os.path.exists(self.results_path):
+				self.results = ResultStore(self.results_path)
+				self.results.truncate(state["results_records"])
 		else:
-			population_record = open(seed_record,"a")
-		population_record.write("SimulationGA,generation,0,mu,"+str(self.mu)+",lambda,"+str(self.lamda)+"\n")
-		#Set population fitness to evaluated fitness
-		for i in range(len(initial_fitnesses)):
-			population[i].fitness.values = (initial_fitnesses[i],)
-			population_record.write("\tChromosome_ID,")
-			population_record.write(str(int(population[i]["chromosome_id"]))+",")
-			population_record.write("Parameters,")
-			for j in population[i].items():
-				if not j[0]=="chromosome_id":
-					value = str(int(j[1])) if type(j[1])==type(int()) else str(j[1])
-					population_record.write(value+",")
-			population_record.write("Fitness,"+str(population[i].fitness.values[0])+"\n")
-		population_record.close()
-		#Record initial population in the logbook
-		self.__log(logbook, population, current_generation, self.mu)
+			#Initialise a population of mu individuals
+			population = toolbox.population(n=self.mu)
+			start_time = datetime.datetime.now()
+			self.start_time = start_time
+			if (self.verbose):
+				print("Initial population evalauation (Generation 0)")
+			#Evaluate initial population
+			initial_fitnesses = self.__evaluate_candidates(population, []);
+			self.__count_fidelity(None, len(population))
+			#if (self.verbose):
+				#print("initial_fitnesses",initial_fitnesses)
+			candidates_evaluated = self.mu
+			#Record results per GA in file named the same the current seed being used for the random module
+			unique_run_seed = random.randrange(sys.maxsize)
+			seed_record = working_directory+str(unique_run_seed)+".csv"
+			if os.path.exists(seed_record):
+				seed_record = working_directory+str(unique_run_seed)+"(1).csv"
+				population_record = open(seed_record,"w")
+			else:
+				population_record = open(seed_record,"a")
+			population_record.write("SimulationGA,generation,0,mu,"+str(self.mu)+",lambda,"+str(self.lamda)+"\n")
+			#Set population fitness to evaluated fitness
+			for i in range(len(initial_fitnesses)):
+				population[i].fitness.values = (initial_fitnesses[i],)
+				population_record.write("\tChromosome_ID,")
+				population_record.write(str(int(population[i]["chromosome_id"]))+",")
+				population_record.write("Parameters,")
+				for j in population[i].items():
+					if not j[0]=="chromosome_id":
+						value = str(int(j[1])) if type(j[1])==type(int()) else str(j[1])
+						population_record.write(value+",")
+				population_record.write("Fitness,"+str(population[i].fitness.values[0])+"\n")
+			population_record.close()
+			if self.result_store:
+				self.results_path = working_directory+os.path.splitext(os.path.basename(seed_record))[0]+".results/"
+				self.__record_population(current_generation, population)
+			self.__train_surrogate(population)
+			#Record initial population in the logbook
+			self.__log(logbook, population, current_generation, self.mu)
 		if (self.verbose):
 			print("begin GA");
 		#Begin generational GA process
-		end_conditions = False
-		optimal_solutions = []
-		optimal_count = 0
+		end_conditions = current_generation>=self.max_generations
+		self.checkpoint_time = datetime.datetime.now()
+		#Resuming a finished GA runs no generations
+		end_time = datetime.datetime.now()
+		time_taken = (end_time-start_time).total_seconds();
+		if resume==None:
+			self.__save_checkpoint(population, logbook, current_generation, candidates_evaluated, unique_run_seed, seed_record, 0.0, optimal_solutions, optimal_count)
 		while(not end_conditions):
 			current_generation += 1
 			if (self.verbose):
@@ -738,28 +2185,44 @@ class Search(object):
 			population_record = open(seed_record, "a")
 			population_record.write("SimulationGA,generation,"+str(current_generation)+"\n")
 			population_record.close()
-			#Generate offspring candidates. If crossover is being used, it is done before mutation
-			for i in range(self.lamda):
-				mate_chance = random.uniform(0,1)
-				if mate_chance<self.random_initialisation_chance:
-					child = toolbox.individual()
+			if self.steady_state:
+				#Insert each offspring as soon as its evaluation completes, recording a generation every lambda evaluations
+				population, offspring = self.__steady_state_generation(population)
+				generational_evaluations += len(offspring)
+			else:
+				#Generate offspring candidates. If crossover is being used, it is done before mutation
+				candidates = self.lamda
+				if self.__surrogate_ready():
+					#Create more candidates than are simulated, to be screened by the surrogate
+					candidates = self.surrogate_factor*self.lamda
+				for i in range(candidates):
+					mate_chance = random.uniform(0,1)
+					if mate_chance<self.random_initialisation_chance:
+						child = toolbox.individual()
+					else:
+						parent1, parent2 = [toolbox.clone(x) for x in toolbox.select_parents(population)]
+						#print("parent1",parent1)
+						child = toolbox.mate(creator.Individual, parent1, parent2)
+						#print("child",child)
+					offspring += [child]
+				#Mutate new candidates
+				for off in offspring:
+					#print("mutating",off)
+					off, = toolbox.mutate(off)
+				if len(offspring)>self.lamda:
+					offspring = self.__screen_offspring(offspring)
+				generational_evaluations += len(offspring)
+				if self.fidelity_schedule==None:
+					evaluations = self.__evaluate_candidates(offspring, population);
 				else:
-					parent1, parent2 = [toolbox.clone(x) for x in toolbox.select_parents(population)]
-					#print("parent1",parent1)
-					child = toolbox.mate(creator.Individual, parent1, parent2)
-					#print("child",child)
-				offspring += [child]
-			#Mutate new candidates
-			for off in offspring:
-				#print("mutating",off)
-				off, = toolbox.mutate(off)
-			generational_evaluations += len(offspring)
-			evaluations = self.__evaluate_population(offspring);
-			for i in range(len(evaluations)):
-				offspring[i].fitness.values = (evaluations[i],)
+					#Only offspring promoted through every fidelity have a full length fitness and compete for selection
+					offspring, evaluations = self.__evaluate_offspring_multifidelity(offspring, population)
+				for i in range(len(evaluations)):
+					offspring[i].fitness.values = (evaluations[i],)
+				self.__train_surrogate(offspring)
+				#Select the next generation, favouring the offspring in the event of equal fitness values
+				population, new_individuals = self.__favour_offspring(population, offspring, self.mu)
 			candidates_evaluated += generational_evaluations
-			#Select the next generation, favouring the offspring in the event of equal fitness values
-			population, new_individuals = self.__favour_offspring(population, offspring, self.mu)
 			#Print a report about the current generation
 			if generational_evaluations>0:
 				self.__log(logbook, population, current_generation, generational_evaluations)
@@ -784,6 +2247,8 @@ class Search(object):
 					# if not any(check_nonunique):
 					# 	optimal_solutions.append((p,current_generation))
 			population_record.close()
+			if self.result_store:
+				self.__record_population(current_generation, population)
 			end_time = datetime.datetime.now()
 			time_taken = (end_time-start_time).total_seconds();
 			minutes_taken = (int)(time_taken/60.0);
@@ -796,7 +2261,12 @@ class Search(object):
 					opt.write("SimulationGAseed,"+str(unique_run_seed)+",Solution_Parameters,"+str(b[0][0].tolist())+",Fitness,"+str(b[0].fitness.values)+",Discovered_Generation,"+str(b[1])+",Discovered_Time,"+str(end_time)+"\n")
 				opt.close()
 			optimal_count = len(optimal_solutions)
+			if self.__checkpoint_due(current_generation, end_time) or end_conditions:
+				self.__save_checkpoint(population, logbook, current_generation, candidates_evaluated, unique_run_seed, seed_record, time_taken, optimal_solutions, optimal_count)
 
+		#Wait for any steady state offspring still being evaluated, their results are discarded
+		while self.steady_state_in_flight>0:
+			self.__collect_offspring()
 		#Record GA results
 		if not os.path.exists(self.cwd+self.output_file):
 			results_file = open(self.cwd+self.output_file,"w")
@@ -807,4 +2277,127 @@ class Search(object):
 			open(self.cwd+"search_times.csv","w").close()
 		time = open(self.cwd+"search_times.csv","a")
 		time.write("ga_seed,"+str(unique_run_seed)+",started_at,"+str(start_time)+",ended_at,"+str(end_time)+",total_time,"+str(time_taken)+"\n")
-		time.close()
\ No newline at end of file
+		time.close()
+
+def findRTCSources(namespace):
+	r"""Finds the RTC agent function sources defined as strings within a namespace, e.g. vars() of an imported model script
+	:type namespace: dict
+	:param namespace: Names and values to search for RTC agent function sources
+	:rtype: dict
+	:return: RTC source of each agent function, keyed by the function name declared in its FLAMEGPU_AGENT_FUNCTION"""
+	rtc_sources = {};
+	for value in namespace.values():
+		if type(value)==type(''):
+			declaration = re.search(r"^FLAMEGPU_AGENT_FUNCTION\(\s*(\w+)\s*,", value, re.MULTILINE);
+			if not declaration==None:
+				rtc_sources[declaration.group(1)] = value;
+	return rtc_sources
+
+def compile_model(model):
+	r"""Default compile step of an RTCCacheWarmup. Initialising a simulation of the model on its device compiles every RTC agent function into the on-disk JIT cache, or loads it from the cache if already present.
+	Creating the simulation alone compiles nothing, RTC functions are only compiled once the simulation is configured, stepped or given a population
+	:type model: py:class:`pyflamegpu.ModelDescription`
+	:param model: FLAME-GPU2 model
+	:rtype: float
+	:return: Elapsed time initialising the simulation, including device initialisation, which RTC compilation dominates on a cache miss"""
+	simulation = pyflamegpu.CUDASimulation(model);
+	start = time.perf_counter();
+	simulation.applyConfig();
+	return time.perf_counter()-start
+
+class RTCCacheWarmup(object):
+	r"""This class pre-compiles the RTC agent functions of a FLAME-GPU2 model into the on-disk JIT cache ahead of a search, so that fresh GA processes load rather than compile them. A manifest of the source hashes warmed is kept alongside the cache to report per-function cache hits and misses.
+	The JIT cache is not exposed to Python, so cache hits and misses are inferred from the manifest and whether the compile step wrote to the cache, and compile times are only measured per function if the compile step reports them"""
+
+	#Register default internal values
+	cache_directory = None;
+	manifest_file = "rtc_warmup_manifest.json";
+	compile = None;
+	verbose = False;
+
+	def __init__(self, cache_directory=None, compile=compile_model):
+		r"""
+		:type cache_directory: string
+		:param cache_directory: Location of the JIT cache. Defaults to the FLAMEGPU2_TMP_DIR (or system temporary) fgpu2/jitifycache directory used by FLAME-GPU2
+		:type compile: function
+		:param compile: Function called as compile(model) which compiles every RTC function of the model. Returns the total compile time in seconds, or a dictionary of compile time per function name
+		"""
+		if cache_directory==None:
+			tmp = os.environ["FLAMEGPU2_TMP_DIR"] if "FLAMEGPU2_TMP_DIR" in os.environ else tempfile.gettempdir();
+			cache_directory = os.path.join(tmp, "fgpu2", "jitifycache");
+		self.cache_directory = cache_directory;
+		self.compile = compile;
+
+	def sourceHash(self, source):
+		r"""Hash identifying an RTC agent function source
+		:type source: string
+		:param source: RTC agent function source"""
+		return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+	def __cacheFiles(self):
+		if not os.path.exists(self.cache_directory):
+			return set()
+		return set(f for f in os.listdir(self.cache_directory) if not f==self.manifest_file)
+
+	def __loadManifest(self):
+		manifest = os.path.join(self.cache_directory, self.manifest_file);
+		if not os.path.exists(manifest):
+			return {}
+		with open(manifest, "r") as f:
+			return json.load(f)
+
+	def __saveManifest(self, warmed):
+		if not os.path.exists(self.cache_directory):
+			os.makedirs(self.cache_directory);
+		manifest = os.path.join(self.cache_directory, self.manifest_file);
+		with open(manifest+".tmp", "w") as f:
+			json.dump(warmed, f, indent=1, sort_keys=True);
+		os.replace(manifest+".tmp", manifest);
+
+	def warmup(self, model, rtc_sources, model_name=None):
+		r"""Compile every RTC agent function of a model into the JIT cache
+		:type model: py:class:`pyflamegpu.ModelDescription`
+		:param model: FLAME-GPU2 model
+		:type rtc_sources: dict
+		:param rtc_sources: RTC source of each agent function of the model keyed by function name, see findRTCSources
+		:type model_name: string
+		:param model_name: Name of the model within the report and manifest
+		:rtype: list
+		:return: One report entry per function with its model, function name, source hash, cache status ('hit' or 'miss'), compile time in seconds and whether the compile time is estimated.
+			If the compile step only reports a total, the compile times are estimates dividing it evenly between the functions which missed the cache"""
+		model_name = "model" if model_name==None else model_name;
+		warmed = self.__loadManifest();
+		previous = warmed[model_name] if model_name in warmed else {};
+		hashes = dict((name, self.sourceHash(source)) for name, source in rtc_sources.items());
+		cache_files = self.__cacheFiles();
+		if (self.verbose):
+			print("Warming RTC cache for", model_name, "with", len(hashes), "functions in", self.cache_directory);
+		start = time.perf_counter();
+		compile_times = self.compile(model);
+		total_time = time.perf_counter()-start if compile_times==None else compile_times;
+		estimated = not type(total_time)==type({});
+		#Nothing was written to the cache, so every function was loaded from it
+		compiled = len(self.__cacheFiles()-cache_files)>0;
+		status = dict((name, 'miss' if compiled and not (name in previous and previous[name]==hashes[name]) else 'hit') for name in hashes);
+		misses = [name for name in status if status[name]=='miss'];
+		report = [];
+		for name in sorted(hashes):
+			if not estimated:
+				compile_time = total_time[name] if name in total_time else 0.0;
+			else:
+				compile_time = total_time/len(misses) if status[name]=='miss' else 0.0;
+			report.append({"model":model_name, "function":name, "source_hash":hashes[name], "cache":status[name], "compile_time":compile_time, "estimated":estimated});
+		warmed[model_name] = hashes;
+		self.__saveManifest(warmed);
+		return report
+
+	def formatReport(self, report):
+		r"""Formats a warmup report as comma separated lines, one per function. Compile times which are estimated rather than measured per function are labelled 'estimated'
+		:type report: list
+		:param report: Report returned by warmup"""
+		lines = ["model,function,source_hash,cache,compile_time,timing"];
+		for entry in report:
+			lines.append(",".join([entry["model"], entry["function"], entry["source_hash"], entry["cache"], "%.6f"%(entry["compile_time"]), "estimated" if entry["estimated"] else "measured"]));
+		hits = len([entry for entry in report if entry["cache"]=='hit']);
+		lines.append("functions,"+str(len(report))+",cache_hits,"+str(hits)+",cache_misses,"+str(len(report)-hits)+",compile_time,"+"%.6f"%(sum(entry["compile_time"] for entry in report)));
+		return "\n".join(lines)
@@ -0,0 +1,98 @@
+import os
+import warnings
+import numpy as np
+from multiprocessing import shared_memory
+
+#Loading of the batch simulation data used to train surrogate models. Each line of batch_simulation_data.csv holds the seed, the 8 model
+#parameters, an unused column and the primary, secondary and tertiary fitnesses. Header lines start with "Seed" and timing lines with "time_taken"
+
+GENE_COLUMNS = [1,2,3,4,5,6,7,8]
+FITNESS_COLUMNS = [10,11,12]
+SKIPPED_LINES = ["Seed","time_taken"]
+
+#Parse a batch simulation data file into float32 arrays of parameters X (n,8) and fitnesses Y (n,3), skipping header and timing lines
+def parse_batch_data(path):
+    with warnings.catch_warnings():
+        #An empty file is an empty data set
+        warnings.simplefilter("ignore",UserWarning)
+        data = np.loadtxt(path,delimiter=",",comments=SKIPPED_LINES,usecols=GENE_COLUMNS+FITNESS_COLUMNS,dtype=np.float64,ndmin=2)
+    X = np.ascontiguousarray(data[:,:len(GENE_COLUMNS)],dtype=np.float32)
+    Y = np.ascontiguousarray(data[:,len(GENE_COLUMNS):],dtype=np.float32)
+    return X,Y
+
+#Locations of the cached arrays of a batch simulation data file, keyed by the size and modification time of the file so a rewritten file is parsed again
+def batch_data_cache_paths(path):
+    st = os.stat(path)
+    key = str(st.st_size)+"_"+str(st.st_mtime_ns)
+    cache_dir = path+".cache/"
+    return cache_dir,cache_dir+key+"_X.npy",cache_dir+key+"_Y.npy"
+
+#Save an array without leaving a partial file behind if interrupted
+def save_array(path,a):
+    tmp = path+".tmp.npy"
+    np.save(tmp,a)
+    os.replace(tmp,path)
+
+#Load the parameters and fitnesses of a batch simulation data file, parsing it once and caching the parsed arrays as .npy files alongside it.
+#Later loads of an unchanged file memory map the cached arrays (read only) unless mmap is False
+def load_batch_data(path,cache=True,mmap=True):
+    if not cache:
+        return parse_batch_data(path)
+    cache_dir,x_path,y_path = batch_data_cache_paths(path)
+    if not (os.path.exists(x_path) and os.path.exists(y_path)):
+        X,Y = parse_batch_data(path)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        #Remove the arrays cached for previous versions of the file
+        for f in os.listdir(cache_dir):
+            if f.endswith(".npy"):
+                os.remove(cache_dir+f)
+        save_array(y_path,Y)
+        save_array(x_path,X)
+    mmap_mode = "r" if mmap else None
+    return np.load(x_path,mmap_mode=mmap_mode),np.load(y_path,mmap_mode=mmap_mode)
+
+#Batch simulation data loaded once for a surrogate training sweep. The parameters and fitnesses of every example are held in a single shuffled
+#buffer, with the example's position in the shuffled order appended to both (as used to match examples after resampling). The training data of
+#each data size is the first examples of the shuffled order, so smaller data sets are nested in larger ones and are views of the buffer rather than copies.
+#A shared buffer is allocated in shared memory so worker processes can attach to it by name, and must be released with close
+class TrainingDataset(object):
+    def __init__(self, path, rng=None, cache=True, shared=False):
+        X,Y = load_batch_data(path,cache=cache)
+        self.genes = X.shape[1]
+        self.fitnesses = Y.shape[1]
+        self.rng = rng if rng is not None else np.random.default_rng()
+        #Parameters, index, fitnesses, index
+        shape = (len(X),self.genes+self.fitnesses+2)
+        self.shared_memory = None
+        if shared:
+            self.shared_memory = shared_memory.SharedMemory(create=True,size=max(int(np.prod(shape))*np.dtype(np.float32).itemsize,1))
+            self.data = np.ndarray(shape,dtype=np.float32,buffer=self.shared_memory.buf)
+        else:
+            self.data = np.empty(shape,dtype=np.float32)
+        self.data[:,:self.genes] = X
+        self.data[:,self.genes+1:-1] = Y
+        self.shuffle()
+
+    def __len__(self):
+        return len(self.data)
+
+    #Release the shared buffer. Subsample views of a shared buffer must not be used after it is closed
+    def close(self):
+        if self.shared_memory is not None:
+            self.data = None
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+
+    #Shuffle the examples in place, drawing new subsamples for every data size
+    def shuffle(self):
+        self.rng.shuffle(self.data)
+        index = np.arange(len(self.data),dtype=np.float32)
+        self.data[:,self.genes] = index
+        self.data[:,-1] = index
+
+    #Views of the parameters and fitnesses, each followed by the example index, of the first size examples of the shuffled data
+    def subsample(self, size):
+        size = min(size,len(self.data))
+        return self.data[:size,:self.genes+1],self.data[:size,self.genes+1:]
@@ -0,0 +1,54 @@
+import os
+import time
+import tempfile
+from simulation_scheduler import SlotScheduler
+from simulation_runner import generate_initial_state, simulate_initial_state
+
+#Benchmark of generating initial states ahead of the running simulations, against generating each initial state before its simulation, with fake
+#generator and simulator executables which each take the same time
+
+STAGE_SECONDS = 0.1
+ITEMS = 12
+DEPTHS = [0,1,2]
+
+FAKE_GENERATOR = """#!/bin/sh
+sleep %s
+echo "$2,$3,$4,$5,$6,$7,$8,$9" > "$1"
+"""
+
+FAKE_SIMULATOR = """#!/bin/sh
+sleep %s
+"""
+
+def fake_executable(path,script):
+    open(path,"w").write(script%STAGE_SECONDS)
+    os.chmod(path,0o755)
+    return [path]
+
+#Seconds taken to simulate the items on a single device, generating initial states up to depth items ahead of the running simulation
+def pipeline_time(generator,simulator,loc,items,depth):
+    def prepare(d,x,buffer,timeout):
+        path = loc+"initial_state_"+str(buffer)+".xml"
+        return path,generate_initial_state(generator,path,x,timeout)
+    def run(d,prepared,timeout):
+        path,returncode = prepared
+        return simulate_initial_state(simulator,path,d,timeout) if returncode==0 else returncode
+    start = time.perf_counter()
+    with SlotScheduler([0],run,prepare=prepare,depth=depth) as scheduler:
+        scheduler.map(items)
+    return time.perf_counter()-start
+
+def main():
+    loc = tempfile.mkdtemp()+"/"
+    generator = fake_executable(loc+"generator",FAKE_GENERATOR)
+    simulator = fake_executable(loc+"simulator",FAKE_SIMULATOR)
+    items = [[str(i)]+["1"]*7 for i in range(ITEMS)]
+    serial_time = None
+    for depth in DEPTHS:
+        t = pipeline_time(generator,simulator,loc,items,depth)
+        serial_time = t if serial_time is None else serial_time
+        #Generation and simulation take equal time, so overlapping them approaches twice the throughput
+        print("depth",depth,":",ITEMS,"simulations in",str(round(t,3))+"s, throughput gain",round(serial_time/t,2))
+
+if __name__ == "__main__":
+    main()
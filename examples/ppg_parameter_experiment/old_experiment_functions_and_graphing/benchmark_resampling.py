@@ -0,0 +1,47 @@
+import time
+import numpy as np
+from training_sweep import sample_data
+
+#Benchmark of resampling classifier training data by index, against recovering the fitnesses of each resampled example by matching its index to every example
+
+SIZES = [5000,50000,500000]
+QUADRATIC_SIZE = 5000
+POSITIVE_RATE = 0.2
+
+#Examples and fitnesses, each followed by the example index, with a positive primary fitness for a fraction of the examples
+def random_examples(rng,n):
+    index = np.arange(n,dtype=np.float64).reshape(-1,1)
+    X = np.hstack((rng.uniform(0.0,1.0,(n,8)),index))
+    Y = np.hstack(((rng.uniform(0.0,1.0,(n,1))<POSITIVE_RATE).astype(np.float64),index))
+    return X,Y
+
+#Matching of resampled examples to their fitnesses as previously performed by sample_data
+def quadratic_match(sx,Y):
+    sampled_X = []
+    sampled_Y = []
+    for i in sx:
+        for j in Y:
+            if i[-1]==j[-1]:
+                sampled_X.append(i)
+                sampled_Y.append(j)
+    return sampled_X,sampled_Y
+
+def main():
+    rng = np.random.default_rng(0)
+    for samp in ("undersample","oversample"):
+        X,Y = random_examples(rng,QUADRATIC_SIZE)
+        sx,sy = sample_data(X,Y,samp)
+        start = time.perf_counter()
+        quadratic_match(sx.tolist(),Y.tolist())
+        quadratic_time = time.perf_counter()-start
+        for n in SIZES:
+            X,Y = random_examples(rng,n)
+            start = time.perf_counter()
+            sx,sy = sample_data(X,Y,samp)
+            index_time = time.perf_counter()-start
+            #The matching loop compares every resampled example with every example, so its time grows with the square of the data size
+            estimate = quadratic_time*(n/QUADRATIC_SIZE)**2
+            print(samp,n,"examples:",len(sx),"resampled in",str(round(index_time*1000,3))+"ms, matching loop "+("" if n==QUADRATIC_SIZE else "(estimated) ")+str(round(estimate,3))+"s")
+
+if __name__ == "__main__":
+    main()
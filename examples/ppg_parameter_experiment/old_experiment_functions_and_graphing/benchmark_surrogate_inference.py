@@ -0,0 +1,67 @@
+import time
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.neural_network import MLPRegressor
+from surrogate_inference import surrogate_predict_population
+
+#Micro-benchmark of batched surrogate inference against predicting each individual of the population on its own
+
+POPULATION_SIZE = 100
+TRAINING_SAMPLES = 1000
+PARAMETERS = 8
+REPEATS = 20
+
+#Per individual surrogate inference, as previously performed by surrogate_evaluate_population
+def surrogate_predict_individuals(pop,networks,scalers):
+    predictions = []
+    for x in pop:
+        yvals = []
+        if len(networks)>1:
+            for i in range(len(networks)):
+                xcurr = scalers[i].transform(x[0][:-1].reshape(1,-1))
+                yvals.append(networks[i].predict(xcurr))
+        else:
+            xcurr = scalers[0].transform(x[0][:-1].reshape(1,-1))
+            yvals = networks[0].predict(xcurr)[0]
+        predictions.append(yvals)
+    return predictions
+
+#Population of individuals holding a single array of parameters followed by the chromosome id
+def random_population(rng,n):
+    return [[np.append(rng.uniform(0.0,1.0,PARAMETERS),float(i))] for i in range(n)]
+
+def train_networks(rng,outputs_per_network,network_count):
+    X = rng.uniform(0.0,1.0,(TRAINING_SAMPLES,PARAMETERS))
+    networks = []
+    scalers = []
+    for i in range(network_count):
+        scaler = StandardScaler().fit(X)
+        y = np.stack([np.sin(X[:,k:].sum(axis=1)*(i+1)) for k in range(outputs_per_network)],axis=1)
+        network = MLPRegressor(hidden_layer_sizes=(100,100),max_iter=20,random_state=i)
+        network.fit(scaler.transform(X),y[:,0] if outputs_per_network==1 else y)
+        networks.append(network)
+        scalers.append(scaler)
+    return networks,scalers
+
+def time_predictions(function,pop,networks,scalers):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        predictions = function(pop,networks,scalers)
+    return (time.perf_counter()-start)/REPEATS,predictions
+
+def max_difference(a,b):
+    return max(float(np.max(np.abs(np.asarray(x,dtype=np.float64)-np.asarray(y,dtype=np.float64)))) for x,y in zip(a,b))
+
+def main():
+    import warnings
+    from sklearn.exceptions import ConvergenceWarning
+    warnings.simplefilter("ignore",ConvergenceWarning)
+    rng = np.random.default_rng(0)
+    pop = random_population(rng,POPULATION_SIZE)
+    for name,(networks,scalers) in (("3 networks",train_networks(rng,1,3)),("1 network, 3 outputs",train_networks(rng,3,1))):
+        individual_time,individual_predictions = time_predictions(surrogate_predict_individuals,pop,networks,scalers)
+        batched_time,batched_predictions = time_predictions(surrogate_predict_population,pop,networks,scalers)
+        print(name+": per individual "+str(round(individual_time*1000,3))+"ms, batched "+str(round(batched_time*1000,3))+"ms, speedup "+str(round(individual_time/batched_time,1))+"x, max difference "+str(max_difference(individual_predictions,batched_predictions)))
+
+if __name__ == "__main__":
+    main()
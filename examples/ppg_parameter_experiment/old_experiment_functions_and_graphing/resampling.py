@@ -0,0 +1,35 @@
+import numpy as np
+
+#Class balanced resampling of training examples by index. Each function returns the indices of the selected examples, grouped by class in order
+#of class label, so the examples and any arrays aligned with them are resampled by indexing with the same indices
+
+#Randomly select examples of each class without replacement, down to the number of examples of the smallest class
+def undersample_indices(labels,rng):
+    labels = np.asarray(labels)
+    classes,counts = np.unique(labels,return_counts=True)
+    if len(classes)==0:
+        return np.empty(0,dtype=np.intp)
+    n = counts.min()
+    return np.concatenate([rng.choice(np.flatnonzero(labels==c),n,replace=False) for c in classes])
+
+#Keep every example and randomly duplicate examples of each smaller class, with replacement, up to the number of examples of the largest class
+def oversample_indices(labels,rng):
+    labels = np.asarray(labels)
+    classes,counts = np.unique(labels,return_counts=True)
+    if len(classes)==0:
+        return np.empty(0,dtype=np.intp)
+    n = counts.max()
+    selected = []
+    for c in classes:
+        members = np.flatnonzero(labels==c)
+        selected.append(members)
+        selected.append(rng.choice(members,n-len(members),replace=True))
+    return np.concatenate(selected)
+
+#Indices of the examples selected by resampling method samp ("undersample" or "oversample"), or of every example for any other method
+def resample_indices(labels,samp,rng):
+    if samp=="undersample":
+        return undersample_indices(labels,rng)
+    elif samp=="oversample":
+        return oversample_indices(labels,rng)
+    return np.arange(len(labels))
@@ -0,0 +1,118 @@
+import os
+import threading
+from simulation_scheduler import SlotScheduler
+
+#Description of the resources simulations are run on, as slots. Each CUDA device provides a number of slots (the concurrent runs per device),
+#or when CUDA reports no devices, each processor provides a slot. Devices are detected lazily, when slots are first required, so this module
+#and those using it can be imported on machines without a GPU or pycuda
+
+#Number of CUDA devices detected, or None if the devices could not be detected
+detected_gpus = None
+gpus_detected = False
+detection_lock = threading.Lock()
+
+#Detect the number of CUDA devices, which is None if they could not be detected, e.g. pycuda is not installed
+def detect_gpus():
+    global detected_gpus, gpus_detected
+    with detection_lock:
+        if not gpus_detected:
+            try:
+                import pycuda.driver as cuda
+                cuda.init()
+                detected_gpus = cuda.Device.count()
+            except Exception:
+                detected_gpus = None
+            gpus_detected = True
+    return detected_gpus
+
+#A slot simulations are run on: a concurrent run of a CUDA device, or a processor when device is None. Records the throughput of the slot over all schedulers
+class Slot(object):
+    def __init__(self, device, run):
+        self.device = device
+        self.run = run
+        #Name used for the slot's working directory. Single run devices are named by their device number
+        if device is None:
+            self.name = "cpu"+str(run)
+        elif run==0:
+            self.name = str(device)
+        else:
+            self.name = str(device)+"_"+str(run)
+        self.completed = 0
+        self.failed = 0
+        self.stolen = 0
+        self.busy_seconds = 0.0
+
+    def __repr__(self):
+        return "Slot("+self.name+")"
+
+    #Completed tasks per second spent running tasks
+    def throughput(self):
+        return self.completed/self.busy_seconds if self.busy_seconds>0 else 0.0
+
+SLOT_STATISTICS_HEADER = "slot,device,completed,failed,stolen,busy_seconds,throughput\n"
+
+#Slots of the available devices, each running runs_per_device simulations concurrently. Devices defaults to the number of CUDA devices detected,
+#and cpu_slots (used only when there are no devices) to the number of processors. If the devices could not be detected, simulations are run one
+#at a time on the default device
+class ResourcePool(object):
+    def __init__(self, devices=None, runs_per_device=1, cpu_slots=None):
+        self.devices = devices
+        self.runs_per_device = runs_per_device
+        self.cpu_slots = cpu_slots
+        self.slot_list = None
+        self.lock = threading.Lock()
+
+    #The slots of the pool, detecting the available devices on first use
+    def slots(self):
+        with self.lock:
+            if self.slot_list is None:
+                devices = self.devices if self.devices is not None else detect_gpus()
+                if devices is None:
+                    self.slot_list = [Slot(0,0)]
+                elif devices>0:
+                    self.slot_list = [Slot(d,r) for r in range(self.runs_per_device) for d in range(devices)]
+                else:
+                    self.slot_list = [Slot(None,r) for r in range(self.cpu_slots or os.cpu_count() or 1)]
+            return self.slot_list
+
+    #Scheduler running tasks on the slots of the pool with work stealing (see SlotScheduler), adding its statistics to the slots' once shut down
+    def scheduler(self, run, timeout=None, prepare=None, depth=1, deadline=None):
+        return PoolScheduler(self, run, timeout, prepare, depth, deadline)
+
+    #Run every item on the slots of the pool, returning their results in the order of the items
+    def map(self, run, items, timeout=None, prepare=None, depth=1):
+        with self.scheduler(run, timeout, prepare, depth) as scheduler:
+            return scheduler.map(items)
+
+    #Run items on the slots of the pool until the deadline (a datetime), returning the results of the items started, in the order of the items,
+    #and the items left unstarted
+    def map_until_deadline(self, run, items, deadline, timeout=None, prepare=None, depth=1):
+        with self.scheduler(run, timeout, prepare, depth, deadline) as scheduler:
+            return scheduler.map_until_deadline(items)
+
+    #Statistics of each slot as rows of slot name, device, tasks completed, tasks failed, tasks stolen, seconds busy and throughput
+    def statistics(self):
+        return [[s.name,s.device,s.completed,s.failed,s.stolen,s.busy_seconds,s.throughput()] for s in self.slots()]
+
+    #Write the statistics of each slot to a csv file
+    def write_statistics(self, path):
+        f = open(path,"w")
+        f.write(SLOT_STATISTICS_HEADER)
+        for row in self.statistics():
+            f.write(",".join(str(a) for a in row)+"\n")
+        f.close()
+
+class PoolScheduler(SlotScheduler):
+    def __init__(self, pool, run, timeout=None, prepare=None, depth=1, deadline=None):
+        self.pool = pool
+        SlotScheduler.__init__(self, pool.slots(), run, timeout, prepare, depth, deadline)
+
+    def shutdown(self, wait=True):
+        SlotScheduler.shutdown(self, wait)
+        if wait:
+            with self.pool.lock:
+                for i in range(len(self.slots)):
+                    self.slots[i].completed += self.completed[i]
+                    self.slots[i].failed += self.failed[i]
+                    self.slots[i].stolen += self.stolen[i]
+                    self.slots[i].busy_seconds += self.busy_seconds[i]
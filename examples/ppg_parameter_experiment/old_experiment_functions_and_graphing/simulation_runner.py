@@ -0,0 +1,27 @@
+import subprocess
+
+#Running of the initial state generator and simulation executables of the model as subprocesses, reporting their return codes
+
+#Return code of a command which could not be run, as returned by a shell for a missing executable
+COMMAND_NOT_RUN = 127
+
+#Run a command, returning its return code, None if it was stopped for exceeding the timeout in seconds, or COMMAND_NOT_RUN if it could not be
+#run, e.g. its executable is missing or not executable
+def run_command(command,timeout=None):
+    try:
+        return subprocess.run(command,timeout=timeout).returncode
+    except subprocess.TimeoutExpired:
+        print(" ".join(command),"exceeded",timeout,"seconds")
+        return None
+    except OSError as e:
+        print(" ".join(command),"could not be run:",e)
+        return COMMAND_NOT_RUN
+
+#Generate the initial state of parameter vector x as file path, with the generator executable (a command argument list)
+def generate_initial_state(generator,path,x,timeout=None):
+    return run_command(generator+[path]+[str(x[i]) for i in range(8)],timeout)
+
+#Simulate the initial state file path for a number of iterations on device d (or the default device if d is None), with the simulation executable (a command argument list)
+def simulate_initial_state(executable,path,d,timeout=None,iterations=1000):
+    device = [str(d)] if d is not None else []
+    return run_command(executable+[path,str(iterations)]+device,timeout)
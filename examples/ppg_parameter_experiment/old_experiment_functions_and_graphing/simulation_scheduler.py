@@ -0,0 +1,193 @@
+import queue
+import threading
+import time
+import datetime
+from collections import deque
+from concurrent.futures import Future, wait
+
+#Scheduling of simulations across device slots. Each slot (such as a GPU) is served by one worker thread. Submitted tasks are dealt to the slots'
+#queues in turn, and a worker whose queue is empty steals the most recently queued task of the slot with the most queued tasks, blocking rather than
+#polling while there is no work. The result of each task is delivered through a future
+
+#Sentinel instructing a worker to exit
+STOP = None
+
+#Cancel a task's future, notifying those waiting on it (a cancelled future is only reported done to concurrent.futures.wait once notified)
+def cancel(future):
+    future.cancel()
+    future.set_running_or_notify_cancel()
+
+#Runs tasks on a fixed set of slots. Each task is run by calling run(slot, item, timeout) on the worker thread of a slot, where timeout is the
+#per task timeout in seconds (or None) for run to enforce, for example as the timeout of the simulation process it starts.
+#If prepare is given, each item is first prepared by calling prepare(slot, item, buffer, timeout), and the prepared item is run in place of the item.
+#With a depth greater than 0 each slot prepares items on a second thread, up to depth items ahead of the item being run, so preparing the next items
+#(such as generating their initial states) overlaps running the current item. Buffer identifies which of the depth+1 buffers of the slot
+#(such as initial state files) the prepared item may use, and is not reused until the prepared item has been run.
+#If deadline (a datetime) is given, no task is started once it has passed: tasks already started (including those prepared) run to completion,
+#while queued tasks, and any submitted later, are cancelled.
+#The number of tasks completed and failed, the seconds spent preparing and running them and the number of tasks stolen are recorded for each slot
+class SlotScheduler(object):
+    def __init__(self, slots, run, timeout=None, prepare=None, depth=1, deadline=None):
+        self.slots = list(slots)
+        if len(self.slots)==0:
+            raise ValueError("SlotScheduler requires at least one slot")
+        self.run = run
+        self.timeout = timeout
+        self.prepare = prepare
+        self.depth = depth if prepare is not None else 0
+        self.deadline = deadline
+        self.queues = [deque() for slot in self.slots]
+        self.condition = threading.Condition()
+        self.next_queue = 0
+        self.stopping = False
+        self.completed = [0]*len(self.slots)
+        self.failed = [0]*len(self.slots)
+        self.stolen = [0]*len(self.slots)
+        self.busy_seconds = [0.0]*len(self.slots)
+        self.workers = []
+        for i in range(len(self.slots)):
+            if self.depth>0:
+                prepared = queue.Queue()
+                buffers = queue.Queue()
+                for b in range(self.depth+1):
+                    buffers.put(b)
+                self.start_worker(self.prepare_work, i, prepared, buffers)
+                self.start_worker(self.work, i, prepared, buffers)
+            else:
+                self.start_worker(self.work, i, None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+    def start_worker(self, target, *args):
+        worker = threading.Thread(target=target, args=args, daemon=True)
+        worker.start()
+        self.workers.append(worker)
+
+    #Whether the deadline has passed, in which case no more tasks are started
+    def expired(self):
+        return self.deadline is not None and datetime.datetime.now()>=self.deadline
+
+    #Cancel every queued task. Called holding the condition
+    def cancel_queued(self):
+        for q in self.queues:
+            while q:
+                future, item = q.popleft()
+                cancel(future)
+
+    #Take the next task of slot i from its own queue, or else steal one from another slot, waiting until there is a task or the scheduler stops.
+    #Once the deadline has passed the queued tasks are cancelled and the worker stops
+    def take(self, i):
+        with self.condition:
+            while True:
+                if self.expired():
+                    self.cancel_queued()
+                    return STOP
+                if self.queues[i]:
+                    return self.queues[i].popleft()
+                victim = max(range(len(self.queues)), key=lambda j: len(self.queues[j]))
+                if self.queues[victim]:
+                    self.stolen[i] += 1
+                    return self.queues[victim].pop()
+                if self.stopping:
+                    return STOP
+                self.condition.wait()
+
+    def record(self, i, seconds, failed):
+        with self.condition:
+            self.busy_seconds[i] += seconds
+            if failed:
+                self.failed[i] += 1
+            else:
+                self.completed[i] += 1
+
+    #Prepare tasks for slot i while it has a free buffer
+    def prepare_work(self, i, prepared, buffers):
+        slot = self.slots[i]
+        while True:
+            #Take a task only once it can be prepared, leaving the remaining tasks to other slots
+            buffer = buffers.get()
+            task = self.take(i)
+            if task is STOP:
+                prepared.put(STOP)
+                return
+            future, item = task
+            if not future.set_running_or_notify_cancel():
+                buffers.put(buffer)
+                continue
+            start = time.perf_counter()
+            try:
+                prepared.put((future, self.prepare(slot, item, buffer, self.timeout), buffer, time.perf_counter()-start))
+            except BaseException as e:
+                self.record(i, time.perf_counter()-start, True)
+                future.set_exception(e)
+                buffers.put(buffer)
+
+    #Run tasks on slot i, taking them from the slot's queue, or prepared tasks when buffers are given
+    def work(self, i, prepared, buffers):
+        slot = self.slots[i]
+        while True:
+            task = self.take(i) if buffers is None else prepared.get()
+            if task is STOP:
+                return
+            start = time.perf_counter()
+            if buffers is None:
+                future, item = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                preparation_seconds = 0.0
+            else:
+                future, item, buffer, preparation_seconds = task
+            try:
+                if buffers is None and self.prepare is not None:
+                    item = self.prepare(slot, item, 0, self.timeout)
+                result = self.run(slot, item, self.timeout)
+                self.record(i, preparation_seconds+time.perf_counter()-start, False)
+                future.set_result(result)
+            except BaseException as e:
+                self.record(i, preparation_seconds+time.perf_counter()-start, True)
+                future.set_exception(e)
+            finally:
+                if buffers is not None:
+                    buffers.put(buffer)
+
+    #Queue an item to be run, returning the future of its result, which is cancelled if the item is not started before the deadline
+    def submit(self, item):
+        future = Future()
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("cannot submit tasks after shutdown")
+            if self.expired():
+                cancel(future)
+                return future
+            self.queues[self.next_queue].append((future, item))
+            self.next_queue = (self.next_queue+1)%len(self.queues)
+            self.condition.notify_all()
+        return future
+
+    #Run every item, returning their results in the order of the items. Raises the exception of the first failed item, if any
+    def map(self, items):
+        futures = [self.submit(item) for item in items]
+        return [f.result() for f in futures]
+
+    #Run items until the deadline, returning the results of the items started, in the order of the items, and the items left unstarted at the
+    #deadline. Raises the exception of the first failed item, if any
+    def map_until_deadline(self, items):
+        futures = [self.submit(item) for item in items]
+        wait(futures)
+        results = [f.result() for f in futures if not f.cancelled()]
+        unstarted = [items[i] for i in range(len(items)) if futures[i].cancelled()]
+        return results, unstarted
+
+    #Stop the workers once all queued tasks have been run, waiting for them to exit if wait is True
+    def shutdown(self, wait=True):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if wait:
+            for worker in self.workers:
+                worker.join()
@@ -20,16 +20,12 @@ import sys
 import random
 import numpy as np
 import datetime
-import queue
-import threading
-import pycuda.driver as cuda
-import pycuda.autoinit
 import copy
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.neural_network import MLPRegressor, MLPClassifier
-from imblearn.over_sampling import RandomOverSampler
-from imblearn.under_sampling import RandomUnderSampler
+from surrogate_inference import surrogate_predict_population
+from batch_data import TrainingDataset
+from resource_pool import ResourcePool
+from simulation_runner import generate_initial_state, simulate_initial_state
+from training_sweep import sample_data, fit_surrogate, regressor_save_path, classifier_save_path, save_best_networks, run_training_sweep
 try:
     import cPickle as pickle
 except:
@@ -39,14 +35,14 @@ except:
 parameter_limits = [[0,5000],[0,5000],[0,5000],[0.0,0.25],[0.0,0.25],[0,200],[0,200],[0,200]]
 #Maximum amount of parameter mutation
 MUTATION = 0.25
-GPUS_AVAILABLE = cuda.Device(0).count()
-pop_queue = None
-pop_queue_lock = threading.Lock()
-exit_pop_queue = 0
-batch_queue = None
-batch_queue_lock = threading.Lock()
-exit_batch_queue = 0
-batch_times = [0]*GPUS_AVAILABLE
+#Number of simulations run concurrently on each device
+RUNS_PER_DEVICE = 1
+#Device slots simulations are run on. Devices are detected when first simulating
+RESOURCE_POOL = ResourcePool(runs_per_device=RUNS_PER_DEVICE)
+#Maximum time in seconds for generating the initial state of, or simulating, a single parameter vector (None for no limit)
+SIMULATION_TIMEOUT = None
+#Number of initial states each device generates ahead of the simulation it is running (0 to generate each initial state before its simulation)
+PIPELINE_DEPTH = 1
 
 ##############################SIMGA#############################
 def simulation_ga(m,l,g,time,loc,c,s=1):
@@ -219,99 +215,80 @@ def pred_prey_ga_sim(m,l,g,time,start_time,eval_count,ft,pr,loc,runloc,seed):
         ocount = len(optimals)
     return end_time, time_taken, population
 
+#Simulate every individual of a population across the device slots, returning the fitness and fitnesses of each individual
 def simulation_evaluate_population(pop,loc,fitness_type):
-    global exit_pop_queue, pop_queue, pop_queue_lock, sim_evaluation, sim_fitnesses
-    n = len(pop)
-    sim_evaluation = [0.0]*n
-    sim_fitnesses = [0.0]*n
-    pop_queue = queue.Queue(n)
-    exit_pop_queue = 0
-    threads = []
-    pop_queue_lock.acquire()
-    count = 0
-    for a in pop:
-        pop_queue.put(a+[count])
-        count += 1
-    pop_queue_lock.release()
-    for b in range(GPUS_AVAILABLE):
-        thread = PopulationQueueThread(GPUS_AVAILABLE, b, pop_queue, loc, fitness_type)
-        thread.start()
-        threads.append(thread)
-    while not pop_queue.empty():
-        pass
-    exit_pop_queue = 1
-    for t in threads:
-        t.join()
-    sim_evaluation = list(map(list, zip(sim_evaluation,sim_fitnesses)))
-    return sim_evaluation
-
-class PopulationQueueThread(threading.Thread):
-    def __init__(self, tn, device, q, loc, f):
-        threading.Thread.__init__(self)
-        self.tn = tn
-        self.device = device
-        self.q = q
-        self.location = loc
-        self.fitness_type = f
-    def run(self):
-        winexe = ""
-        linexe = ""
-        if self.fitness_type=="continuous":
-            winexe = "simulation_executables\\PreyPredator_continuous_fitness.exe "
-            linexe = "./simulation_executables/PreyPredator_console_continuous_fitness "
+    return RESOURCE_POOL.map(lambda slot,prepared,timeout: evaluate_individual(prepared,slot,loc,fitness_type,timeout),[a[0] for a in pop],SIMULATION_TIMEOUT,
+                             lambda slot,x,buffer,timeout: prepare_parameters(x,slot,loc,buffer,timeout),PIPELINE_DEPTH)
+
+#Simulation executable (as a command argument list) of the model with the fitness type
+def simulation_executable(fitness_type):
+    if fitness_type=="continuous":
+        if os.name=='nt':
+            return ["simulation_executables\\PreyPredator_continuous_fitness.exe"]
+        return ["./simulation_executables/PreyPredator_console_continuous_fitness"]
+    if os.name=='nt':
+        return ["simulation_executables\\PreyPredator_discrete_fitness.exe"]
+    return ["./simulation_executables/PreyPredator_console_discrete_fitness"]
+
+#Initial state generator executable (as a command argument list)
+def initial_state_generator():
+    if os.name=='nt':
+        return ["simulation_executables\\xmlGenEx3.exe"]
+    return ["./simulation_executables/xmlGen"]
+
+#Generate the initial state of parameter vector x for a device slot in the buffer file of the slot's directory in SP, returning the parameters,
+#the initial state file and the return code of the generator (None if stopped for exceeding the timeout)
+def prepare_parameters(x,slot,SP,buffer,timeout=None):
+    SP = SP+slot.name
+    if not os.path.exists(SP):
+        os.makedirs(SP)
+    #Numbered iteration outputs of the model are written alongside its initial state, so initial states are not named by number
+    path = SP+"/initial_state_"+str(buffer)+".xml"
+    returncode = generate_initial_state(initial_state_generator(),path,x,timeout)
+    if returncode!=0:
+        print("Initial state generation of",[str(x[i]) for i in range(8)],"for slot",slot.name,"failed with return code",returncode)
+    return x,path,returncode
+
+#Simulate prepared parameters on the device of a slot, unless their initial state could not be generated. The model appends its results to
+#spatially_complex_simulation_results.csv in the directory of the initial state. Returns the return code of the simulation, or of the failed generator
+def simulate_parameters(prepared,slot,ft,timeout=None):
+    x,path,returncode = prepared
+    if returncode!=0:
+        return returncode
+    returncode = simulate_initial_state(simulation_executable(ft),path,slot.device,timeout)
+    if returncode!=0:
+        print("Simulation of",[str(x[i]) for i in range(8)],"on slot",slot.name,"failed with return code",returncode)
+    return returncode
+
+#Simulate prepared parameters on a device slot, returning their fitness and fitnesses
+def evaluate_individual(prepared,slot,SP,ft,timeout=None):
+    SP = SP+slot.name
+    if not os.path.exists(SP+"/save.csv"):
+        open(SP+"/save.csv", "w").close()
+    open(SP+"/spatially_complex_simulation_results.csv","w").close()
+    simulate_parameters(prepared,slot,ft,timeout)
+     #csv file data
+    csv = open(SP+"/spatially_complex_simulation_results.csv","r")
+    li =  csv.readline()
+    s = li.split(",")
+    if len(s)<13:
+        if ft=="continuous":
+            sim_evaluation = apply_continuous_fitness(-1000, -99, 99999999999)
+            sim_fitnesses = (-1000, -99, 99999999999)
         else:
-            winexe = "simulation_executables\\PreyPredator_discrete_fitness.exe "
-            linexe = "./simulation_executables/PreyPredator_console_discrete_fitness "
-        threadQueueFunction(self.tn, self.q, self.device, self.location, self.fitness_type, winexe, linexe)
-        
-def threadQueueFunction(tn, q, d, SP, ft, winexe, linexe):
-    global gen, sim_evaluation, sim_fitnesses, pop_queue, pop_queue_lock, exit_pop_queue, gen
-    #Make directories
-    if not os.path.exists(SP+str(d)):
-        os.makedirs(SP+str(d))
-    if not os.path.exists(SP+str(d)+"/0.xml"):
-        open(SP+str(d)+"/0.xml", "w").close()
-    if not os.path.exists(SP+str(d)+"/save.csv"):
-        open(SP+str(d)+"/save.csv", "w").close()
-    while exit_pop_queue==0:
-        pop_queue_lock.acquire()
-        if not pop_queue.empty():
-            x = q.get()
-            ec = x[1]
-            x = x[0]
-            pop_queue_lock.release()
-            open(SP+str(d)+"/spatially_complex_simulation_results.csv","w").close()
-            if os.name=='nt':
-                genComm = "simulation_executables\\xmlGenEx3.exe "+SP+str(d)+"/0.xml "+str(x[0])+" "+str(x[1])+" "+str(x[2])+" "+str(x[3])+" "+str(x[4])+" "+str(x[5])+" "+str(x[6])+" "+str(x[7])
-                command = winexe+SP+str(d)+"/0.xml 1000 "+str(d)
-            else:
-                genComm = "./simulation_executables/xmlGen "+SP+str(d)+"/0.xml "+str(x[0])+" "+str(x[1])+" "+str(x[2])+" "+str(x[3])+" "+str(x[4])+" "+str(x[5])+" "+str(x[6])+" "+str(x[7])        
-                command = linexe+SP+str(d)+"/0.xml 1000 "+str(d)
-            os.system(genComm)
-            os.system(command)
-             #csv file data
-            csv = open(SP+str(d)+"/spatially_complex_simulation_results.csv","r")
-            li =  csv.readline()
-            s = li.split(",")
-            if len(s)<13:
-                if ft=="continuous":
-                    sim_evaluation[ec] = apply_continuous_fitness(-1000, -99, 99999999999)
-                    sim_fitnesses[ec] = (-1000, -99, 99999999999)
-                else:
-                    sim_evaluation[ec] = apply_discrete_fitness(-1, -99, 99999999999)
-                    sim_fitnesses[ec] = (-1, -99, 99999999999)
-            else:
-                if ft=="continuous":
-                    sim_evaluation[ec] = apply_continuous_fitness(int(float(s[10])), int(float(s[11])),float(s[12]))
-                else:
-                    sim_evaluation[ec] = apply_discrete_fitness(int(float(s[10])), int(float(s[11])),float(s[12]))
-                sim_fitnesses[ec] = (int(float(s[10])), int(float(s[11])),float(s[12]))
-            csv.close()
-            save = open(SP+str(d)+"/save.csv","a")
-            save.write(li)
-            save.close()
+            sim_evaluation = apply_discrete_fitness(-1, -99, 99999999999)
+            sim_fitnesses = (-1, -99, 99999999999)
+    else:
+        if ft=="continuous":
+            sim_evaluation = apply_continuous_fitness(int(float(s[10])), int(float(s[11])),float(s[12]))
         else:
-            pop_queue_lock.release()
+            sim_evaluation = apply_discrete_fitness(int(float(s[10])), int(float(s[11])),float(s[12]))
+        sim_fitnesses = (int(float(s[10])), int(float(s[11])),float(s[12]))
+    csv.close()
+    save = open(SP+"/save.csv","a")
+    save.write(li)
+    save.close()
+    return [sim_evaluation,sim_fitnesses]
 
 
 def apply_continuous_fitness(prim,sec,ter):
@@ -394,44 +371,72 @@ def mate(c,p1,p2):
 
 
 ########################### BATCH SIM #################################
+#Simulate num parameter vectors in batch, dispatching no new simulations once time minutes have passed. Parameter vectors not started by then are
+#saved to unstarted_parameters.csv, and simulated first by the next batch simulation in loc. Results are merged to batch_simulation_data.csv,
+#and the number of simulations requested, completed, failed and left unstarted to batch_simulation_summary.csv
 def batch_simulation(num,time,simtype,seed,loc):
-    global batch_queue_lock, batch_queue, exit_batch_queue, batch_times
-    #Inititalise queue
     if not os.path.exists(loc+"/"+simtype+"/"):
         os.mkdir(loc+"/"+simtype+"/")
     nloc = loc+"/"+simtype+"/"
-    batch_queue = queue.Queue(num)
-    exit_batch_queue = 0
-    threads = []
-    batch_queue_lock.acquire()
-    #Generate max number of parameters to evaluate
-    for s in range(num):
-        batch_queue.put(generate_parameter_vector(parameter_limits))
-    batch_queue_lock.release()
-    #Check the current time
-    start_time = datetime.datetime.now()
-    #Use all available devices to progress through generated parameters
-    for b in range(GPUS_AVAILABLE):
-        thread = Batch(b,batch_queue,nloc,start_time,simtype)
-        thread.start()
-        threads.append(thread)
-    #Continue batch simulations until the queue is emptied or time limit is overrun
-    while not batch_queue.empty():
-        pass
-    exit_batch_queue = 1
-    for t in threads:
-        t.join()
-    #Copy all data to current experimentation progress folder for access by later functions
-    open(nloc+"batch_simulation_data.csv","w").close()
-    for a in range(GPUS_AVAILABLE):
-        c = open(nloc+str(a)+"/spatially_complex_simulation_results.csv","r")
-        l = c.readlines()
-        c.close()
-        bd = open(nloc+"batch_simulation_data.csv","a")
-        bd.writelines(l)
-        bd.close()
+    deadline = datetime.datetime.now()+datetime.timedelta(minutes=time)
+    #Resume parameters left unstarted by an earlier batch simulation, then generate parameters up to the number requested
+    saved = load_unstarted_parameters(nloc)
+    if len(saved)>0:
+        print("Resuming",min(len(saved),num),"unstarted batch simulations")
+    parameters = saved[:num]+[generate_parameter_vector(parameter_limits) for s in range(num-len(saved))]
+    #Until the pool returns, no parameter vector is known to have been simulated, so all are saved as unstarted if it raises
+    returncodes, unstarted = [], parameters
+    try:
+        #Use all available device slots to progress through generated parameters until the deadline, generating initial states ahead of the running simulations
+        returncodes, unstarted = RESOURCE_POOL.map_until_deadline(lambda slot,prepared,timeout: simulate_parameters(prepared,slot,simtype,timeout),parameters,deadline,
+                                                                  SIMULATION_TIMEOUT,lambda slot,x,buffer,timeout: prepare_parameters(x,slot,nloc,buffer,timeout),PIPELINE_DEPTH)
+    finally:
+        completed = len([r for r in returncodes if r==0])
+        failed = len(returncodes)-completed
+        if failed>0:
+            print(failed,"of",len(returncodes),"batch simulations failed")
+        unstarted = unstarted+saved[num:]
+        save_unstarted_parameters(nloc,unstarted)
+        if len(unstarted)>0:
+            print("Exceeded specified time limit,",time,"minutes.",len(unstarted),"batch simulations left unstarted")
+        #Copy all data to current experimentation progress folder for access by later functions
+        open(nloc+"batch_simulation_data.csv","w").close()
+        for slot in RESOURCE_POOL.slots():
+            if not os.path.exists(nloc+slot.name+"/spatially_complex_simulation_results.csv"):
+                continue
+            c = open(nloc+slot.name+"/spatially_complex_simulation_results.csv","r")
+            l = c.readlines()
+            c.close()
+            bd = open(nloc+"batch_simulation_data.csv","a")
+            bd.writelines(l)
+            bd.close()
+        print(completed,"of",num,"batch simulations completed")
+        sf = open(nloc+"batch_simulation_summary.csv","a")
+        sf.write("seed,"+str(seed)+",requested,"+str(num)+",completed,"+str(completed)+",failed,"+str(failed)+",unstarted,"+str(len(unstarted))+"\n")
+        sf.close()
+        RESOURCE_POOL.write_statistics(nloc+"slot_statistics.csv")
     return
 
+#Parameter vectors left unstarted by an earlier batch simulation in nloc
+def load_unstarted_parameters(nloc):
+    if not os.path.exists(nloc+"unstarted_parameters.csv"):
+        return []
+    f = open(nloc+"unstarted_parameters.csv","r")
+    parameters = [l.strip().split(",") for l in f.readlines() if l.strip()!=""]
+    f.close()
+    return parameters
+
+#Save the parameter vectors left unstarted by a batch simulation in nloc, removing the file once there are none
+def save_unstarted_parameters(nloc,parameters):
+    if len(parameters)==0:
+        if os.path.exists(nloc+"unstarted_parameters.csv"):
+            os.remove(nloc+"unstarted_parameters.csv")
+        return
+    f = open(nloc+"unstarted_parameters.csv","w")
+    for x in parameters:
+        f.write(",".join(x)+"\n")
+    f.close()
+
 #Generate a new input parameter vector for the predator prey and grass model. Population max 5000, Energy gains max 200, reproduction chance max 0.25
 def generate_parameter_vector(lim):
     new = [0]*len(lim)
@@ -442,363 +447,69 @@ def generate_parameter_vector(lim):
             new[i] = str(round(random.uniform(lim[i][0],lim[i][1]),6))
     return new
 
-#Class for batch simulation of randomly generated inputs
-class Batch(threading.Thread):
-    def __init__(self, d, q, sp, t, st):
-        threading.Thread.__init__(self)
-        self.device = d
-        self.queue = q
-        self.save = sp
-        self.start_time = t
-        self.fitness_type = st
-    def run(self):
-        winexe = ""
-        linexe = ""
-        if self.fitness_type=="continuous":
-            winexe = "simulation_executables\\PreyPredator_continuous_fitness.exe "
-            linexe = "./simulation_executables/PreyPredator_console_continuous_fitness "
-        else:
-            winexe = "simulation_executables\\PreyPredator_discrete_fitness.exe "
-            linexe = "./simulation_executables/PreyPredator_console_discrete_fitness "
-        run_batch_queue(self.device, self.queue, self.save, self.start_time, winexe, linexe)
-        
-#Look through queue of randomly generated inputs and simulate a new input on the device assigned to the current thread      
-def run_batch_queue(d,q,s,start,winexe,linexe):
-    global batch_queue, batch_queue_lock, exit_batch_queue, batch_times
-    #Ensure that all required files exist
-    if not os.path.exists(s+str(d)):
-        os.makedirs(s+str(d))
-    if not os.path.exists(s+str(d)+"/0.xml"):
-        open(s+str(d)+"/0.xml", "w").close()
-    #Batch simulate while there still exist unevaluated inputs
-    while exit_batch_queue==0:
-        batch_queue_lock.acquire()
-        if not batch_queue.empty():
-            x = q.get()
-            batch_queue_lock.release()
-            #Generate initial state from initial paramter vector, then simulate
-            if os.name=='nt':
-                genComm = "simulation_executables\\xmlGenEx3.exe "+s+str(d)+"/0.xml "+str(x[0])+" "+str(x[1])+" "+str(x[2])+" "+str(x[3])+" "+str(x[4])+" "+str(x[5])+" "+str(x[6])+" "+str(x[7])
-                command = winexe+s+str(d)+"/0.xml 1000 "+str(d)
-            else:
-                genComm = "./simulation_executables/xmlGen "+s+str(d)+"/0.xml "+str(x[0])+" "+str(x[1])+" "+str(x[2])+" "+str(x[3])+" "+str(x[4])+" "+str(x[5])+" "+str(x[6])+" "+str(x[7])        
-                command = linexe+s+str(d)+"/0.xml 1000 "+str(d)
-            #Assumes model is one which appends results to a file
-            os.system(genComm)
-            os.system(command)
-        else:
-            batch_queue_lock.release()
-        #Measure and update the total simulation time taken by the current thread
-        current_time = datetime.datetime.now()
-        time_taken = current_time-start
-        batch_times[d] = float(((time_taken.seconds*1000000)+time_taken.microseconds)/1000000)
-    return
-
 
 
 
 
 
 ####################################### TRAIN SURROGATES ###################
-def train_regression_surrogate_model(data_sizes,training,start_time,maxtime,bloc,loc,m, sm=-1):
-    trained_models = 0
-    timer = 0
-    index = 0
-    name = ""
-    if m==1:
-        name = "primary"
-        index = 0
-    elif m==2:
-        name = "secondary"
-        index = 1
-    elif m==3:
-        name = "tertiary"
-        index = 2
-    else:
+REGRESSION_TARGETS = {1:(0,"primary"),2:(1,"secondary"),3:(2,"tertiary")}
+
+def train_regression_surrogate_model(data_sizes,training,start_time,maxtime,bloc,loc,m, sm=-1, workers=None):
+    if m not in REGRESSION_TARGETS:
         print("invalid model, exiting")
-        return trained_models
-    print("Training regression networks for",name,"fitness prediction with max time",maxtime,"minutes")
-    while (not trained_models==sm and timer<maxtime):
-        for i in data_sizes:
-            training_datasets = []
-            bsd = open(bloc+"/batch_simulation_data.csv","r")
-            data = bsd.readlines()
-            bsd.close()
-            generate_training_dataset(data,training,i,training_datasets,loc)
-            data = pickle.load(open(loc+"data/"+str(i)+"/all_examples.p","rb"))
-            X,Y = get_xy(data)
-            train_regressor(X,[[a[index],a[-1]] for a in Y],name,training,False,trained_models,i,loc)
-            ct = datetime.datetime.now()
-            ctt = ct-start_time
-            timer = int(ctt.seconds/60)
-            trained_models += 1
-            if timer>=maxtime:
-                print("Exceeded specified time limit,",maxtime,"minutes. Exiting early")
-                break
+        return 0
+    trained_models, ct = train_regression_surrogate_sweep(data_sizes,training,start_time,maxtime,bloc,loc,[m],sm,workers)
+    return trained_models[0], ct
+
+#Train regression networks for each of the models (1 primary, 2 secondary, 3 tertiary) in parallel, across every data size and training fraction
+def train_regression_surrogate_sweep(data_sizes,training,start_time,maxtime,bloc,loc,models=[1,2,3], sm=-1, workers=None):
+    targets = [REGRESSION_TARGETS[m] for m in models]
+    print("Training regression networks for",", ".join(t[1] for t in targets),"fitness prediction with max time",maxtime,"minutes")
+    #Load the batch simulation data once into shared memory, shuffled with a generator seeded from the experiment's random state
+    rng = np.random.default_rng(random.getrandbits(32))
+    dataset = TrainingDataset(bloc+"/batch_simulation_data.csv",rng,shared=True)
+    try:
+        table, trained_models, ct = run_training_sweep(dataset,data_sizes,training,targets,start_time,maxtime,loc,rng,max_models=sm,workers=workers)
+    finally:
+        dataset.close()
+    if ct-start_time>=datetime.timedelta(minutes=maxtime):
+        print("Exceeded specified time limit,",maxtime,"minutes. Exiting early")
     return trained_models, ct
 
-def generate_training_dataset(data,test_sizes,max_data,td,loc,c=0):
-    SP = loc+"/data/"+str(max_data)+"/"
-    if not os.path.exists(loc+"/data/"):
-        os.mkdir(loc+"/data/")
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    random.shuffle(data)
-    data = data[:max_data]
-    lcount=0
-    positive_examples = []
-    negative_examples = []
-    positive_response = 0
-    if c=="continuous":
-        positive_response = 1050
-    else:
-        positive_response = 1
-    for li in data:
-        sp = li.rstrip().split(",")
-        if sp[0]!="Seed" and sp[0]!="time_taken":
-            params = np.zeros(8)
-            fitnesses = [0,0,0]
-            for i in range(len(params)):
-                params[i] = float(sp[i+1])
-            fitnesses[0] = float(sp[10])
-            fitnesses[1] = float(sp[11])
-            fitnesses[2] = float(sp[12])
-            X = [params[0],params[1],params[2],params[3],params[4],params[5],params[6],params[7]]
-            if fitnesses[0]==positive_response:
-                positive_examples.append([X,fitnesses])
-            else:
-                negative_examples.append([X,fitnesses])
-            lcount+=1
-        else:
-            lcount+=1
-    pickle.dump(positive_examples,open(SP+"/positive_examples.p","wb"))
-    pickle.dump(negative_examples,open(SP+"/negative_examples.p","wb"))
-    td.append(data)
-    pickle.dump(data,open(SP+"/all_examples.p","wb")) 
-    return
-
-def get_xy(data):
-    x = []
-    y = []
-    count = 0
-    for l in data:
-        sp = l.rstrip().split(",")
-        x.append([float(sp[1]),float(sp[2]),float(sp[3]),float(sp[4]),float(sp[5]),float(sp[6]),float(sp[7]),float(sp[8]),count])
-        y.append([float(sp[10]),float(sp[11]),float(sp[12]),count])
-        count+=1
-    return x,y
-
 def train_regressor(X,Y,name,train_sizes,prin,x,size,loc):
-    SP = loc+str(size)+"/"
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    SP = SP+name+"/"
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    hidden_layers = (100,)*2
-    scaler = StandardScaler()
-    ds = []
-    max_score = [0,-99]
-    current_score = [0,-99]
+    SP = regressor_save_path(loc,size,name)
+    fits = []
     for ts in train_sizes:
         if prin:
             print(name,"training percentage",ts)
             print()
             print(name,"Random data sampling, training data size:",ts)
-        testing_size = (1.0-ts)
-        trainX,testX,trainY,testY = train_test_split(X,Y, test_size=testing_size)
-        trainX = [m[:-1] for m in trainX]
-        trainY = [n[:-1] for n in trainY]
-        testX = [o[:-1] for o in testX]
-        testY = [q[:-1] for q in testY]
-        if prin:
-            print("Training (and validation) data:",len(trainX),"Testing data:",len(testX))
-        if len(trainX)>0 and len(testX)>0:
-            if len(trainY[0])==1:
-                trainY = np.array(trainY).ravel()
-            scaler = scaler.fit(trainX)
-            trainX = scaler.transform(trainX)
-            testX = scaler.transform(testX)
-            mlp = MLPRegressor(hidden_layer_sizes=hidden_layers, verbose=False, tol=0.000000001, early_stopping=True)
-            mlp.fit(trainX,trainY)
-            test_score = mlp.score(testX,testY)
-            current_score = max_score
-            if test_score>=max_score[1]:
-                if prin:
-                    print("New best network for ",name," Fitness discovered by random sampling at:",ts,"scoring:",test_score)
-                pickle.dump(mlp,open(SP+"/best_multiple_"+name+".p","wb"))
-                pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+".p","wb"))
-                max_score = [ts,test_score]
-            if test_score==1.0:
-                if prin:
-                    print("New best network for ",name," Fitness with accuracy==1.0 discovered by random sampling at:",ts,"scoring:",test_score)
-                pickle.dump(mlp,open(SP+"/multiple_"+name+"_1_"+str(ts)+".p","wb"))
-                pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+"_1_"+str(ts)+".p","wb"))
-                max_score = current_score
-            ds.append(["random",ts,len(trainX),test_score,max_score])
-        if prin: 
-            print()
-    if not os.path.exists(SP+"surrogate_training_data"+str(x)+".csv"):
-        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","w")
-    else:
-        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","a")
-    for a in ds:
-        surrogate_training_file.write(str(a)+"\n")
-    surrogate_training_file.close()
-    return ds
+        fits.append((ts,fit_surrogate(X,Y,ts)))
+    return save_best_networks(fits,SP,name,"random",x,prin)
 
-def train_classifier_surrogate(data_sizes,training,start_time,maxtime,bloc,loc, sm=-1):
-    trained_models = 0
-    timer = 0
+def train_classifier_surrogate(data_sizes,training,start_time,maxtime,bloc,loc, sm=-1, workers=None):
     print("Training classifier network for discrete primary fitness prediction with max time",maxtime,"minutes")
-    while (not trained_models==sm and timer<maxtime):
-        for i in data_sizes:
-            training_datasets = []
-            bsd = open(bloc+"/batch_simulation_data.csv","r")
-            data = bsd.readlines()
-            bsd.close()
-            generate_training_dataset(data,training,i,training_datasets,loc,1)
-            data = pickle.load(open(loc+"data/"+str(i)+"/all_examples.p","rb"))
-            X,Y = get_xy(data)
-            train_classifier(X,[[a[0],a[-1]] for a in Y],"primary","undersample",training,"sampling_before",False,trained_models,loc)
-            ct = datetime.datetime.now()
-            ctt = ct-start_time
-            timer = int(ctt.seconds/60)
-            trained_models += 1
-            if timer>=maxtime:
-                print("Exceeded specified time limit,",maxtime,"minutes. Exiting early")
-                break
-    return trained_models, ct
-
-def sample_data(X,Y,samp):
-    sampled_X = []
-    sampled_Y = []
-    if samp=="undersample":
-        rus = RandomUnderSampler(random_state=0)
-        modY = [a[0] for a in Y]
-        if 1.0 in modY and 0.0 in modY:
-            sx, sy = rus.fit_sample(X,modY)
-            for i in sx:
-                for j in Y:
-                    if i[-1]==j[-1]:
-                        sampled_X.append(i)
-                        sampled_Y.append(j)
-#        else:
-#            print("Data set does not contain both negative and positive examples.")
-#            print(modY)
-    elif samp=="oversample":
-        ros = RandomOverSampler(random_state=0)
-        modY = [a[0] for a in Y]
-        if 1.0 in modY and 0.0 in modY:
-            sx, sy = ros.fit_sample(X,modY)
-            for i in sx:
-                for j in Y:
-                    if i[-1]==j[-1]:
-                        sampled_X.append(i)
-                        sampled_Y.append(j)
-#        else:
-#            print("Data set does not contain both negative and positive examples.")
-#            print(modY)
-    else:
-        sampled_X = X
-        sampled_Y = Y
-    return sampled_X,sampled_Y
+    #Load the batch simulation data once into shared memory, shuffled with a generator seeded from the experiment's random state
+    rng = np.random.default_rng(random.getrandbits(32))
+    dataset = TrainingDataset(bloc+"/batch_simulation_data.csv",rng,shared=True)
+    try:
+        table, trained_models, ct = run_training_sweep(dataset,data_sizes,training,[(0,"primary")],start_time,maxtime,loc,rng,classifier=True,samp="undersample",samptype="sampling_before",max_models=sm,workers=workers)
+    finally:
+        dataset.close()
+    if ct-start_time>=datetime.timedelta(minutes=maxtime):
+        print("Exceeded specified time limit,",maxtime,"minutes. Exiting early")
+    return trained_models[0], ct
 
 def train_classifier(X,Y,name,samp,train_sizes,samptype,prin,x,loc):
-    SP = loc+name+"/"
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    SP = SP+samptype+"/"
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    SP = SP+samp+"/"
-    if not os.path.exists(SP):
-        os.mkdir(SP)
-    hidden_layers = (100,)*2
-    scaler = StandardScaler()
-    ds = []
-    max_score = [0,-99]
-    current_score = [0,-99]
+    SP = classifier_save_path(loc,name,samptype,samp)
+    fits = []
     for ts in train_sizes:
         if prin:
             print()
             print(samp," data sampling, training size:",ts)
-        sampled_X = None
-        sampled_Y = None
-        trainX = None
-        trainY = None
-        testX = None
-        testY = None
-        if samptype=="sampling_before":
-            if prin:
-                print(name,"sampling BEFORE splitting data")
-            sampled_X,sampled_Y = sample_data(X,Y,samp)
-            testing_size = (1.0-ts)
-            trainX,testX,trainY,testY = train_test_split(sampled_X,sampled_Y, test_size=testing_size)
-            trainX = [m[:-1] for m in trainX]
-            trainY = [n[:-1] for n in trainY]
-#        elif samptype=="sampling_after":
-#            if prin:
-#                print("sampling AFTER splitting data")
-#            testing_size = (1.0-ts)
-#            trainX,testX,trainY,testY = train_test_split(X,Y, test_size=testing_size)
-#            sampled_X,sampled_Y = sample_data(trainX,trainY,samp)
-#            trainX = [m[:-1] for m in sampled_X]
-#            trainY = [n[:-1] for n in sampled_Y]
-        testX = [o[:-1] for o in testX]
-        testY = [q[:-1] for q in testY]        
-        tpos = 0
-        tneg = 0
-        for i in trainY:
-            if i[0]==1.0:
-                tpos+=1
-            else:
-                tneg+=1
-        if prin:
-            print("training positive examples:",tpos,", negative examples:",tneg)
-        
-        epos = 0
-        eneg = 0
-        for j in testY:
-            if j[0]==1.0:
-                epos+=1
-            else:
-                eneg+=1
-        if prin:
-            print("testing positive examples:",epos,", negative examples:",eneg)
-            print("Training (and validation) data:",len(trainX),"Testing data:",len(testX))
-        if len(trainX)>1 and len(testX)>0:
-            trainY = np.array(trainY).ravel()
-            scaler = scaler.fit(trainX)
-            trainX = scaler.transform(trainX)
-            testX = scaler.transform(testX)
-            mlp = MLPClassifier(hidden_layer_sizes=hidden_layers, verbose=False, tol=0.000000001, early_stopping=True)
-            mlp.fit(trainX,trainY)
-            test_score = mlp.score(testX,testY)
-            current_score = max_score
-            if test_score>=max_score[1]:
-                if prin:
-                    print("New best network for ",name," Fitness discovered by",samp,"at:",ts,"scoring:",test_score)
-                pickle.dump(mlp,open(SP+"/best_multiple_"+name+".p","wb"))
-                pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+".p","wb"))
-                max_score = [ts,test_score]
-            if test_score==1.0:
-                if prin:
-                    print("New best network for ",name," Fitness with accuracy==1.0 discovered by",samp,"at:",ts,"scoring:",test_score)
-                pickle.dump(mlp,open(SP+"/multiple_"+name+"_1_"+str(ts)+".p","wb"))
-                pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+"_1_"+str(ts)+".p","wb"))
-                max_score = current_score
-            ds.append([samp,ts,len(trainX),test_score,max_score])
-        if prin:
-            print()
-    if not os.path.exists(SP+"surrogate_training_data"+str(x)+".csv"):
-        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","w")
-    else:
-        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","a")
-    for a in ds:
-        surrogate_training_file.write(str(a)+"\n")
-    surrogate_training_file.close()
-    return ds
+        fits.append((ts,fit_surrogate(X,Y,ts,True,samp)))
+    return save_best_networks(fits,SP,name,samp,x,prin)
 
 
 
@@ -923,16 +634,9 @@ def surrogate_evaluate_population(pop,networks,scalers,c):
     evaluation = [0.0]*n
     fitnesses = [0.0]*n
     count = 0
-    for x in pop:
-        yvals = []
-        if len(networks)>1:
-            for i in range(len(networks)):
-                xcurr = scalers[i].transform(x[0][:-1].reshape(1,-1))
-                yvals.append(networks[i].predict(xcurr))
-            
-        else:
-            xcurr = scalers[0].transform(x[0][:-1].reshape(1,-1))
-            yvals = networks[0].predict(xcurr)[0]
+    #Predict the whole population with one transform and one predict per network
+    predictions = surrogate_predict_population(pop,networks,scalers)
+    for yvals in predictions:
         if c=="continuous":
             evaluation[count] = apply_continuous_fitness(yvals[0],yvals[1],yvals[2])
         else:
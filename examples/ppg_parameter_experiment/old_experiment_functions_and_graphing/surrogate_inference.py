@@ -0,0 +1,20 @@
+import numpy as np
+
+#Batched surrogate inference, kept free of the CUDA imports of smse_experiment_functions so it can be benchmarked and tested on its own
+
+#Stack the parameters of every individual of a population into a single matrix, excluding the trailing chromosome id
+def population_matrix(pop):
+    return np.array([x[0][:-1] for x in pop], dtype=np.float64).reshape(len(pop),-1)
+
+#Predict the fitness components of a whole population with one transform and one predict per network, rather than one per individual.
+#The predictions of each individual are returned in the same form as predicting the individual on its own:
+#a list with a single element array per network when there are multiple networks, otherwise the row of predictions of the single network
+def surrogate_predict_population(pop,networks,scalers):
+    if len(pop)==0:
+        return []
+    X = population_matrix(pop)
+    if len(networks)>1:
+        predictions = [networks[i].predict(scalers[i].transform(X)) for i in range(len(networks))]
+        return [[predictions[i][j:j+1] for i in range(len(networks))] for j in range(len(pop))]
+    predictions = networks[0].predict(scalers[0].transform(X))
+    return [predictions[j] for j in range(len(pop))]
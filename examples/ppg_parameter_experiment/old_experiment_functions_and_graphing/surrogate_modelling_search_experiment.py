@@ -11,7 +11,7 @@ Created on Thu Mar 7 12:49:41 2019
 
 @author: James
 """
-from smse_experiment_functions import simulation_ga, batch_simulation, train_regression_surrogate_model, train_classifier_surrogate, surrogate_ga, surrogate_ga_sim_eval
+from smse_experiment_functions import simulation_ga, batch_simulation, train_regression_surrogate_sweep, train_classifier_surrogate, surrogate_ga, surrogate_ga_sim_eval
 import os
 import sys
 import random
@@ -177,20 +177,18 @@ def train_regression_surrogate_models(data,training,batch_data_loc,loc,time=9999
     sf2.close()
     #Track experiment time
     initial_time = datetime.datetime.now()
-    #Train regression models with maximum runtime time for each type of model to be trained, return the number of models trained
-    x, completion_time1 = train_regression_surrogate_model(data,training,initial_time,time,batch_data_loc,loc,1)
-    y, completion_time2 = train_regression_surrogate_model(data,training,completion_time1,time,batch_data_loc,loc,2)
-    z, final_time = train_regression_surrogate_model(data,training,completion_time2,time,batch_data_loc,loc,3)
+    #Train the regression models of all types in parallel, within the total runtime of training each type of model for time minutes, return the number of models trained
+    (x, y, z), final_time = train_regression_surrogate_sweep(data,training,initial_time,time*3,batch_data_loc,loc,[1,2,3])
     #Log time
     tf = open(BASE_DIRECTORY+"times.csv","a")
-    tf.write(str(x)+",regression_surrogate_training_primary,"+str(completion_time1-initial_time)+",start,"+str(initial_time)+",finish,"+str(completion_time1)+"\n")
-    tf.write(str(y)+",regression_surrogate_training_secondary,"+str(completion_time2-completion_time1)+",start,"+str(completion_time1)+",finish,"+str(completion_time2)+"\n")
-    tf.write(str(z)+",regression_surrogate_training_tertiary,"+str(final_time-completion_time2)+",start,"+str(completion_time2)+",finish,"+str(final_time)+"\n")
+    tf.write(str(x)+",regression_surrogate_training_primary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
+    tf.write(str(y)+",regression_surrogate_training_secondary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
+    tf.write(str(z)+",regression_surrogate_training_tertiary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
     tf.close()
     tf = open(SURR+"times.csv","a")
-    tf.write(str(x)+",regression_surrogate_training_primary,"+str(completion_time1-initial_time)+",start,"+str(initial_time)+",finish,"+str(completion_time1)+"\n")
-    tf.write(str(y)+",regression_surrogate_training_secondary,"+str(completion_time2-completion_time1)+",start,"+str(completion_time1)+",finish,"+str(completion_time2)+"\n")
-    tf.write(str(z)+",regression_surrogate_training_tertiary,"+str(final_time-completion_time2)+",start,"+str(completion_time2)+",finish,"+str(final_time)+"\n")
+    tf.write(str(x)+",regression_surrogate_training_primary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
+    tf.write(str(y)+",regression_surrogate_training_secondary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
+    tf.write(str(z)+",regression_surrogate_training_tertiary,"+str(final_time-initial_time)+",start,"+str(initial_time)+",finish,"+str(final_time)+"\n")
     tf.close()
     print("Completed training regression surrogate models.\n")
     return
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+from batch_data import parse_batch_data, load_batch_data, batch_data_cache_paths, TrainingDataset
+
+HEADER = "Seed,prey,predators,grass,prey_reproduction,predator_reproduction,prey_energy_gain,predator_energy_gain,grass_regrowth,steps,primary,secondary,tertiary\n"
+
+
+#Batch simulation data of n runs, with header and timing lines as appended by the simulation executables
+def write_batch_data(path,rng,n):
+    f = open(path,"w")
+    f.write(HEADER)
+    for i in range(n):
+        params = [str(int(rng.integers(0,5000))) for _ in range(3)]+[str(round(rng.uniform(0,0.25),6)) for _ in range(2)]+[str(int(rng.integers(0,200))) for _ in range(3)]
+        fitnesses = [str(int(rng.integers(0,2))),str(int(rng.integers(0,20))),str(round(rng.uniform(0,5000),6))]
+        f.write(",".join([str(i)]+params+["1000"]+fitnesses)+"\n")
+        if i%7==6:
+            f.write("time_taken,"+str(rng.uniform(0,10))+"\n")
+            f.write(HEADER)
+    f.close()
+
+#Parsing of the training data lines as performed by generate_training_dataset and get_xy before the data was loaded with numpy
+def reference_parse(path):
+    x = []
+    y = []
+    for l in open(path,"r").readlines():
+        sp = l.rstrip().split(",")
+        if sp[0]!="Seed" and sp[0]!="time_taken":
+            x.append([float(sp[i]) for i in range(1,9)])
+            y.append([float(sp[10]),float(sp[11]),float(sp[12])])
+    return np.array(x,dtype=np.float32),np.array(y,dtype=np.float32)
+
+def test_parse_matches_line_parsing(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(0),100)
+    X,Y = parse_batch_data(path)
+    eX,eY = reference_parse(path)
+    assert X.dtype==np.float32 and Y.dtype==np.float32
+    assert X.shape==(100,8) and Y.shape==(100,3)
+    np.testing.assert_array_equal(X,eX)
+    np.testing.assert_array_equal(Y,eY)
+
+def test_parse_empty(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    open(path,"w").write(HEADER)
+    X,Y = parse_batch_data(path)
+    assert X.shape==(0,8) and Y.shape==(0,3)
+
+def test_cache(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(1),50)
+    X,Y = load_batch_data(path)
+    cache_dir,x_path,y_path = batch_data_cache_paths(path)
+    assert os.path.exists(x_path) and os.path.exists(y_path)
+    #The cached arrays are memory mapped rather than parsed again
+    X2,Y2 = load_batch_data(path)
+    assert isinstance(X2,np.memmap) and isinstance(Y2,np.memmap)
+    np.testing.assert_array_equal(X2,reference_parse(path)[0])
+    np.testing.assert_array_equal(Y2,reference_parse(path)[1])
+    X3,Y3 = load_batch_data(path,mmap=False)
+    assert not isinstance(X3,np.memmap)
+    np.testing.assert_array_equal(X3,X2)
+
+def test_cache_invalidated_by_rewrite(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(2),20)
+    load_batch_data(path)
+    old_paths = batch_data_cache_paths(path)
+    write_batch_data(path,np.random.default_rng(3),30)
+    #Ensure the modification time changes even on filesystems with coarse timestamps
+    st = os.stat(path)
+    os.utime(path,ns=(st.st_atime_ns,st.st_mtime_ns+1000000000))
+    X,Y = load_batch_data(path)
+    assert X.shape==(30,8)
+    np.testing.assert_array_equal(X,reference_parse(path)[0])
+    assert not os.path.exists(old_paths[1]) and not os.path.exists(old_paths[2])
+    assert load_batch_data(path,cache=False)[0].shape==(30,8)
+
+def test_training_dataset_subsamples(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(4),200)
+    eX,eY = reference_parse(path)
+    dataset = TrainingDataset(path,np.random.default_rng(5))
+    assert len(dataset)==200
+    previous = None
+    for size in (50,100,200,500):
+        X,Y = dataset.subsample(size)
+        size = min(size,200)
+        assert X.shape==(size,9) and Y.shape==(size,4)
+        #Subsamples are views of the single shuffled buffer
+        assert np.shares_memory(X,dataset.data) and np.shares_memory(Y,dataset.data)
+        np.testing.assert_array_equal(X[:,-1],np.arange(size))
+        np.testing.assert_array_equal(Y[:,-1],np.arange(size))
+        #Smaller subsamples are nested in larger ones
+        if previous is not None:
+            np.testing.assert_array_equal(X[:len(previous)],previous)
+        previous = X.copy()
+    #Every example appears exactly once, with its parameters still matched to its fitnesses
+    X,Y = dataset.subsample(200)
+    order = np.lexsort(X[:,:8].T[::-1])
+    expected_order = np.lexsort(eX.T[::-1])
+    np.testing.assert_array_equal(X[order,:8],eX[expected_order])
+    np.testing.assert_array_equal(Y[order,:3],eY[expected_order])
+
+def test_training_dataset_shuffle(tmp_path):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(6),100)
+    dataset = TrainingDataset(path,np.random.default_rng(7))
+    buffer = dataset.data
+    before = dataset.subsample(100)[0].copy()
+    dataset.shuffle()
+    after,Y = dataset.subsample(100)
+    assert dataset.data is buffer
+    assert not np.array_equal(before,after)
+    np.testing.assert_array_equal(after[:,-1],np.arange(100))
+    np.testing.assert_array_equal(np.sort(before[:,:8],axis=0),np.sort(after[:,:8],axis=0))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from resampling import undersample_indices, oversample_indices, resample_indices
+
+pytest.importorskip("sklearn")
+
+from training_sweep import sample_data
+
+
+def labelled(rng,n,rate):
+    return (rng.uniform(0.0,1.0,n)<rate).astype(np.float64)
+
+def test_undersample():
+    rng = np.random.default_rng(0)
+    labels = labelled(rng,1000,0.2)
+    positives = int(labels.sum())
+    selected = undersample_indices(labels,np.random.default_rng(1))
+    assert len(selected)==2*positives
+    assert len(np.unique(selected))==len(selected)
+    assert (labels[selected]==1.0).sum()==positives and (labels[selected]==0.0).sum()==positives
+    #Every positive example is kept
+    np.testing.assert_array_equal(np.sort(selected[labels[selected]==1.0]),np.flatnonzero(labels==1.0))
+
+def test_oversample():
+    rng = np.random.default_rng(2)
+    labels = labelled(rng,1000,0.2)
+    negatives = int((labels==0.0).sum())
+    selected = oversample_indices(labels,np.random.default_rng(3))
+    assert len(selected)==2*negatives
+    assert (labels[selected]==1.0).sum()==negatives
+    #Every example is kept at least once
+    np.testing.assert_array_equal(np.unique(selected),np.arange(1000))
+
+def test_seeded():
+    labels = labelled(np.random.default_rng(4),500,0.3)
+    for samp in ("undersample","oversample"):
+        np.testing.assert_array_equal(resample_indices(labels,samp,np.random.default_rng(5)),resample_indices(labels,samp,np.random.default_rng(5)))
+    np.testing.assert_array_equal(resample_indices(labels,"none",np.random.default_rng(5)),np.arange(500))
+    assert len(undersample_indices([],np.random.default_rng(5)))==0
+
+def test_sample_data():
+    rng = np.random.default_rng(6)
+    n = 300
+    index = np.arange(n,dtype=np.float64).reshape(-1,1)
+    X = np.hstack((rng.uniform(0.0,1.0,(n,8)),index))
+    Y = np.hstack((labelled(rng,n,0.25).reshape(-1,1),index))
+    for samp in ("undersample","oversample"):
+        sx,sy = sample_data(X,Y,samp)
+        assert len(sx)==len(sy)>0
+        #Resampled examples keep their own fitnesses
+        np.testing.assert_array_equal(sx[:,-1],sy[:,-1])
+        np.testing.assert_array_equal(sx,X[sx[:,-1].astype(int)])
+        assert (sy[:,0]==1.0).sum()==(sy[:,0]==0.0).sum()
+    sx,sy = sample_data(X,Y,"none")
+    assert sx is X and sy is Y
+    #Data sets without both positive and negative examples are not resampled
+    sx,sy = sample_data(X,np.hstack((np.zeros((n,1)),index)),"undersample")
+    assert len(sx)==0 and len(sy)==0
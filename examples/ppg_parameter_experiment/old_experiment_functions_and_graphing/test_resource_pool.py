@@ -0,0 +1,78 @@
+import time
+import threading
+import resource_pool
+from resource_pool import ResourcePool, Slot
+
+
+def test_lazy_detection(monkeypatch):
+    calls = []
+    monkeypatch.setattr(resource_pool,"detect_gpus",lambda: calls.append(1) or 2)
+    pool = ResourcePool(runs_per_device=2)
+    #Devices are not detected until slots are required
+    assert calls==[]
+    assert [s.name for s in pool.slots()]==["0","1","0_1","1_1"]
+    assert [s.device for s in pool.slots()]==[0,1,0,1]
+    pool.slots()
+    assert calls==[1]
+
+def test_detect_without_gpu():
+    #Without pycuda the devices cannot be detected, rather than there being none
+    detected = resource_pool.detect_gpus()
+    assert detected is None or detected>=0
+
+def test_detection_failed(monkeypatch):
+    #Simulations are not run on every processor just because the devices could not be detected
+    monkeypatch.setattr(resource_pool,"detect_gpus",lambda: None)
+    pool = ResourcePool(runs_per_device=2,cpu_slots=4)
+    assert [s.name for s in pool.slots()]==["0"]
+    assert pool.slots()[0].device==0
+
+def test_cpu_slots():
+    pool = ResourcePool(devices=0,cpu_slots=3)
+    assert [s.name for s in pool.slots()]==["cpu0","cpu1","cpu2"]
+    assert all(s.device is None for s in pool.slots())
+    assert len(ResourcePool(devices=0).slots())>=1
+
+def test_work_stealing(tmp_path):
+    #The first slot is slow, so the other slots steal the tasks dealt to it
+    pool = ResourcePool(devices=3)
+    slow = pool.slots()[0]
+    lock = threading.Lock()
+    ran = []
+    def run(slot,item,timeout):
+        time.sleep(0.05 if slot is slow else 0.002)
+        with lock:
+            ran.append((slot.name,item))
+        return item
+    assert pool.map(run,range(60))==list(range(60))
+    assert sorted(item for name,item in ran)==list(range(60))
+    statistics = {row[0]:row for row in pool.statistics()}
+    #Tasks are dealt equally to the slots, so without stealing the slow slot would run 20
+    assert statistics["0"][2]<10
+    assert statistics["1"][4]+statistics["2"][4]>0
+    assert sum(row[2] for row in statistics.values())==60
+    assert statistics["1"][6]>statistics["0"][6]
+    #Statistics accumulate across schedulers
+    pool.map(run,range(6),depth=0)
+    assert sum(row[2] for row in pool.statistics())==66
+    pool.write_statistics(str(tmp_path/"slot_statistics.csv"))
+    lines = open(str(tmp_path/"slot_statistics.csv")).readlines()
+    assert lines[0]==resource_pool.SLOT_STATISTICS_HEADER and len(lines)==4
+
+def test_failures_recorded():
+    pool = ResourcePool(devices=1)
+    def run(slot,item,timeout):
+        if item%2==1:
+            raise RuntimeError("simulation failed")
+        return item
+    with pool.scheduler(run) as scheduler:
+        futures = [scheduler.submit(i) for i in range(10)]
+    assert [f.exception() is None for f in futures]==[i%2==0 for i in range(10)]
+    assert pool.statistics()[0][2:4]==[5,5]
+
+def test_slot_throughput():
+    slot = Slot(0,0)
+    assert slot.throughput()==0.0
+    slot.completed = 10
+    slot.busy_seconds = 2.0
+    assert slot.throughput()==5.0
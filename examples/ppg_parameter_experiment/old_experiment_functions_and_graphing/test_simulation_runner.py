@@ -0,0 +1,112 @@
+import os
+import time
+import pytest
+from simulation_scheduler import SlotScheduler
+from simulation_runner import run_command, generate_initial_state, simulate_initial_state, COMMAND_NOT_RUN
+
+pytestmark = pytest.mark.skipif(os.name=="nt", reason="fake executables are shell scripts")
+
+STAGE_SECONDS = 0.1
+ITEMS = 12
+
+#Fake initial state generator, writing the parameters as the initial state. Fails for a first parameter of 13
+FAKE_GENERATOR = """#!/bin/sh
+sleep %s
+if [ "$2" = "13" ]; then exit 3; fi
+echo "$2,$3,$4,$5,$6,$7,$8,$9" > "$1"
+"""
+
+#Fake simulator, appending the initial state and device to the results in the directory of the initial state
+FAKE_SIMULATOR = """#!/bin/sh
+sleep %s
+echo "$(cat "$1"),$3" >> "$(dirname "$1")/results.csv"
+"""
+
+def fake_executable(path,script):
+    open(path,"w").write(script%STAGE_SECONDS)
+    os.chmod(path,0o755)
+    return [path]
+
+@pytest.fixture
+def executables(tmp_path):
+    return fake_executable(str(tmp_path/"generator"),FAKE_GENERATOR),fake_executable(str(tmp_path/"simulator"),FAKE_SIMULATOR)
+
+#Simulate parameter vectors on fake devices, generating initial states up to depth items ahead of the running simulation. Returns the return codes,
+#and the (start, end) times of each initial state generation and of each simulation
+def run_pipeline(executables,loc,items,devices=1,depth=1):
+    generator,simulator = executables
+    generations = []
+    simulations = []
+    def prepare(d,x,buffer,timeout):
+        SP = loc+str(d)
+        if not os.path.exists(SP):
+            os.makedirs(SP)
+        path = SP+"/initial_state_"+str(buffer)+".xml"
+        start = time.perf_counter()
+        returncode = generate_initial_state(generator,path,x,timeout)
+        generations.append((start,time.perf_counter()))
+        return path,returncode
+    def run(d,prepared,timeout):
+        path,returncode = prepared
+        if returncode!=0:
+            return returncode
+        start = time.perf_counter()
+        returncode = simulate_initial_state(simulator,path,d,timeout)
+        simulations.append((start,time.perf_counter()))
+        return returncode
+    with SlotScheduler(range(devices),run,prepare=prepare,depth=depth) as scheduler:
+        returncodes = scheduler.map(items)
+    return returncodes,(generations,simulations)
+
+#Whether any initial state generation ran during a simulation
+def overlapped(intervals):
+    generations,simulations = intervals
+    return any(g[0]<s[1] and s[0]<g[1] for g in generations for s in simulations)
+
+def simulated(loc,devices=1):
+    lines = []
+    for d in range(devices):
+        if os.path.exists(loc+str(d)+"/results.csv"):
+            lines += [(l.rstrip().split(",")[0],int(l.rstrip().split(",")[-1])) for l in open(loc+str(d)+"/results.csv").readlines()]
+    return lines
+
+def test_run_command(tmp_path):
+    assert run_command(["sh","-c","exit 0"])==0
+    assert run_command(["sh","-c","exit 5"])==5
+    assert run_command(["sh","-c","sleep 5"],timeout=0.2) is None
+    #Executables which are missing or not executable fail like any other command rather than raising
+    assert run_command([str(tmp_path/"missing")])==COMMAND_NOT_RUN
+    open(str(tmp_path/"not_executable"),"w").write("#!/bin/sh\n")
+    assert run_command([str(tmp_path/"not_executable")])==COMMAND_NOT_RUN
+
+def test_pipelined_overlap(tmp_path,executables):
+    items = [[str(i)]+["1"]*7 for i in range(ITEMS)]
+    serial_loc = str(tmp_path/"serial")+"/"
+    returncodes,serial_intervals = run_pipeline(executables,serial_loc,items,depth=0)
+    assert returncodes==[0]*ITEMS
+    pipelined_loc = str(tmp_path/"pipelined")+"/"
+    returncodes,pipelined_intervals = run_pipeline(executables,pipelined_loc,items,depth=1)
+    assert returncodes==[0]*ITEMS
+    #Every item is simulated once, from its own initial state, although the next initial state is generated during each simulation
+    assert sorted(int(x) for x,d in simulated(pipelined_loc))==list(range(ITEMS))
+    assert sorted(int(x) for x,d in simulated(serial_loc))==list(range(ITEMS))
+    #Initial states are only generated during simulations when pipelined. The throughput gain is measured by benchmark_pipeline.py
+    assert not overlapped(serial_intervals)
+    assert overlapped(pipelined_intervals)
+
+def test_pipelined_devices(tmp_path,executables):
+    items = [[str(i)]+["1"]*7 for i in range(ITEMS)]
+    loc = str(tmp_path/"devices")+"/"
+    returncodes,intervals = run_pipeline(executables,loc,items,devices=3,depth=2)
+    assert returncodes==[0]*ITEMS
+    results = simulated(loc,3)
+    assert sorted(int(x) for x,d in results)==list(range(ITEMS))
+    assert set(d for x,d in results)=={0,1,2}
+
+def test_failed_generation(tmp_path,executables):
+    items = [[str(i)]+["1"]*7 for i in (11,12,13,14)]
+    loc = str(tmp_path/"failed")+"/"
+    returncodes,intervals = run_pipeline(executables,loc,items)
+    #The failed initial state is not simulated, and its return code is reported
+    assert returncodes==[0,0,3,0]
+    assert sorted(int(x) for x,d in simulated(loc))==[11,12,14]
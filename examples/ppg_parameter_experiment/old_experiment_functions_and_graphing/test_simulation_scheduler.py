@@ -0,0 +1,138 @@
+import time
+import datetime
+import random
+import threading
+import pytest
+from simulation_scheduler import SlotScheduler
+
+
+#Fake devices which record every item they simulate, taking a random time to simulate each
+class FakeDevices(object):
+    def __init__(self, devices, duration=0.002, seed=0):
+        self.devices = devices
+        self.duration = duration
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.simulated = []
+        self.running = {}
+
+    def run(self, device, item, timeout):
+        with self.lock:
+            assert self.running.get(device,0)==0, "device "+str(device)+" is running more than one simulation"
+            self.running[device] = 1
+            duration = self.random.uniform(0,self.duration)
+        time.sleep(duration)
+        with self.lock:
+            self.running[device] = 0
+            self.simulated.append((device,item))
+        return (item,item*item)
+
+def test_no_items_lost_or_duplicated():
+    devices = FakeDevices(4)
+    items = list(range(500))
+    with SlotScheduler(range(4),devices.run) as scheduler:
+        results = scheduler.map(items)
+    #Results are mapped back to their items
+    assert results==[(i,i*i) for i in items]
+    assert sorted(item for device,item in devices.simulated)==items
+    assert set(device for device,item in devices.simulated)==set(range(4))
+
+def test_concurrent_submission():
+    devices = FakeDevices(3)
+    futures = {}
+    with SlotScheduler(range(3),devices.run) as scheduler:
+        def submit(start):
+            for i in range(start,start+100):
+                futures[i] = scheduler.submit(i)
+        submitters = [threading.Thread(target=submit,args=(s,)) for s in (0,100,200)]
+        for t in submitters:
+            t.start()
+        for t in submitters:
+            t.join()
+    #Shutting down runs every task queued before it
+    assert all(futures[i].done() for i in range(300))
+    assert [futures[i].result()[0] for i in range(300)]==list(range(300))
+    assert sorted(item for device,item in devices.simulated)==list(range(300))
+
+def test_empty():
+    with SlotScheduler([0],FakeDevices(1).run) as scheduler:
+        assert scheduler.map([])==[]
+    with pytest.raises(ValueError):
+        SlotScheduler([],FakeDevices(1).run)
+
+def test_failures_and_timeouts():
+    timeouts = []
+    def run(device, item, timeout):
+        timeouts.append(timeout)
+        if item==3:
+            raise RuntimeError("simulation failed")
+        return item
+    with SlotScheduler(range(2),run,timeout=30) as scheduler:
+        futures = [scheduler.submit(i) for i in range(6)]
+        with pytest.raises(RuntimeError):
+            scheduler.map(range(6))
+    #A failed task does not stop the workers running the remaining tasks
+    assert [f.result() for f in futures if f.exception() is None]==[0,1,2,4,5]
+    assert isinstance(futures[3].exception(),RuntimeError)
+    assert set(timeouts)=={30}
+
+def test_waiting_does_not_spin():
+    #While the devices are busy the scheduler blocks, using almost no processor time
+    devices = FakeDevices(2,duration=0.1)
+    start = time.process_time()
+    with SlotScheduler(range(2),devices.run) as scheduler:
+        scheduler.map(range(10))
+    assert time.process_time()-start<0.1
+
+def test_prepared_buffers():
+    #A buffer is not prepared again until the item prepared in it has been run
+    lock = threading.Lock()
+    in_use = set()
+    buffers = set()
+    def prepare(device, item, buffer, timeout):
+        with lock:
+            assert (device,buffer) not in in_use
+            in_use.add((device,buffer))
+            buffers.add(buffer)
+        time.sleep(0.001)
+        return (item,buffer)
+    def run(device, prepared, timeout):
+        item,buffer = prepared
+        time.sleep(0.002)
+        with lock:
+            in_use.remove((device,buffer))
+        return item
+    for depth in (0,1,3):
+        buffers.clear()
+        with SlotScheduler(range(2),run,prepare=prepare,depth=depth) as scheduler:
+            assert scheduler.map(range(100))==list(range(100))
+        assert buffers==set(range(depth+1))
+        assert len(in_use)==0
+
+def test_deadline():
+    #Tasks started before the deadline run to completion, no task is started after it and the remaining items are returned unstarted
+    lock = threading.Lock()
+    started = []
+    def prepare(device, item, buffer, timeout):
+        with lock:
+            started.append(datetime.datetime.now())
+        return item
+    def run(device, item, timeout):
+        time.sleep(0.01)
+        return item*item
+    for depth in (0,1):
+        del started[:]
+        deadline = datetime.datetime.now()+datetime.timedelta(seconds=0.1)
+        with SlotScheduler(range(2),run,prepare=prepare,depth=depth,deadline=deadline) as scheduler:
+            results, unstarted = scheduler.map_until_deadline(list(range(100)))
+            #Items submitted after the deadline are cancelled rather than run
+            assert scheduler.submit(100).cancelled()
+        assert 0<len(results)<100
+        assert results==[i*i for i in range(100) if i not in unstarted]
+        assert len(started)==len(results)
+        assert all(s<deadline+datetime.timedelta(seconds=0.05) for s in started)
+
+def test_no_deadline():
+    with SlotScheduler(range(2),FakeDevices(2).run) as scheduler:
+        results, unstarted = scheduler.map_until_deadline(list(range(50)))
+    assert results==[(i,i*i) for i in range(50)] and unstarted==[]
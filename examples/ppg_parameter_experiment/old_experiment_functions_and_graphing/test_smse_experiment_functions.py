@@ -0,0 +1,91 @@
+import os
+import pytest
+
+pytest.importorskip("deap")
+pytest.importorskip("sklearn")
+
+import smse_experiment_functions as smse
+from resource_pool import ResourcePool
+
+#Fake initial state generator, writing the parameters as the initial state
+FAKE_GENERATOR = """#!/bin/sh
+echo "$2,$3,$4,$5,$6,$7,$8,$9" > "$1"
+"""
+
+#Fake simulator, appending a result line of seed, parameters, steps and fitnesses to the results in the directory of the initial state,
+#with the first parameter as the primary fitness. Fails for a first parameter of 13
+FAKE_SIMULATOR = """#!/bin/sh
+parameters=$(cat "$1")
+first=${parameters%%,*}
+case "$first" in 13|13.0) exit 1;; esac
+echo "0,$parameters,1000,$first,2,3.5" >> "$(dirname "$1")/spatially_complex_simulation_results.csv"
+"""
+
+pytestmark = pytest.mark.skipif(os.name=="nt", reason="fake executables are shell scripts")
+
+@pytest.fixture
+def fake_simulation(tmp_path, monkeypatch):
+    os.mkdir(str(tmp_path/"simulation_executables"))
+    for name,script in (("xmlGen",FAKE_GENERATOR),("PreyPredator_console_discrete_fitness",FAKE_SIMULATOR),("PreyPredator_console_continuous_fitness",FAKE_SIMULATOR)):
+        path = str(tmp_path/"simulation_executables"/name)
+        open(path,"w").write(script)
+        os.chmod(path,0o755)
+    monkeypatch.chdir(tmp_path)
+    pool = ResourcePool(devices=0,cpu_slots=2)
+    monkeypatch.setattr(smse,"RESOURCE_POOL",pool)
+    return pool
+
+def test_simulation_evaluate_population(tmp_path, fake_simulation):
+    pop = [[[float(i)]+[1.0]*7+[float(i)]] for i in (10,11,12,13,14)]
+    evaluations = smse.simulation_evaluate_population(pop,str(tmp_path)+"/",1)
+    assert [e[1] for e in evaluations]==[(10,2,3.5),(11,2,3.5),(12,2,3.5),(-1,-99,99999999999),(14,2,3.5)]
+    assert evaluations[0][0]==smse.apply_discrete_fitness(10,2,3.5)
+    assert sum(row[2] for row in fake_simulation.statistics())==5
+
+def test_batch_simulation(tmp_path, fake_simulation):
+    smse.batch_simulation(20,60,"discrete",0,str(tmp_path))
+    lines = open(str(tmp_path)+"/discrete/batch_simulation_data.csv").readlines()
+    assert len(lines)==20-len([l for l in lines if l.split(",")[1]=="13"])
+    assert all(len(l.split(","))==13 for l in lines)
+    assert len(open(str(tmp_path)+"/discrete/slot_statistics.csv").readlines())==3
+    assert not os.path.exists(str(tmp_path)+"/discrete/unstarted_parameters.csv")
+    summary = open(str(tmp_path)+"/discrete/batch_simulation_summary.csv").readline().strip().split(",")
+    assert summary[2:6]==["requested","20","completed",str(len(lines))]
+
+def test_batch_simulation_deadline_and_resumption(tmp_path, fake_simulation):
+    #No simulations are started once the deadline has passed, and the parameters are saved for resumption
+    smse.batch_simulation(6,0,"discrete",0,str(tmp_path))
+    nloc = str(tmp_path)+"/discrete/"
+    unstarted = smse.load_unstarted_parameters(nloc)
+    assert len(unstarted)==6 and all(len(x)==8 for x in unstarted)
+    assert open(nloc+"batch_simulation_data.csv").readlines()==[]
+    assert open(nloc+"batch_simulation_summary.csv").readline().strip().endswith("requested,6,completed,0,failed,0,unstarted,6")
+    #Resumption simulates the saved parameters first, before any newly generated
+    smse.batch_simulation(4,60,"discrete",1,str(tmp_path))
+    assert smse.load_unstarted_parameters(nloc)==unstarted[4:]
+    simulated = sorted(l.split(",")[1:9] for l in open(nloc+"batch_simulation_data.csv").readlines())
+    assert simulated==sorted(x for x in unstarted[:4] if x[0]!="13")
+    smse.batch_simulation(3,60,"discrete",2,str(tmp_path))
+    assert not os.path.exists(nloc+"unstarted_parameters.csv")
+    summary = open(nloc+"batch_simulation_summary.csv").readlines()
+    assert len(summary)==3 and summary[2].strip().endswith("unstarted,0")
+    assert len(open(nloc+"batch_simulation_data.csv").readlines())==int(summary[1].split(",")[5])+int(summary[2].split(",")[5])
+
+def test_batch_simulation_missing_executable(tmp_path, fake_simulation):
+    #A missing simulator fails every simulation, without aborting the batch simulation
+    os.remove(str(tmp_path/"simulation_executables"/"PreyPredator_console_discrete_fitness"))
+    smse.batch_simulation(4,60,"discrete",0,str(tmp_path))
+    nloc = str(tmp_path)+"/discrete/"
+    assert open(nloc+"batch_simulation_data.csv").readlines()==[]
+    assert open(nloc+"batch_simulation_summary.csv").readline().strip().endswith("requested,4,completed,0,failed,4,unstarted,0")
+
+def test_batch_simulation_pool_error(tmp_path, fake_simulation, monkeypatch):
+    #If the pool raises, the parameters are saved for resumption and the summary is still written
+    def raise_error(*args, **kwargs):
+        raise RuntimeError("pool failed")
+    monkeypatch.setattr(fake_simulation,"map_until_deadline",raise_error)
+    with pytest.raises(RuntimeError):
+        smse.batch_simulation(5,60,"discrete",0,str(tmp_path))
+    nloc = str(tmp_path)+"/discrete/"
+    assert len(smse.load_unstarted_parameters(nloc))==5
+    assert open(nloc+"batch_simulation_summary.csv").readline().strip().endswith("requested,5,completed,0,failed,0,unstarted,5")
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytestmark = pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+
+from benchmark_surrogate_inference import random_population, train_networks, surrogate_predict_individuals
+from surrogate_inference import population_matrix, surrogate_predict_population
+
+
+#Batched predictions use a matrix product in place of a vector product, so agree with per individual predictions to rounding
+def assert_same_predictions(batched,individual):
+    assert len(batched)==len(individual)
+    for b,i in zip(batched,individual):
+        assert type(b)==type(i)
+        if isinstance(i,list):
+            assert len(b)==len(i)
+            for bv,iv in zip(b,i):
+                assert bv.shape==iv.shape
+                np.testing.assert_allclose(bv,iv,rtol=1e-12,atol=1e-12)
+        else:
+            np.testing.assert_allclose(b,i,rtol=1e-12,atol=1e-12)
+
+def test_population_matrix():
+    pop = random_population(np.random.default_rng(1),5)
+    X = population_matrix(pop)
+    assert X.shape==(5,8)
+    for i in range(5):
+        np.testing.assert_array_equal(X[i],pop[i][0][:-1])
+
+def test_multiple_networks():
+    rng = np.random.default_rng(2)
+    networks,scalers = train_networks(rng,1,3)
+    pop = random_population(rng,37)
+    assert_same_predictions(surrogate_predict_population(pop,networks,scalers),surrogate_predict_individuals(pop,networks,scalers))
+
+def test_single_network():
+    rng = np.random.default_rng(3)
+    networks,scalers = train_networks(rng,3,1)
+    pop = random_population(rng,37)
+    batched = surrogate_predict_population(pop,networks,scalers)
+    assert batched[0].shape==(3,)
+    assert_same_predictions(batched,surrogate_predict_individuals(pop,networks,scalers))
+
+def test_empty_population():
+    networks,scalers = train_networks(np.random.default_rng(4),1,3)
+    assert surrogate_predict_population([],networks,scalers)==[]
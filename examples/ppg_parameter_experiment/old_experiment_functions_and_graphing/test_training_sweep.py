@@ -0,0 +1,84 @@
+import os
+import pickle
+import datetime
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytestmark = pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+
+from batch_data import TrainingDataset
+from test_batch_data import write_batch_data
+from training_sweep import run_training_sweep, save_best_networks, fit_surrogate
+
+
+#Picklable stand in for a trained network
+class StubNetwork(object):
+    def __init__(self, score):
+        self.score = score
+
+def test_save_best_networks(tmp_path):
+    SP = str(tmp_path)+"/"
+    fits = [(0.1,(StubNetwork(0.5),"scaler0.1",10,0.5)),(0.25,None),(0.5,(StubNetwork(0.7),"scaler0.5",50,0.7)),(0.75,(StubNetwork(0.6),"scaler0.75",75,0.6))]
+    ds = save_best_networks(fits,SP,"primary","random",0)
+    assert [a[1] for a in ds]==[0.1,0.5,0.75]
+    assert ds[-1][4]==[0.5,0.7]
+    assert pickle.load(open(SP+"best_multiple_primary.p","rb")).score==0.7
+    assert pickle.load(open(SP+"scaler_multiple_primary.p","rb"))=="scaler0.5"
+    assert len(open(SP+"surrogate_training_data0.csv").readlines())==3
+    #A perfect score is saved separately and as the best network, without replacing the best score
+    ds = save_best_networks([(0.1,(StubNetwork(0.9),"s",10,0.9)),(0.5,(StubNetwork(1.0),"s",50,1.0)),(0.75,(StubNetwork(0.95),"s",75,0.95))],SP,"primary","random",0)
+    assert os.path.exists(SP+"multiple_primary_1_0.5.p")
+    assert ds[1][4]==[0.1,0.9]
+    assert pickle.load(open(SP+"best_multiple_primary.p","rb")).score==0.95
+    assert len(open(SP+"surrogate_training_data0.csv").readlines())==6
+
+def test_fit_surrogate_seeded():
+    rng = np.random.default_rng(0)
+    X = np.hstack((rng.uniform(0,1,(200,8)),np.arange(200).reshape(-1,1)))
+    Y = np.stack((X[:,:8].sum(axis=1),np.arange(200)),axis=1)
+    a = fit_surrogate(X,Y,0.75,seed=3)
+    b = fit_surrogate(X,Y,0.75,seed=3)
+    assert a[2]==150 and a[3]==b[3]
+
+def run_sweep(tmp_path,maxtime,max_models,targets=[(0,"primary"),(2,"tertiary")]):
+    path = str(tmp_path/"batch_simulation_data.csv")
+    write_batch_data(path,np.random.default_rng(1),120)
+    loc = str(tmp_path/"surrogates")+"/"
+    os.mkdir(loc)
+    rng = np.random.default_rng(2)
+    dataset = TrainingDataset(path,rng,shared=True)
+    try:
+        result = run_training_sweep(dataset,[60,120],[0.5,0.75],targets,datetime.datetime.now(),maxtime,loc,rng,max_models=max_models,workers=2)
+    finally:
+        dataset.close()
+    return loc,result
+
+def test_sweep(tmp_path):
+    loc,(table,trained_models,ct) = run_sweep(tmp_path,10,2)
+    #One round trains every combination of data size, training fraction and target
+    assert trained_models==[2,2]
+    assert len(table)==8
+    assert sorted((row[2],row[3],row[4]) for row in table)==sorted((t,size,ts) for t in ("primary","tertiary") for size in (60,120) for ts in (0.5,0.75))
+    assert all(row[0]==0 and row[1]=="regression" for row in table)
+    for row in table:
+        assert row[5]==int(row[3]*row[4]) and np.isfinite(row[6])
+    for x,size in enumerate((60,120)):
+        for name in ("primary","tertiary"):
+            SP = loc+str(size)+"/"+name+"/"
+            assert os.path.exists(SP+"best_multiple_"+name+".p") and os.path.exists(SP+"scaler_multiple_"+name+".p")
+            saved = pickle.load(open(SP+"best_multiple_"+name+".p","rb"))
+            assert saved.n_features_in_==8
+            assert open(SP+"surrogate_training_data"+str(x)+".csv").read().count("random")==2
+    assert len(open(loc+"surrogate_training_sweep.csv").readlines())==9
+
+def test_sweep_rounds(tmp_path):
+    loc,(table,trained_models,ct) = run_sweep(tmp_path,10,4,[(1,"secondary")])
+    assert trained_models==[4]
+    assert sorted(set(row[0] for row in table))==[0,1]
+
+def test_sweep_time_limit(tmp_path):
+    #No networks are trained once the time limit has been reached
+    loc,(table,trained_models,ct) = run_sweep(tmp_path,0,-1)
+    assert table==[] and trained_models==[0,0]
+    assert open(loc+"surrogate_training_sweep.csv").readlines()==["round,model,target,data_size,training_fraction,training_examples,test_score,training_seconds\n"]
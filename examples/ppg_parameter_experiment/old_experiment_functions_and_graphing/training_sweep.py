@@ -0,0 +1,205 @@
+import os
+import time
+import datetime
+import pickle
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.neural_network import MLPRegressor, MLPClassifier
+from resampling import resample_indices
+
+#Surrogate model training sweeps. Every combination of data size, training fraction and fitness target is trained as an independent task
+#across a pool of worker processes, which read the training data from the shared buffer of a TrainingDataset
+
+HIDDEN_LAYERS = (100,)*2
+SWEEP_TABLE_HEADER = "round,model,target,data_size,training_fraction,training_examples,test_score,training_seconds\n"
+
+#Training data of the worker process, attached to the shared buffer of the dataset being swept
+training_data_memory = None
+training_data = None
+training_genes = 0
+
+#Resample examples X and fitnesses Y, each followed by the example index, to balance the examples with and without a positive primary fitness.
+#Data sets without both positive and negative examples are not resampled by undersampling or oversampling, and return no examples
+def sample_data(X,Y,samp,seed=0):
+    if samp!="undersample" and samp!="oversample":
+        return X,Y
+    X = np.asarray(X)
+    Y = np.asarray(Y)
+    modY = Y[:,0]
+    if not ((modY==1.0).any() and (modY==0.0).any()):
+        return X[:0],Y[:0]
+    selected = resample_indices(modY,samp,np.random.default_rng(seed))
+    return X[selected],Y[selected]
+
+#Train a surrogate network on a training fraction of examples X and fitnesses Y, each followed by the example index, and score it on the remaining examples.
+#Returns the network, its input scaler, the number of training examples and the test score, or None if there are too few examples to train and test
+def fit_surrogate(X,Y,ts,classifier=False,samp=None,seed=None):
+    if classifier:
+        X,Y = sample_data(X,Y,samp)
+    if len(X)==0:
+        return None
+    testing_size = (1.0-ts)
+    trainX,testX,trainY,testY = train_test_split(np.asarray(X),np.asarray(Y), test_size=testing_size, random_state=seed)
+    trainX = trainX[:,:-1]
+    trainY = trainY[:,:-1]
+    testX = testX[:,:-1]
+    testY = testY[:,:-1]
+    if len(trainX)<=(1 if classifier else 0) or len(testX)==0:
+        return None
+    if classifier or trainY.shape[1]==1:
+        trainY = trainY.ravel()
+    scaler = StandardScaler().fit(trainX)
+    trainX = scaler.transform(trainX)
+    testX = scaler.transform(testX)
+    if classifier:
+        mlp = MLPClassifier(hidden_layer_sizes=HIDDEN_LAYERS, verbose=False, tol=0.000000001, early_stopping=True, random_state=seed)
+    else:
+        mlp = MLPRegressor(hidden_layer_sizes=HIDDEN_LAYERS, verbose=False, tol=0.000000001, early_stopping=True, random_state=seed)
+    mlp.fit(trainX,trainY)
+    return mlp,scaler,len(trainX),mlp.score(testX,testY)
+
+#Create (if required) and return the directory the networks of a regression surrogate are saved to
+def regressor_save_path(loc,size,name):
+    SP = loc+str(size)+"/"
+    if not os.path.exists(SP):
+        os.mkdir(SP)
+    SP = SP+name+"/"
+    if not os.path.exists(SP):
+        os.mkdir(SP)
+    return SP
+
+#Create (if required) and return the directory the networks of a classifier surrogate are saved to
+def classifier_save_path(loc,name,samptype,samp):
+    SP = loc+name+"/"
+    if not os.path.exists(SP):
+        os.mkdir(SP)
+    SP = SP+samptype+"/"
+    if not os.path.exists(SP):
+        os.mkdir(SP)
+    SP = SP+samp+"/"
+    if not os.path.exists(SP):
+        os.mkdir(SP)
+    return SP
+
+#Save the best network of the fits of each training fraction, in order of training fraction, along with any networks scoring 1.0,
+#and append the score of each fit to the surrogate training data of model x
+def save_best_networks(fits,SP,name,method,x,prin=False):
+    ds = []
+    max_score = [0,-99]
+    current_score = [0,-99]
+    for ts,fit in fits:
+        if fit is None:
+            continue
+        mlp,scaler,training_examples,test_score = fit
+        current_score = max_score
+        if test_score>=max_score[1]:
+            if prin:
+                print("New best network for ",name," Fitness discovered by",method,"at:",ts,"scoring:",test_score)
+            pickle.dump(mlp,open(SP+"/best_multiple_"+name+".p","wb"))
+            pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+".p","wb"))
+            max_score = [ts,test_score]
+        if test_score==1.0:
+            if prin:
+                print("New best network for ",name," Fitness with accuracy==1.0 discovered by",method,"at:",ts,"scoring:",test_score)
+            pickle.dump(mlp,open(SP+"/multiple_"+name+"_1_"+str(ts)+".p","wb"))
+            pickle.dump(scaler,open(SP+"/scaler_multiple_"+name+"_1_"+str(ts)+".p","wb"))
+            max_score = current_score
+        ds.append([method,ts,training_examples,test_score,max_score])
+    if not os.path.exists(SP+"surrogate_training_data"+str(x)+".csv"):
+        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","w")
+    else:
+        surrogate_training_file = open(SP+"surrogate_training_data"+str(x)+".csv","a")
+    for a in ds:
+        surrogate_training_file.write(str(a)+"\n")
+    surrogate_training_file.close()
+    return ds
+
+#Attach a worker process to the shared buffer of a TrainingDataset
+def attach_training_data(name,shape,genes):
+    global training_data_memory, training_data, training_genes
+    try:
+        training_data_memory = shared_memory.SharedMemory(name=name,track=False)
+    except TypeError:
+        #Before Python 3.13 attaching registers the buffer again with the resource tracker the workers share with the main process, which is harmless
+        training_data_memory = shared_memory.SharedMemory(name=name)
+    training_data = np.ndarray(shape,dtype=np.float32,buffer=training_data_memory.buf)
+    training_genes = genes
+
+#Train one surrogate network of a sweep in a worker process, on the first size examples of the shared training data
+def train_sweep_task(size,ts,target,classifier,samp,seed):
+    start = time.perf_counter()
+    X = training_data[:size,:training_genes+1]
+    Y = training_data[:size,[training_genes+1+target,-1]]
+    fit = fit_surrogate(X,Y,ts,classifier,samp,seed)
+    return fit,time.perf_counter()-start
+
+#Train surrogate networks for every combination of data size, training fraction and target, repeating the sweep over reshuffled data (in rounds)
+#until max_models networks have been trained for each data size of each target, or maxtime minutes have passed since start_time.
+#Once the time limit is reached no further networks are started, though those in training are completed.
+#Targets are (fitness index, name) pairs. The best network of each target and data size is selected and saved as by train_regressor and train_classifier,
+#and the score of every network is appended to the sweep table surrogate_training_sweep.csv in loc. Returns the table, the number of data sizes trained for each target and the finish time
+def run_training_sweep(dataset,data_sizes,train_fractions,targets,start_time,maxtime,loc,rng,classifier=False,samp="undersample",samptype="sampling_before",max_models=-1,workers=None,prin=False):
+    if dataset.shared_memory is None:
+        raise ValueError("Training sweeps require a TrainingDataset with a shared buffer")
+    method = samp if classifier else "random"
+    model = "classifier" if classifier else "regression"
+    table = []
+    trained_models = [0]*len(targets)
+    timer = lambda: int((datetime.datetime.now()-start_time).total_seconds()/60)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers,initializer=attach_training_data,initargs=(dataset.shared_memory.name,dataset.data.shape,dataset.genes))
+    try:
+        sweep_round = 0
+        while (not all(m==max_models for m in trained_models) and timer()<maxtime):
+            tasks = deque()
+            for t in range(len(targets)):
+                for size in data_sizes:
+                    for ts in train_fractions:
+                        tasks.append((t,size,ts,int(rng.integers(2**32))))
+            fits = {}
+            running = {}
+            while tasks or running:
+                #Dispatch tasks while time remains, running one task per worker
+                while tasks and len(running)<workers and timer()<maxtime:
+                    t,size,ts,seed = tasks.popleft()
+                    running[executor.submit(train_sweep_task,size,ts,targets[t][0],classifier,samp,seed)] = (t,size,ts)
+                if not running:
+                    break
+                done,_ = wait(running,return_when=FIRST_COMPLETED)
+                for f in done:
+                    fits[running.pop(f)] = f.result()
+            #Select the best networks in the order they were trained before networks were trained in parallel
+            for t in range(len(targets)):
+                index,name = targets[t]
+                for size in data_sizes:
+                    size_fits = [(ts,fits[(t,size,ts)][0]) for ts in train_fractions if (t,size,ts) in fits]
+                    if len(size_fits)==0:
+                        continue
+                    SP = classifier_save_path(loc,name,samptype,samp) if classifier else regressor_save_path(loc,size,name)
+                    save_best_networks(size_fits,SP,name,method,trained_models[t],prin)
+                    for ts in train_fractions:
+                        if (t,size,ts) in fits:
+                            fit,seconds = fits[(t,size,ts)]
+                            table.append([sweep_round,model,name,size,ts,fit[2] if fit is not None else 0,fit[3] if fit is not None else float("nan"),seconds])
+                    if len(size_fits)==len(train_fractions):
+                        trained_models[t] += 1
+            sweep_round += 1
+            #Reshuffle the shared data once no worker is reading it
+            dataset.shuffle()
+    finally:
+        executor.shutdown()
+    new_table = not os.path.exists(loc+"surrogate_training_sweep.csv")
+    table_file = open(loc+"surrogate_training_sweep.csv","a")
+    if new_table:
+        table_file.write(SWEEP_TABLE_HEADER)
+    for row in table:
+        table_file.write(",".join(str(a) for a in row)+"\n")
+    table_file.close()
+    if prin:
+        print("Trained",len(table),model,"networks in",sweep_round,"rounds")
+    return table,trained_models,datetime.datetime.now()
@@ -0,0 +1,80 @@
+import numpy as np
+import experiment_generator as exp
+
+"""
+  Post-hoc fitness of the Predator, Prey and Grass model.
+  Computes the same fitness components as the per-step fitness host callback of the FLAMEGPU1 model,
+  from the prey and predator populations logged each step, for every run at once.
+"""
+
+
+"""
+  Compute the fitness components of one or more runs from their logged populations
+  @param prey prey population of each logged step, shaped (runs, steps). Steps not logged are NaN
+  @param predators predator population of each logged step, shaped (runs, steps)
+  @param step step count of each logged step, shaped (runs, steps). Steps with a count below 1 (the initial state or padding) are ignored. Defaults to steps 1, 2, ...
+  @param total_steps simulation steps of a complete run, or of each run. Runs ended early by extinction are completed for the remaining steps, with the surviving population held at its size at extinction
+  @return array of [death_iteration, oscillations, population_difference/iteration] shaped (runs, 3)
+"""
+def fitness_components(prey, predators, step=None, total_steps=None):
+  prey = np.atleast_2d(np.asarray(prey, dtype=np.float64));
+  predators = np.atleast_2d(np.asarray(predators, dtype=np.float64));
+  runs, steps = prey.shape;
+  if step is None:
+    step = np.broadcast_to(np.arange(1, steps+1), (runs, steps));
+  step = np.atleast_2d(np.asarray(step));
+  logged = step>0;
+  prey = np.where(logged, prey, np.nan);
+  predators = np.where(logged, predators, np.nan);
+  iteration = np.where(logged, step, 0).max(axis=1, initial=0).astype(np.float64);
+  difference = np.abs(predators-prey);
+  population_difference = np.nansum(difference, axis=1);
+
+  # The largest population starts as prey and only changes on a strict majority, so ties keep the previous largest population.
+  # Forward fill the largest population of each step, then count its changes
+  largest = np.where(predators>prey, 1, np.where(prey>predators, 0, -1));
+  largest = np.concatenate((np.zeros((runs, 1), dtype=largest.dtype), largest), axis=1);
+  last_change = np.where(largest>=0, np.arange(steps+1), 0);
+  np.maximum.accumulate(last_change, axis=1, out=last_change);
+  largest = np.take_along_axis(largest, last_change, axis=1);
+  oscillations = np.count_nonzero(largest[:, 1:]!=largest[:, :-1], axis=1).astype(np.float64);
+
+  # Death is the first step at which prey or predators are extinct
+  extinct = (prey==0) | (predators==0);
+  died = extinct.any(axis=1);
+  death_index = extinct.argmax(axis=1);
+  death_iteration = np.where(died, step[np.arange(runs), death_index], 0).astype(np.float64);
+  if total_steps is not None:
+    remaining_steps = np.where(died, np.maximum(total_steps-iteration, 0), 0);
+    population_difference = population_difference+remaining_steps*np.where(died, difference[np.arange(runs), death_index], 0);
+    iteration = iteration+remaining_steps;
+  with np.errstate(divide='ignore', invalid='ignore'):
+    mean_difference = population_difference/iteration;
+  return np.stack((death_iteration, oscillations, mean_difference), axis=1)
+
+
+"""
+  Computes the fitness components of simulations from a cheap count-only step log, in place of the per-step fitness host callback.
+  Set as the fitness function of an experiment, which calls it with the logs of its runs
+"""
+class CountLogFitness(object):
+  """
+    @param total_steps simulation steps of a complete run, used to complete runs ended early by extinction
+    @param logging_config logging config to add the prey and predator counts to. If None the counts must already be logged
+    @param steps_property environment property holding the simulation steps of each run, see Experiment.setStepsProperty. If provided it is logged and used in place of total_steps, so runs shortened for a partial fitness are completed to their own steps
+  """
+  def __init__(self, total_steps=None, logging_config=None, steps_property=None):
+    self.total_steps = total_steps;
+    self.steps_property = steps_property;
+    self.log_extractor = exp.LogExtractor(logging_config);
+    self.log_extractor.agent("Prey").logCount();
+    self.log_extractor.agent("Predator").logCount();
+    if steps_property is not None:
+      self.log_extractor.logEnvironment(steps_property, "UInt");
+
+  def __call__(self, logs):
+    log_data = self.log_extractor.extract(logs);
+    total_steps = self.total_steps;
+    if self.steps_property is not None:
+      total_steps = np.fmax.reduce(log_data[self.steps_property], axis=1);
+    return fitness_components(log_data["Prey_count"], log_data["Predator_count"], log_data["step"], total_steps)
@@ -1,9 +1,11 @@
 from pyflamegpu import *
 import sys, random, math
+import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import experiment_generator as exp
+import ppg_fitness
 sns.set()
 
 # Set whether to run single model or ensemble, agent population size, and simulation steps 
@@ -15,8 +17,15 @@ PREDATOR_POPULATION_SIZE = 10;
 GRASS_POPULATION_SIZE = 200;
 #STEPS = 100;
 STEPS = 10;
+# Simulation steps of each GA evaluation, and whether evaluations stop as soon as prey or predators go extinct
+EVALUATION_STEPS = 1000;
+EXTINCTION_EXIT = True;
+# Compute GA fitness after each evaluation from logged prey and predator counts, rather than with a per-step fitness host callback
+POST_HOC_FITNESS = True;
 # Change to false if pyflamegpu has not been built with visualisation support
 VISUALISATION = False;
+# Inject the initial populations of single simulations in bulk with setPopulationData, rather than from init functions
+BULK_POPULATION_INIT = True;
 
 """
   FLAME GPU 2 implementation of the Predator, Prey and Grass model, using spatial3D messaging.
@@ -837,246 +846,101 @@ FLAMEGPU_AGENT_FUNCTION(grass_growth, MsgNone, MsgNone) {
 }
 """
 
-model = pyflamegpu.ModelDescription("Prey_Predator_Grass");
-
-
-"""
-  GLOBALS
-"""
-env = model.Environment();
-# Population size to generate, if no agents are loaded from disk
-env.newPropertyUInt("PREY_POPULATION_TO_GENERATE", PREY_POPULATION_SIZE);
-env.newPropertyUInt("PREDATOR_POPULATION_TO_GENERATE", PREDATOR_POPULATION_SIZE);
-env.newPropertyUInt("GRASS_POPULATION_TO_GENERATE", GRASS_POPULATION_SIZE);
-env.newPropertyUInt("CURRENT_ID", 0);
-
-# Number of steps to simulate
-env.newPropertyUInt("STEPS", STEPS);
-
-# Environment Bounds
-env.newPropertyFloat("MIN_POSITION", -1.0);
-env.newPropertyFloat("MAX_POSITION", +1.0);
-env.newPropertyFloat("BOUNDS_WIDTH", 2.0);
-
-# Interaction Radii
-env.newPropertyFloat("PI", 3.1415);
-env.newPropertyFloat("PRED_PREY_INTERACTION_RADIUS", 0.1);
-env.newPropertyFloat("PREY_GROUP_COHESION_RADIUS", 0.2);
-env.newPropertyFloat("SAME_SPECIES_AVOIDANCE_RADIUS", 0.035);
-env.newPropertyFloat("GRASS_EAT_DISTANCE", 0.02);
-env.newPropertyFloat("PREDATOR_KILL_DISTANCE", 0.02);
-
-# Other globals
-env.newPropertyFloat("DELTA_TIME", 0.001);
-env.newPropertyFloat("PRED_SPEED_ADVANTAGE", 2.0);
-env.newPropertyFloat("MIN_SPEED", -1.0);
-env.newPropertyFloat("MAX_SPEED", +1.0);
-env.newPropertyFloat("SPEED_DIFFERENCE", 2.0);
-
-#Parameter globals
-env.newPropertyFloat("PREY_REPRODUCTION_CHANCE", 0.05);
-env.newPropertyFloat("PREDATOR_REPRODUCTION_CHANCE", 0.03);
-env.newPropertyUInt("GAIN_FROM_FOOD_PREDATOR", 75);
-env.newPropertyUInt("GAIN_FROM_FOOD_PREY", 50);
-env.newPropertyUInt("GRASS_REGROW_CYCLES", 100);
-
-#Fitness tracking variables
-env.newPropertyArrayFloat("fitnesses", 3, [0.0,0.0,0.0]);
-env.newPropertyUInt("iteration", 0);
-env.newPropertyUInt("current_largest_pop", 0);
-env.newPropertyUInt("population_difference", 0);
-env.newPropertyUInt("death_check", 0);
-env.newPropertyUInt("death_iteration", 0);
-env.newPropertyUInt("oscillations", 0);
-
-"""
-  Location messages
-"""
-grass_location_message = model.newMessageSpatial2D("grass_location_message");
-# Set the range and bounds.
-grass_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
-grass_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
-grass_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
-# A message to hold the location of an agent.
-grass_location_message.newVariableInt("id");
-
-prey_location_message = model.newMessageSpatial2D("prey_location_message");
-# Set the range and bounds.
-prey_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
-prey_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
-prey_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
-# A message to hold the location of an agent.
-prey_location_message.newVariableInt("id");
-
-predator_location_message = model.newMessageSpatial2D("predator_location_message");
-# Set the range and bounds.
-predator_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
-predator_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
-predator_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
-# A message to hold the location of an agent.
-predator_location_message.newVariableInt("id");
-
-"""
-  Eaten messages
-"""
-prey_eaten_message = model.newMessageSpatial2D("prey_eaten_message");
-# Set the range and bounds.
-prey_eaten_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
-prey_eaten_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
-prey_eaten_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
-# A message to hold the eaten of an agent.
-prey_eaten_message.newVariableInt("predator_id");
-
-grass_eaten_message = model.newMessageSpatial2D("grass_eaten_message");
-# Set the range and bounds.
-grass_eaten_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
-grass_eaten_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
-grass_eaten_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
-# A message to hold the eaten of an agent.
-grass_eaten_message.newVariableInt("prey_id");
-    
 """
-  Prey agent
-"""
-prey_agent = model.newAgent("Prey");
-prey_agent.newVariableInt("id");
-prey_agent.newVariableFloat("x");
-prey_agent.newVariableFloat("y");
-prey_agent.newVariableFloat("fx");
-prey_agent.newVariableFloat("fy");
-prey_agent.newVariableFloat("type");
-prey_agent.newVariableFloat("steer_x");
-prey_agent.newVariableFloat("steer_y");
-prey_agent.newVariableInt("life");
-prey_agent.newRTCFunction("prey_output_location_data", prey_output_location_data).setMessageOutput("prey_location_message");
-prey_agent.newRTCFunction("prey_avoid_predators", prey_avoid_predators).setMessageInput("predator_location_message");
-prey_agent.newRTCFunction("prey_flock", prey_flock).setMessageInput("prey_location_message");
-prey_agent.newRTCFunction("prey_move", prey_move);
-prey_agent.newRTCFunction("prey_eaten", prey_eaten).setMessageInput("predator_location_message");
-prey_agent.Function("prey_eaten").setMessageOutput("prey_eaten_message");
-prey_agent.Function("prey_eaten").setMessageOutputOptional(True);
-prey_agent.Function("prey_eaten").setAllowAgentDeath(True)
-prey_agent.newRTCFunction("prey_eat_or_starve", prey_eat_or_starve).setMessageInput("grass_eaten_message");
-prey_agent.Function("prey_eat_or_starve").setAllowAgentDeath(True)
-prey_agent.newRTCFunction("prey_reproduce", prey_reproduce).setAgentOutput(prey_agent);
-
-"""
-  Predator agent
-"""
-predator_agent = model.newAgent("Predator");
-predator_agent.newVariableInt("id");
-predator_agent.newVariableFloat("x");
-predator_agent.newVariableFloat("y");
-predator_agent.newVariableFloat("fx");
-predator_agent.newVariableFloat("fy");
-predator_agent.newVariableFloat("type");
-predator_agent.newVariableFloat("steer_x");
-predator_agent.newVariableFloat("steer_y");
-predator_agent.newVariableInt("life");
-predator_agent.newRTCFunction("predator_output_location_data", predator_output_location_data).setMessageOutput("predator_location_message");
-predator_agent.newRTCFunction("predator_follow_prey", predator_follow_prey).setMessageInput("prey_location_message");
-predator_agent.newRTCFunction("predator_avoidance", predator_avoidance).setMessageInput("predator_location_message");
-predator_agent.newRTCFunction("predator_move", predator_move);
-predator_agent.newRTCFunction("predator_eat_or_starve", predator_eat_or_starve).setMessageInput("prey_eaten_message");
-predator_agent.Function("predator_eat_or_starve").setAllowAgentDeath(True);
-predator_agent.newRTCFunction("predator_reproduce", predator_reproduce).setAgentOutput(predator_agent);
-
-"""
-  Grass agent
-"""
-grass_agent = model.newAgent("Grass");
-grass_agent.newVariableInt("id");
-grass_agent.newVariableFloat("x");
-grass_agent.newVariableFloat("y");
-grass_agent.newVariableFloat("type");
-grass_agent.newVariableInt("dead_cycles");
-grass_agent.newVariableInt("available");
-grass_agent.newRTCFunction("grass_output_location_data", grass_output_location_data).setMessageOutput("grass_location_message");
-grass_agent.newRTCFunction("grass_eaten", grass_eaten).setMessageInput("prey_location_message");
-grass_agent.Function("grass_eaten").setMessageOutput("grass_eaten_message");
-grass_agent.Function("grass_eaten").setMessageOutputOptional(True);
-grass_agent.newRTCFunction("grass_growth", grass_growth);
-
-#uagrass_agent = model.newAgent("Unavailable_Grass");
-#grass_agent.Function("grass_eaten").setAllowAgentDeath(True);
-#grass_agent.Function("grass_eaten").setAgentOutput(uagrass_agent);
-
-"""
-  Unavailable Grass agent
-"""
-
-# uagrass_agent.newVariableInt("id");
-# uagrass_agent.newVariableFloat("x");
-# uagrass_agent.newVariableFloat("y");
-# uagrass_agent.newVariableFloat("type");
-# uagrass_agent.newVariableInt("dead_cycles");
-# uagrass_agent.newRTCFunction("grass_growth", grass_growth).setAllowAgentDeath(True);
-# uagrass_agent.Function("grass_growth").setAgentOutput(grass_agent);
+  Population initialisation functions
+"""
+# Variable types of each agent population, used when applying generated columns to agents
+POPULATION_VARIABLE_TYPES = {
+  "Prey":{"id":"Int","x":"Float","y":"Float","type":"Float","fx":"Float","fy":"Float","steer_x":"Float","steer_y":"Float","life":"Int"},
+  "Predator":{"id":"Int","x":"Float","y":"Float","type":"Float","fx":"Float","fy":"Float","steer_x":"Float","steer_y":"Float","life":"Int"},
+  "Grass":{"id":"Int","x":"Float","y":"Float","type":"Float","dead_cycles":"Int","available":"Int"}
+};
+AGENT_TYPE_VALUES = {"Prey":2.0, "Predator":0.0, "Grass":1.0};
+
+"""
+  Draw every initial variable of an agent population in one shot with NumPy, with the same value distributions as drawing each agent individually.
+  Prey and predators get a random location, velocity and life within a large range for testing purposes, grass gets a random location
+  @return dictionary of NumPy arrays, one per agent variable
+"""
+def generate_population_columns(agent_name, population_size, current_id, min_pos, max_pos, min_speed=-1.0, max_speed=1.0):
+  columns = {};
+  columns["id"] = np.arange(current_id, current_id+population_size, dtype=np.int32);
+  columns["x"] = np.random.uniform(min_pos, max_pos, population_size).astype(np.float32);
+  columns["y"] = np.random.uniform(min_pos, max_pos, population_size).astype(np.float32);
+  columns["type"] = np.full(population_size, AGENT_TYPE_VALUES[agent_name], dtype=np.float32);
+  if agent_name=="Grass":
+    columns["dead_cycles"] = np.zeros(population_size, dtype=np.int32);
+    columns["available"] = np.ones(population_size, dtype=np.int32);
+  else:
+    columns["fx"] = np.random.uniform(min_speed, max_speed, population_size).astype(np.float32);
+    columns["fy"] = np.random.uniform(min_speed, max_speed, population_size).astype(np.float32);
+    columns["steer_x"] = np.zeros(population_size, dtype=np.float32);
+    columns["steer_y"] = np.zeros(population_size, dtype=np.float32);
+    columns["life"] = np.random.randint(200, 5001, population_size, dtype=np.int32);
+  return columns;
+
+"""
+  Apply generated columns to a sequence of agents, e.g. new agents of a host function or the agents of an AgentVector.
+  Columns are converted to Python lists once, so no NumPy scalar conversion is paid per agent variable
+"""
+def set_population_columns(agents, agent_name, columns):
+  setters = [("setVariable"+POPULATION_VARIABLE_TYPES[agent_name][name], name, columns[name].tolist()) for name in POPULATION_VARIABLE_TYPES[agent_name]];
+  for i, instance in enumerate(agents):
+    for setter, name, values in setters:
+      getattr(instance, setter)(name, values[i]);
 
+"""
+  Create an AgentVector holding a whole agent population in a single allocation, to be injected with setPopulationData
+"""
+def create_population_vector(agent_description, agent_name, columns):
+  population_size = len(columns["id"]);
+  population = pyflamegpu.AgentVector(agent_description, population_size);
+  set_population_columns(population, agent_name, columns);
+  return population;
 
 """
-  Population initialisation functions
+  Generate the initial Prey, Predator and Grass populations of a simulation from the default environment properties of the model,
+  and inject them with setPopulationData. Used in place of the init functions for single simulations of a model created with init_populations=False
 """
+def set_initial_populations(simulation, model):
+  env = model.Environment();
+  current_id = env.getPropertyUInt("CURRENT_ID");
+  for agent_name, size_property in [("Prey","PREY_POPULATION_TO_GENERATE"),("Predator","PREDATOR_POPULATION_TO_GENERATE"),("Grass","GRASS_POPULATION_TO_GENERATE")]:
+    population_size = env.getPropertyUInt(size_property);
+    columns = generate_population_columns(agent_name, population_size, current_id, env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MIN_SPEED"), env.getPropertyFloat("MAX_SPEED"));
+    simulation.setPopulationData(create_population_vector(model.getAgent(agent_name), agent_name, columns));
+    current_id = current_id+max(population_size-1,0);
+
+"""
+  Init function body shared by each population, creating agents with all variable values drawn in one shot.
+  CURRENT_ID is advanced as by the original per agent init functions
+"""
+def init_population(FLAMEGPU, agent_name, size_property):
+  populationSize = FLAMEGPU.environment.getPropertyUInt(size_property);
+  min_pos = FLAMEGPU.environment.getPropertyFloat("MIN_POSITION");
+  max_pos = FLAMEGPU.environment.getPropertyFloat("MAX_POSITION");
+  min_speed = FLAMEGPU.environment.getPropertyFloat("MIN_SPEED");
+  max_speed = FLAMEGPU.environment.getPropertyFloat("MAX_SPEED");
+  current_id = FLAMEGPU.environment.getPropertyUInt("CURRENT_ID");
+  columns = generate_population_columns(agent_name, populationSize, current_id, min_pos, max_pos, min_speed, max_speed);
+  agent = FLAMEGPU.agent(agent_name);
+  set_population_columns((agent.newAgent() for i in range(populationSize)), agent_name, columns);
+  FLAMEGPU.environment.setPropertyUInt("CURRENT_ID", current_id+max(populationSize-1,0));
+
 # Add init function for creating prey population with random initial location and life within large range for testing purposes
 class initPreyPopulation(pyflamegpu.HostFunctionCallback):
   def run(self,FLAMEGPU):
-    populationSize = FLAMEGPU.environment.getPropertyUInt("PREY_POPULATION_TO_GENERATE");
-    min_pos = FLAMEGPU.environment.getPropertyFloat("MIN_POSITION");
-    max_pos = FLAMEGPU.environment.getPropertyFloat("MAX_POSITION");
-    min_speed = FLAMEGPU.environment.getPropertyFloat("MIN_SPEED");
-    max_speed = FLAMEGPU.environment.getPropertyFloat("MAX_SPEED");
-    current_id = FLAMEGPU.environment.getPropertyUInt("CURRENT_ID");
-    for i in range(populationSize):
-      instance = FLAMEGPU.agent("Prey").newAgent();
-      instance.setVariableInt("id", current_id+i);
-      instance.setVariableFloat("x", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("y", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("type", 2.0);
-      instance.setVariableFloat("fx", random.uniform(min_speed, max_speed));
-      instance.setVariableFloat("fy", random.uniform(min_speed, max_speed));
-      instance.setVariableFloat("steer_x", 0.0);
-      instance.setVariableFloat("steer_y", 0.0);
-      instance.setVariableInt("life", random.randint(200,5000));
-    FLAMEGPU.environment.setPropertyUInt("CURRENT_ID", current_id+i)
+    init_population(FLAMEGPU, "Prey", "PREY_POPULATION_TO_GENERATE");
     return
 # Add init function for creating predator population with random initial location and life within large range for testing purposes
 class initPredatorPopulation(pyflamegpu.HostFunctionCallback):
   def run(self,FLAMEGPU):
-    populationSize = FLAMEGPU.environment.getPropertyUInt("PREDATOR_POPULATION_TO_GENERATE");
-    min_pos = FLAMEGPU.environment.getPropertyFloat("MIN_POSITION");
-    max_pos = FLAMEGPU.environment.getPropertyFloat("MAX_POSITION");
-    min_speed = FLAMEGPU.environment.getPropertyFloat("MIN_SPEED");
-    max_speed = FLAMEGPU.environment.getPropertyFloat("MAX_SPEED");
-    current_id = FLAMEGPU.environment.getPropertyUInt("CURRENT_ID");
-    for i in range(populationSize):
-      instance = FLAMEGPU.agent("Predator").newAgent();
-      instance.setVariableInt("id", current_id+i);
-      instance.setVariableFloat("x", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("y", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("type", 0.0);
-      instance.setVariableFloat("fx", random.uniform(min_speed, max_speed));
-      instance.setVariableFloat("fy", random.uniform(min_speed, max_speed));
-      instance.setVariableFloat("steer_x", 0.0);
-      instance.setVariableFloat("steer_y", 0.0);
-      instance.setVariableInt("life", random.randint(200,5000));
-    FLAMEGPU.environment.setPropertyUInt("CURRENT_ID", current_id+i)
+    init_population(FLAMEGPU, "Predator", "PREDATOR_POPULATION_TO_GENERATE");
     return
 # Add init function for creating grass population with random initial location
 class initGrassPopulation(pyflamegpu.HostFunctionCallback):
   def run(self,FLAMEGPU):
-    populationSize = FLAMEGPU.environment.getPropertyUInt("GRASS_POPULATION_TO_GENERATE");
-    min_pos = FLAMEGPU.environment.getPropertyFloat("MIN_POSITION");
-    max_pos = FLAMEGPU.environment.getPropertyFloat("MAX_POSITION");
-    current_id = FLAMEGPU.environment.getPropertyUInt("CURRENT_ID");
-    for i in range(populationSize):
-      instance = FLAMEGPU.agent("Grass").newAgent();
-      instance.setVariableInt("id", current_id+i);
-      instance.setVariableFloat("x", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("y", random.uniform(min_pos, max_pos));
-      instance.setVariableFloat("type", 1.0);
-      instance.setVariableInt("dead_cycles", 0);
-      instance.setVariableInt("available", 1);
-    FLAMEGPU.environment.setPropertyUInt("CURRENT_ID", current_id+i)
+    init_population(FLAMEGPU, "Grass", "GRASS_POPULATION_TO_GENERATE");
     return
 
 # Add init function for setting up fitness tracking and calculation
@@ -1112,119 +976,409 @@ class step_fitness_calculator(pyflamegpu.HostFunctionCallback):
       if (prey==0 or predators==0):
         FLAMEGPU.environment.setPropertyUInt("death_iteration", FLAMEGPU.environment.getPropertyUInt("iteration"));
         FLAMEGPU.environment.setPropertyUInt("death_check", 1);
+        FLAMEGPU.environment.setPropertyUInt("extinction_difference", abs(predators-prey));
     #print("step fitness")
     #print("\t", prey, predators, FLAMEGPU.environment.getPropertyUInt("current_largest_pop"), FLAMEGPU.environment.getPropertyUInt("population_difference"), FLAMEGPU.environment.getPropertyUInt("oscillations"), FLAMEGPU.environment.getPropertyUInt("death_check"), FLAMEGPU.environment.getPropertyUInt("death_iteration"))
     return
 
+# Add exit condition ending the simulation once prey or predators are extinct, as no further oscillations can occur
+class extinction_condition(pyflamegpu.HostFunctionConditionCallback):
+  def run(self,FLAMEGPU):
+    if (FLAMEGPU.agent("Prey").count()==0 or FLAMEGPU.agent("Predator").count()==0):
+      return pyflamegpu.EXIT;
+    return pyflamegpu.CONTINUE;
+
 # Add exit function for final fitness calculation as used in the FLAMEGPU1 model
 class exit_fitness_calculator(pyflamegpu.HostFunctionCallback):
   def run(self,FLAMEGPU):
+    # If the simulation ended at extinction, complete the fitness tracking for the remaining steps.
+    # Oscillations can no longer occur and the surviving population is held at its size at extinction
+    remaining_steps = FLAMEGPU.environment.getPropertyUInt("STEPS")-FLAMEGPU.environment.getPropertyUInt("iteration");
+    if (FLAMEGPU.environment.getPropertyUInt("death_check")==1 and remaining_steps>0):
+      FLAMEGPU.environment.setPropertyUInt("population_difference", FLAMEGPU.environment.getPropertyUInt("population_difference")+remaining_steps*FLAMEGPU.environment.getPropertyUInt("extinction_difference"));
+      FLAMEGPU.environment.setPropertyUInt("iteration", FLAMEGPU.environment.getPropertyUInt("STEPS"));
     FLAMEGPU.environment.setPropertyArrayFloat("fitnesses", [float(FLAMEGPU.environment.getPropertyUInt("death_iteration")), float(FLAMEGPU.environment.getPropertyUInt("oscillations")), float(FLAMEGPU.environment.getPropertyUInt("population_difference"))/FLAMEGPU.environment.getPropertyUInt("iteration")]);
     return
 
-# Add function callback to INIT functions for population generation
-initialPreyPopulation = initPreyPopulation();
-model.addInitFunctionCallback(initialPreyPopulation);
-initialPredatorPopulation = initPredatorPopulation();
-model.addInitFunctionCallback(initialPredatorPopulation);
-initialGrassPopulation = initGrassPopulation();
-model.addInitFunctionCallback(initialGrassPopulation);
-
-#initfit = init_fitness_calculator()
-#model.addInitFunctionCallback(initfit);
-stepfit = step_fitness_calculator()
-model.addStepFunctionCallback(stepfit);
-exitfit = exit_fitness_calculator()
-model.addExitFunctionCallback(exitfit);
-
-"""
-  Control flow
-"""    
-# Layer #1
-model.newLayer("L1").addAgentFunction("Prey", "prey_output_location_data");
-model.Layer("L1").addAgentFunction("Predator", "predator_output_location_data");
-model.Layer("L1").addAgentFunction("Grass", "grass_output_location_data");
-# Layer #2
-model.newLayer("L2").addAgentFunction("Predator", "predator_follow_prey");
-model.Layer("L2").addAgentFunction("Prey", "prey_avoid_predators");
-# Layer #3
-model.newLayer("L3").addAgentFunction("Prey", "prey_flock");
-model.Layer("L3").addAgentFunction("Predator", "predator_avoidance");
-# Layer #4
-model.newLayer("L4").addAgentFunction("Prey", "prey_move");
-model.Layer("L4").addAgentFunction("Predator", "predator_move");
-# Layer #5
-model.newLayer("L5").addAgentFunction("Grass", "grass_eaten");
-model.Layer("L5").addAgentFunction("Prey", "prey_eaten");
-# Layer #6
-model.newLayer("L6").addAgentFunction("Prey", "prey_eat_or_starve");
-model.Layer("L6").addAgentFunction("Predator", "predator_eat_or_starve");
-# Layer #7
-#model.newLayer("L7").addAgentFunction("Unavailable_Grass", "grass_growth");
-model.newLayer("L7").addAgentFunction("Grass", "grass_growth");
-model.Layer("L7").addAgentFunction("Prey", "prey_reproduce");
-model.Layer("L7").addAgentFunction("Predator", "predator_reproduce");
-
-# Create and configure logging details 
-logging_config = pyflamegpu.LoggingConfig(model);
-logging_config.logEnvironment("PREDATOR_KILL_DISTANCE");
-logging_config.logEnvironment("MIN_SPEED");
-logging_config.logEnvironment("GRASS_EAT_DISTANCE");
-logging_config.logEnvironment("CURRENT_ID");
-prey_agent_log = logging_config.agent("Prey");
-prey_agent_log.logCount();
-prey_agent_log.logMeanFloat("x");
-prey_agent_log.logMeanFloat("y");
-prey_agent_log.logMeanFloat("fx");
-prey_agent_log.logMeanFloat("fy");
-prey_agent_log.logMeanInt("life");
-prey_agent_log.logStandardDevInt("life");
-predator_agent_log = logging_config.agent("Predator");
-predator_agent_log.logCount();
-predator_agent_log.logMeanFloat("x");
-predator_agent_log.logMeanFloat("y");
-predator_agent_log.logMeanFloat("fx");
-predator_agent_log.logMeanFloat("fy");
-predator_agent_log.logMeanInt("life");
-predator_agent_log.logStandardDevInt("life");
-grass_agent_log = logging_config.agent("Grass");
-grass_agent_log.logCount();
-grass_agent_log.logMeanInt("available");
-grass_agent_log.logMeanInt("dead_cycles");
-grass_agent_log.logStandardDevInt("dead_cycles");
-# uagrass_agent_log = logging_config.agent("Unavailable_Grass");
-# uagrass_agent_log.logCount();
-# uagrass_agent_log.logMeanInt("dead_cycles");
-# uagrass_agent_log.logStandardDevInt("dead_cycles");
-
-
-logging_config.logEnvironment("fitnesses");
-
-
-step_log = pyflamegpu.StepLoggingConfig(logging_config);
-step_log.setFrequency(1);
+"""
+  Create the model description, agent functions, host callbacks, layers and logging configuration.
+  Building the model is the fixed cost of every new process, so it is done once per process rather than at import
+"""
+host_callbacks = [];
+log_extractor = None;
+environment_override = None;
+def create_model(steps=STEPS, extinction_exit=False, init_populations=True, step_fitness=True):
+  model = pyflamegpu.ModelDescription("Prey_Predator_Grass");
+
+
+  """
+    GLOBALS
+  """
+  env = model.Environment();
+  # Population size to generate, if no agents are loaded from disk
+  env.newPropertyUInt("PREY_POPULATION_TO_GENERATE", PREY_POPULATION_SIZE);
+  env.newPropertyUInt("PREDATOR_POPULATION_TO_GENERATE", PREDATOR_POPULATION_SIZE);
+  env.newPropertyUInt("GRASS_POPULATION_TO_GENERATE", GRASS_POPULATION_SIZE);
+  env.newPropertyUInt("CURRENT_ID", 0);
+
+  # Number of steps to simulate
+  env.newPropertyUInt("STEPS", steps);
+
+  # Environment Bounds
+  env.newPropertyFloat("MIN_POSITION", -1.0);
+  env.newPropertyFloat("MAX_POSITION", +1.0);
+  env.newPropertyFloat("BOUNDS_WIDTH", 2.0);
+
+  # Interaction Radii
+  env.newPropertyFloat("PI", 3.1415);
+  env.newPropertyFloat("PRED_PREY_INTERACTION_RADIUS", 0.1);
+  env.newPropertyFloat("PREY_GROUP_COHESION_RADIUS", 0.2);
+  env.newPropertyFloat("SAME_SPECIES_AVOIDANCE_RADIUS", 0.035);
+  env.newPropertyFloat("GRASS_EAT_DISTANCE", 0.02);
+  env.newPropertyFloat("PREDATOR_KILL_DISTANCE", 0.02);
+
+  # Other globals
+  env.newPropertyFloat("DELTA_TIME", 0.001);
+  env.newPropertyFloat("PRED_SPEED_ADVANTAGE", 2.0);
+  env.newPropertyFloat("MIN_SPEED", -1.0);
+  env.newPropertyFloat("MAX_SPEED", +1.0);
+  env.newPropertyFloat("SPEED_DIFFERENCE", 2.0);
+
+  #Parameter globals
+  env.newPropertyFloat("PREY_REPRODUCTION_CHANCE", 0.05);
+  env.newPropertyFloat("PREDATOR_REPRODUCTION_CHANCE", 0.03);
+  env.newPropertyUInt("GAIN_FROM_FOOD_PREDATOR", 75);
+  env.newPropertyUInt("GAIN_FROM_FOOD_PREY", 50);
+  env.newPropertyUInt("GRASS_REGROW_CYCLES", 100);
+
+  #Fitness tracking variables
+  env.newPropertyArrayFloat("fitnesses", 3, [0.0,0.0,0.0]);
+  env.newPropertyUInt("iteration", 0);
+  env.newPropertyUInt("current_largest_pop", 0);
+  env.newPropertyUInt("population_difference", 0);
+  env.newPropertyUInt("death_check", 0);
+  env.newPropertyUInt("death_iteration", 0);
+  env.newPropertyUInt("extinction_difference", 0);
+  env.newPropertyUInt("oscillations", 0);
+
+  """
+    Location messages
+  """
+  grass_location_message = model.newMessageSpatial2D("grass_location_message");
+  # Set the range and bounds.
+  grass_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
+  grass_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
+  grass_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
+  # A message to hold the location of an agent.
+  grass_location_message.newVariableInt("id");
+
+  prey_location_message = model.newMessageSpatial2D("prey_location_message");
+  # Set the range and bounds.
+  prey_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
+  prey_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
+  prey_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
+  # A message to hold the location of an agent.
+  prey_location_message.newVariableInt("id");
+
+  predator_location_message = model.newMessageSpatial2D("predator_location_message");
+  # Set the range and bounds.
+  predator_location_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
+  predator_location_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
+  predator_location_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
+  # A message to hold the location of an agent.
+  predator_location_message.newVariableInt("id");
+
+  """
+    Eaten messages
+  """
+  prey_eaten_message = model.newMessageSpatial2D("prey_eaten_message");
+  # Set the range and bounds.
+  prey_eaten_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
+  prey_eaten_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
+  prey_eaten_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
+  # A message to hold the eaten of an agent.
+  prey_eaten_message.newVariableInt("predator_id");
+
+  grass_eaten_message = model.newMessageSpatial2D("grass_eaten_message");
+  # Set the range and bounds.
+  grass_eaten_message.setRadius(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS"));
+  grass_eaten_message.setMin(env.getPropertyFloat("MIN_POSITION"), env.getPropertyFloat("MIN_POSITION"));
+  grass_eaten_message.setMax(env.getPropertyFloat("MAX_POSITION"), env.getPropertyFloat("MAX_POSITION"));
+  # A message to hold the eaten of an agent.
+  grass_eaten_message.newVariableInt("prey_id");
+    
+  """
+    Prey agent
+  """
+  prey_agent = model.newAgent("Prey");
+  prey_agent.newVariableInt("id");
+  prey_agent.newVariableFloat("x");
+  prey_agent.newVariableFloat("y");
+  prey_agent.newVariableFloat("fx");
+  prey_agent.newVariableFloat("fy");
+  prey_agent.newVariableFloat("type");
+  prey_agent.newVariableFloat("steer_x");
+  prey_agent.newVariableFloat("steer_y");
+  prey_agent.newVariableInt("life");
+  prey_agent.newRTCFunction("prey_output_location_data", prey_output_location_data).setMessageOutput("prey_location_message");
+  prey_agent.newRTCFunction("prey_avoid_predators", prey_avoid_predators).setMessageInput("predator_location_message");
+  prey_agent.newRTCFunction("prey_flock", prey_flock).setMessageInput("prey_location_message");
+  prey_agent.newRTCFunction("prey_move", prey_move);
+  prey_agent.newRTCFunction("prey_eaten", prey_eaten).setMessageInput("predator_location_message");
+  prey_agent.Function("prey_eaten").setMessageOutput("prey_eaten_message");
+  prey_agent.Function("prey_eaten").setMessageOutputOptional(True);
+  prey_agent.Function("prey_eaten").setAllowAgentDeath(True)
+  prey_agent.newRTCFunction("prey_eat_or_starve", prey_eat_or_starve).setMessageInput("grass_eaten_message");
+  prey_agent.Function("prey_eat_or_starve").setAllowAgentDeath(True)
+  prey_agent.newRTCFunction("prey_reproduce", prey_reproduce).setAgentOutput(prey_agent);
+
+  """
+    Predator agent
+  """
+  predator_agent = model.newAgent("Predator");
+  predator_agent.newVariableInt("id");
+  predator_agent.newVariableFloat("x");
+  predator_agent.newVariableFloat("y");
+  predator_agent.newVariableFloat("fx");
+  predator_agent.newVariableFloat("fy");
+  predator_agent.newVariableFloat("type");
+  predator_agent.newVariableFloat("steer_x");
+  predator_agent.newVariableFloat("steer_y");
+  predator_agent.newVariableInt("life");
+  predator_agent.newRTCFunction("predator_output_location_data", predator_output_location_data).setMessageOutput("predator_location_message");
+  predator_agent.newRTCFunction("predator_follow_prey", predator_follow_prey).setMessageInput("prey_location_message");
+  predator_agent.newRTCFunction("predator_avoidance", predator_avoidance).setMessageInput("predator_location_message");
+  predator_agent.newRTCFunction("predator_move", predator_move);
+  predator_agent.newRTCFunction("predator_eat_or_starve", predator_eat_or_starve).setMessageInput("prey_eaten_message");
+  predator_agent.Function("predator_eat_or_starve").setAllowAgentDeath(True);
+  predator_agent.newRTCFunction("predator_reproduce", predator_reproduce).setAgentOutput(predator_agent);
+
+  """
+    Grass agent
+  """
+  grass_agent = model.newAgent("Grass");
+  grass_agent.newVariableInt("id");
+  grass_agent.newVariableFloat("x");
+  grass_agent.newVariableFloat("y");
+  grass_agent.newVariableFloat("type");
+  grass_agent.newVariableInt("dead_cycles");
+  grass_agent.newVariableInt("available");
+  grass_agent.newRTCFunction("grass_output_location_data", grass_output_location_data).setMessageOutput("grass_location_message");
+  grass_agent.newRTCFunction("grass_eaten", grass_eaten).setMessageInput("prey_location_message");
+  grass_agent.Function("grass_eaten").setMessageOutput("grass_eaten_message");
+  grass_agent.Function("grass_eaten").setMessageOutputOptional(True);
+  grass_agent.newRTCFunction("grass_growth", grass_growth);
+
+  #uagrass_agent = model.newAgent("Unavailable_Grass");
+  #grass_agent.Function("grass_eaten").setAllowAgentDeath(True);
+  #grass_agent.Function("grass_eaten").setAgentOutput(uagrass_agent);
+
+  """
+    Unavailable Grass agent
+  """
+
+  # uagrass_agent.newVariableInt("id");
+  # uagrass_agent.newVariableFloat("x");
+  # uagrass_agent.newVariableFloat("y");
+  # uagrass_agent.newVariableFloat("type");
+  # uagrass_agent.newVariableInt("dead_cycles");
+  # uagrass_agent.newRTCFunction("grass_growth", grass_growth).setAllowAgentDeath(True);
+  # uagrass_agent.Function("grass_growth").setAgentOutput(grass_agent);
+
+
+
+  # The first init function applies the GA genes of each evaluation, before the populations are generated from them
+  global environment_override
+  environment_override = exp.EnvironmentOverride();
+  model.addInitFunctionCallback(environment_override);
+  host_callbacks.append(environment_override);
+  # Add function callback to INIT functions for population generation, unless populations are injected with set_initial_populations
+  initialPreyPopulation = initPreyPopulation();
+  initialPredatorPopulation = initPredatorPopulation();
+  initialGrassPopulation = initGrassPopulation();
+  if init_populations:
+    model.addInitFunctionCallback(initialPreyPopulation);
+    model.addInitFunctionCallback(initialPredatorPopulation);
+    model.addInitFunctionCallback(initialGrassPopulation);
+
+  #initfit = init_fitness_calculator()
+  #model.addInitFunctionCallback(initfit);
+  # Python host callbacks are not owned by the model, keep them alive for as long as the model is
+  host_callbacks.extend([initialPreyPopulation, initialPredatorPopulation, initialGrassPopulation]);
+  # Without step fitness tracking, fitness is computed after the simulation from the logged populations (see ppg_fitness)
+  if step_fitness:
+    stepfit = step_fitness_calculator()
+    model.addStepFunctionCallback(stepfit);
+    exitfit = exit_fitness_calculator()
+    model.addExitFunctionCallback(exitfit);
+    host_callbacks.extend([stepfit, exitfit]);
+  if extinction_exit:
+    extinction = extinction_condition();
+    model.addExitConditionCallback(extinction);
+    host_callbacks.append(extinction);
+
+  """
+    Control flow
+  """    
+  # Layer #1
+  model.newLayer("L1").addAgentFunction("Prey", "prey_output_location_data");
+  model.Layer("L1").addAgentFunction("Predator", "predator_output_location_data");
+  model.Layer("L1").addAgentFunction("Grass", "grass_output_location_data");
+  # Layer #2
+  model.newLayer("L2").addAgentFunction("Predator", "predator_follow_prey");
+  model.Layer("L2").addAgentFunction("Prey", "prey_avoid_predators");
+  # Layer #3
+  model.newLayer("L3").addAgentFunction("Prey", "prey_flock");
+  model.Layer("L3").addAgentFunction("Predator", "predator_avoidance");
+  # Layer #4
+  model.newLayer("L4").addAgentFunction("Prey", "prey_move");
+  model.Layer("L4").addAgentFunction("Predator", "predator_move");
+  # Layer #5
+  model.newLayer("L5").addAgentFunction("Grass", "grass_eaten");
+  model.Layer("L5").addAgentFunction("Prey", "prey_eaten");
+  # Layer #6
+  model.newLayer("L6").addAgentFunction("Prey", "prey_eat_or_starve");
+  model.Layer("L6").addAgentFunction("Predator", "predator_eat_or_starve");
+  # Layer #7
+  #model.newLayer("L7").addAgentFunction("Unavailable_Grass", "grass_growth");
+  model.newLayer("L7").addAgentFunction("Grass", "grass_growth");
+  model.Layer("L7").addAgentFunction("Prey", "prey_reproduce");
+  model.Layer("L7").addAgentFunction("Predator", "predator_reproduce");
+
+  # Create and configure logging details 
+  logging_config = pyflamegpu.LoggingConfig(model);
+  # Configure logging through an extractor, which records what is logged so step logs can be read into arrays in a single pass
+  global log_extractor
+  log_extractor = exp.LogExtractor(logging_config);
+  log_extractor.logEnvironment("PREDATOR_KILL_DISTANCE");
+  log_extractor.logEnvironment("MIN_SPEED");
+  log_extractor.logEnvironment("GRASS_EAT_DISTANCE");
+  log_extractor.logEnvironment("CURRENT_ID");
+  prey_agent_log = log_extractor.agent("Prey");
+  prey_agent_log.logCount();
+  prey_agent_log.logMeanFloat("x");
+  prey_agent_log.logMeanFloat("y");
+  prey_agent_log.logMeanFloat("fx");
+  prey_agent_log.logMeanFloat("fy");
+  prey_agent_log.logMeanInt("life");
+  prey_agent_log.logStandardDevInt("life");
+  predator_agent_log = log_extractor.agent("Predator");
+  predator_agent_log.logCount();
+  predator_agent_log.logMeanFloat("x");
+  predator_agent_log.logMeanFloat("y");
+  predator_agent_log.logMeanFloat("fx");
+  predator_agent_log.logMeanFloat("fy");
+  predator_agent_log.logMeanInt("life");
+  predator_agent_log.logStandardDevInt("life");
+  grass_agent_log = log_extractor.agent("Grass");
+  grass_agent_log.logCount();
+  grass_agent_log.logMeanInt("available");
+  grass_agent_log.logMeanInt("dead_cycles");
+  grass_agent_log.logStandardDevInt("dead_cycles");
+  # uagrass_agent_log = log_extractor.agent("Unavailable_Grass");
+  # uagrass_agent_log.logCount();
+  # uagrass_agent_log.logMeanInt("dead_cycles");
+  # uagrass_agent_log.logStandardDevInt("dead_cycles");
+
+
+  log_extractor.logEnvironment("fitnesses");
+  return model, logging_config;
+
+
+"""
+  Create the GA evaluation experiment for the model. Called without arguments by each pool evaluator worker to build its own model instance
+"""
+def create_experiment(model=None, logging_config=None):
+  if model==None:
+    model, logging_config = create_model(EVALUATION_STEPS, EXTINCTION_EXIT, step_fitness=not POST_HOC_FITNESS);
+  experiment_initial_state_generator = exp.InitialStateGenerator();
+
+  experiment_initial_state_generator.setGlobalFloat("PREY_REPRODUCTION_CHANCE",(0.01,0.1));
+  experiment_initial_state_generator.setGlobalFloat("PREDATOR_REPRODUCTION_CHANCE",(0.01,0.1));
+  experiment_initial_state_generator.setGlobalInt("GAIN_FROM_FOOD_PREDATOR",(10,200));
+  experiment_initial_state_generator.setGlobalInt("GAIN_FROM_FOOD_PREY",(10,200));
+  experiment_initial_state_generator.setGlobalInt("GRASS_REGROW_CYCLES",(10,200));
+
+  experiment_initial_state_generator.setGlobalFloat("MIN_POSITION", -1.0);
+  experiment_initial_state_generator.setGlobalFloat("MAX_POSITION", 1.0);
+  experiment_initial_state_generator.setGlobalFloat("BOUNDS_WIDTH", 2.0);
+  experiment_initial_state_generator.setGlobalFloat("PRED_PREY_INTERACTION_RADIUS", 0.1);
+  experiment_initial_state_generator.setGlobalFloat("PREY_GROUP_COHESION_RADIUS", 0.2);
+  experiment_initial_state_generator.setGlobalFloat("SAME_SPECIES_AVOIDANCE_RADIUS", 0.035);
+  experiment_initial_state_generator.setGlobalFloat("GRASS_EAT_DISTANCE", 0.02);
+  experiment_initial_state_generator.setGlobalFloat("PREDATOR_KILL_DISTANCE", 0.02);
+  experiment_initial_state_generator.setGlobalFloat("DELTA_TIME", 0.001);
+  experiment_initial_state_generator.setGlobalFloat("PRED_SPEED_ADVANTAGE", 2.0);
+  experiment_initial_state_generator.setGlobalFloat("MIN_SPEED", -1.0);
+  experiment_initial_state_generator.setGlobalFloat("MAX_SPEED", 1.0);
+  experiment_initial_state_generator.setGlobalFloat("SPEED_DIFFERENCE", 2.0);
+
+  prey_population = exp.AgentPopulation("Prey");
+  predator_population = exp.AgentPopulation("Predator");
+  grass_population = exp.AgentPopulation("Grass");
+
+  #prey_population.setPopSizeRandom((64,256));
+  prey_population.setVariableRandomPerAgent("x",(-1.0,1.0));
+  prey_population.setVariableRandomPerAgent("y",(-1.0,1.0));
+  prey_population.setVariableRandomPerAgent("fx",(-1.0,1.0));
+  prey_population.setVariableRandomPerAgent("fy",(-1.0,1.0));
+  prey_population.setVariableFloat("steer_x",0.0);
+  prey_population.setVariableFloat("steer_x",0.0);
+  prey_population.setVariableFloat("type",2.0);
+  prey_population.setVariableRandomPerAgent("life",(0,50), distribution=random.randint);
+
+  #predator_population.setPopSizeRandom((32,128));
+  predator_population.setVariableRandomPerAgent("x",(-1.0,1.0));
+  predator_population.setVariableRandomPerAgent("y",(-1.0,1.0));
+  predator_population.setVariableRandomPerAgent("fx",(-1.0,1.0));
+  predator_population.setVariableRandomPerAgent("fy",(-1.0,1.0));
+  predator_population.setVariable("steer_x",0.0);
+  predator_population.setVariable("steer_x",0.0);
+  predator_population.setVariable("type",0.0);
+  predator_population.setVariableRandomPerAgent("life",(0,40), distribution=random.randint);
+
+  #grass_population.setPopSizeRandom((256,1024));
+  grass_population.setVariableRandomPerAgent("x",(-1.0,1.0));
+  grass_population.setVariableRandomPerAgent("y",(-1.0,1.0));
+  grass_population.setVariable("type",1.0);
+  grass_population.setVariable("dead_cycles",0);
+
+  # Populations are sized by the GA genes and created by the model's init functions, so the described populations are not materialised into the runs
+  #experiment_initial_state_generator.addAgentPopulation(prey_population);
+  #experiment_initial_state_generator.addAgentPopulation(predator_population);
+  #experiment_initial_state_generator.addAgentPopulation(grass_population);
+
+  experiment = exp.Experiment("ppg_test_experiment");
+  experiment.setModel(model);
+  experiment.initialStateGenerator(experiment_initial_state_generator);
+  experiment.setSimulationSteps(EVALUATION_STEPS);
+  #experiment.setSimulationSteps(2);
+  # Runs shortened for a multi fidelity partial fitness complete their fitness to their own steps rather than EVALUATION_STEPS
+  experiment.setStepsProperty("STEPS");
+  experiment.setRuns(1);
+  if POST_HOC_FITNESS:
+    # Evaluations only log the prey and predator counts each step, from which fitness is computed once simulated
+    fitness_logging_config = pyflamegpu.LoggingConfig(model);
+    experiment.setFitnessFunction(ppg_fitness.CountLogFitness(EVALUATION_STEPS, fitness_logging_config, steps_property="STEPS"));
+    experiment.setLog(fitness_logging_config);
+  else:
+    experiment.setLog(logging_config);
+  # Every evaluation reuses the worker's simulation or ensemble, with the genes applied by the environment override
+  experiment.setEnvironmentOverride(environment_override);
+  experiment.setSession(True);
+  #experiment.verbose = True;
+  return experiment;
 
 
 def evaluator(pop,experiment):
   n = len(pop);
   evaluation = [0.0]*n;
   experiment.begin();
-  log_count = 0
-  print(type(experiment.sim_log))
-  for log in experiment.sim_log:
-    print(type(log))
-    steps = log.getStepLog();
-    agent_counter = 0
-    for step in steps:
-      print()
-      print(type(step))
-      print("prey",step.getAgent("Prey").getCount());
-      print("predator",step.getAgent("Predator").getCount());
-      p1_log = step.getAgent("Prey");
-      p2_log = step.getAgent("Predator");
-      agent_counter += p1_log.getCount() + p2_log.getCount();
-    evaluation[log_count] = agent_counter;
-    log_count += 1;
+  log_data = log_extractor.extract(experiment.sim_log);
+  # Total prey and predators over every logged step of each run
+  agent_counter = np.nansum(log_data["Prey_count"]+log_data["Predator_count"], axis=1);
+  for log_count in range(min(n, len(agent_counter))):
+    evaluation[log_count] = int(agent_counter[log_count]);
   print("evaluation",evaluation)
   return evaluation
 
@@ -1233,336 +1387,264 @@ def evaluator(pop,experiment):
   #return evaluation
 
 
-"""
-  Create Model Runner
-"""  
-if ENSEMBLE: 
+if __name__ == "__main__":
+  if PARAMETER_EXPERIMENT and not ENSEMBLE:
+    model, logging_config = create_model(EVALUATION_STEPS, EXTINCTION_EXIT, step_fitness=not POST_HOC_FITNESS);
+  else:
+    model, logging_config = create_model(init_populations=ENSEMBLE or not BULK_POPULATION_INIT);
+  env = model.Environment();
+  step_log = pyflamegpu.StepLoggingConfig(logging_config);
+  step_log.setFrequency(1);
+
   """
-  Create Run Plan Vector
-  """   
-  run_plan_vector = pyflamegpu.RunPlanVec(model, ENSEMBLE_RUNS);
-  run_plan_vector.setSteps(env.getPropertyUInt("STEPS"));
-  simulation_seed = random.randint(0,99999);
-  run_plan_vector.setRandomSimulationSeed(simulation_seed,1000);
-  simulation = pyflamegpu.CUDAEnsemble(model);
-else:
-  if PARAMETER_EXPERIMENT:
-    #MU = 100
-    #LAM = 25
-    MU = 10
-    LAM = 2
-    experiment_initial_state_generator = exp.InitialStateGenerator();
-
-    experiment_initial_state_generator.setGlobalFloat("PREY_REPRODUCTION_CHANCE",(0.01,0.1));
-    experiment_initial_state_generator.setGlobalFloat("PREDATOR_REPRODUCTION_CHANCE",(0.01,0.1));
-    experiment_initial_state_generator.setGlobalInt("GAIN_FROM_FOOD_PREDATOR",(10,200));
-    experiment_initial_state_generator.setGlobalInt("GAIN_FROM_FOOD_PREY",(10,200));
-    experiment_initial_state_generator.setGlobalInt("GRASS_REGROW_CYCLES",(10,200));
-
-    experiment_initial_state_generator.setGlobalFloat("MIN_POSITION", -1.0);
-    experiment_initial_state_generator.setGlobalFloat("MAX_POSITION", 1.0);
-    experiment_initial_state_generator.setGlobalFloat("BOUNDS_WIDTH", 2.0);
-    experiment_initial_state_generator.setGlobalFloat("PRED_PREY_INTERACTION_RADIUS", 0.1);
-    experiment_initial_state_generator.setGlobalFloat("PREY_GROUP_COHESION_RADIUS", 0.2);
-    experiment_initial_state_generator.setGlobalFloat("SAME_SPECIES_AVOIDANCE_RADIUS", 0.035);
-    experiment_initial_state_generator.setGlobalFloat("GRASS_EAT_DISTANCE", 0.02);
-    experiment_initial_state_generator.setGlobalFloat("PREDATOR_KILL_DISTANCE", 0.02);
-    experiment_initial_state_generator.setGlobalFloat("DELTA_TIME", 0.001);
-    experiment_initial_state_generator.setGlobalFloat("PRED_SPEED_ADVANTAGE", 2.0);
-    experiment_initial_state_generator.setGlobalFloat("MIN_SPEED", -1.0);
-    experiment_initial_state_generator.setGlobalFloat("MAX_SPEED", 1.0);
-    experiment_initial_state_generator.setGlobalFloat("SPEED_DIFFERENCE", 2.0);
-
-    prey_population = exp.AgentPopulation("Prey");
-    predator_population = exp.AgentPopulation("Predator");
-    grass_population = exp.AgentPopulation("Grass");
-
-    #prey_population.setPopSizeRandom((64,256));
-    prey_population.setVariableRandomPerAgent("x",(-1.0,1.0));
-    prey_population.setVariableRandomPerAgent("y",(-1.0,1.0));
-    prey_population.setVariableRandomPerAgent("fx",(-1.0,1.0));
-    prey_population.setVariableRandomPerAgent("fy",(-1.0,1.0));
-    prey_population.setVariableFloat("steer_x",0.0);
-    prey_population.setVariableFloat("steer_x",0.0);
-    prey_population.setVariableFloat("type",2.0);
-    prey_population.setVariableRandomPerAgent("life",(0,50), distribution=random.randint);
-
-    #predator_population.setPopSizeRandom((32,128));
-    predator_population.setVariableRandomPerAgent("x",(-1.0,1.0));
-    predator_population.setVariableRandomPerAgent("y",(-1.0,1.0));
-    predator_population.setVariableRandomPerAgent("fx",(-1.0,1.0));
-    predator_population.setVariableRandomPerAgent("fy",(-1.0,1.0));
-    predator_population.setVariable("steer_x",0.0);
-    predator_population.setVariable("steer_x",0.0);
-    predator_population.setVariable("type",0.0);
-    predator_population.setVariableRandomPerAgent("life",(0,40), distribution=random.randint);
-
-    #grass_population.setPopSizeRandom((256,1024));
-    grass_population.setVariableRandomPerAgent("x",(-1.0,1.0));
-    grass_population.setVariableRandomPerAgent("y",(-1.0,1.0));
-    grass_population.setVariable("type",1.0);
-    grass_population.setVariable("dead_cycles",0);
-
-    experiment_initial_state_generator.addAgentPopulation(prey_population);
-    experiment_initial_state_generator.addAgentPopulation(predator_population);
-    experiment_initial_state_generator.addAgentPopulation(grass_population);
-
-    experiment = exp.Experiment("ppg_test_experiment");
-    experiment.setModel(model);
-    experiment.initialStateGenerator(experiment_initial_state_generator);
-    experiment.setSimulationSteps(1000);
-    #experiment.setSimulationSteps(2);
-    experiment.setRuns(1);
-    experiment.setLog(logging_config);
-    #experiment.verbose = True;
-    ga_search = exp.Search();
-    #ga_search.parameter_limits = [(0,100),(0,100),(0,100)]
-    ga_search.parameter_limits = {"PREY_POPULATION_TO_GENERATE":(0,5000),"PREDATOR_POPULATION_TO_GENERATE":(0,5000),"GRASS_POPULATION_TO_GENERATE":(0,5000),"PREY_REPRODUCTION_CHANCE":(0.0,0.25),"PREDATOR_REPRODUCTION_CHANCE":(0.0,0.25),"GAIN_FROM_FOOD_PREY":(0,200),"GAIN_FROM_FOOD_PREDATOR":(0,200),"GRASS_REGROW_CYCLES":(0,200)}
-    ga_search.mu = MU;
-    ga_search.lamda = LAM;
-    ga_search.max_time = 10000000000
-    #ga_search.max_generations = 196
-    ga_search.max_generations = 10
-    ga_search.verbose = True;
-    #ga_search.eval_func = evaluator;
-    ga_search.setPopEvaluationExperiment(experiment);
-    ga_search.GA();
-    del ga_search
+    Create Model Runner
+  """  
+  if ENSEMBLE: 
+    """
+    Create Run Plan Vector
+    """   
+    run_plan_vector = pyflamegpu.RunPlanVec(model, ENSEMBLE_RUNS);
+    run_plan_vector.setSteps(env.getPropertyUInt("STEPS"));
+    simulation_seed = random.randint(0,99999);
+    run_plan_vector.setRandomSimulationSeed(simulation_seed,1000);
+    simulation = pyflamegpu.CUDAEnsemble(model);
   else:
-    simulation = pyflamegpu.CUDASimulation(model);
-    if not VISUALISATION:
-      simulation.SimulationConfig().steps = STEPS;
-
-    simulation.setStepLog(step_log);
-    simulation.setExitLog(logging_config)
-
-"""
-  Create Visualisation
-"""
-if pyflamegpu.VISUALISATION and VISUALISATION and not ENSEMBLE and not PARAMETER_EXPERIMENT:
-    visualisation = simulation.getVisualisation();
-    # Configure vis
-    envWidth = env.getPropertyFloat("MAX_POSITION") - env.getPropertyFloat("MIN_POSITION");
-    INIT_CAM = env.getPropertyFloat("MAX_POSITION") * 1.5;
-    visualisation.setInitialCameraLocation(0.0, 0.0, INIT_CAM);
-    visualisation.setCameraSpeed(0.002 * envWidth);
-    circ_prey_agt = visualisation.addAgent("Prey");
-    circ_predator_agt = visualisation.addAgent("Predator");
-    circ_grass_agt = visualisation.addAgent("Grass");
-    #circ_uagrass_agt = visualisation.addAgent("Unavailable_Grass");
-    # Position vars are named x, y, z; so they are used by default
-    circ_prey_agt.setModel(pyflamegpu.ICOSPHERE);
-    circ_predator_agt.setModel(pyflamegpu.ICOSPHERE);
-    circ_grass_agt.setModel(pyflamegpu.ICOSPHERE);
-    #circ_uagrass_agt.setModel(pyflamegpu.ICOSPHERE);
-    circ_prey_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
-    circ_prey_agt.setColor(pyflamegpu.BLUE);
-    circ_predator_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
-    circ_predator_agt.setColor(pyflamegpu.RED);
-    circ_grass_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
-    circ_grass_agt.setColor(pyflamegpu.GREEN);
-    #circ_uagrass_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
-    #circ_uagrass_agt.setColor(pyflamegpu.WHITE);
-    visualisation.activate();
-
-
-"""
-  Execution
-"""
-if ENSEMBLE:
-    simulation.simulate(run_plan_vector);
-else:
-  if not PARAMETER_EXPERIMENT:
-    simulation.simulate();
-
-"""
-  Export Pop
-"""
-# simulation.exportData("end.xml");
-
-# Join Visualisation
-if pyflamegpu.VISUALISATION and VISUALISATION and not ENSEMBLE:
-    visualisation.join();
-
-
-
-# Deal with logs
-if ENSEMBLE:
-    logs = simulation.getLogs();
-else:
-  if not PARAMETER_EXPERIMENT:
-    logs = simulation.getRunLog();
-
-
-if ENSEMBLE:
-    agent_counts = [None]*ENSEMBLE_RUNS
-    prey_life_mean = [None]*ENSEMBLE_RUNS
-    predator_life_mean = [None]*ENSEMBLE_RUNS
-    prey_life_std = [None]*ENSEMBLE_RUNS
-    predator_life_std = [None]*ENSEMBLE_RUNS
-    grass_available_mean = [None]*ENSEMBLE_RUNS
-    grass_dead_cycles_mean = [None]*ENSEMBLE_RUNS
-    grass_dead_cycles_std = [None]*ENSEMBLE_RUNS
-    pred_kill = [None]*ENSEMBLE_RUNS
-    min_speed = [None]*ENSEMBLE_RUNS
-    grass_eat = [None]*ENSEMBLE_RUNS
-    current_id = [None]*ENSEMBLE_RUNS
-    # Read logs
-    for i in range(len(logs)):
-      sl = logs[i].getStepLog();
-      agent_counts[i] = [["ensemble_run_"+str(i)+"_prey"],["ensemble_run_"+str(i)+"_pred"],["ensemble_run_"+str(i)+"_gras"]];
-      prey_life_mean[i] = ["ensemble_run_"+str(i)];
-      prey_life_std[i] = ["ensemble_run_"+str(i)];
-      predator_life_mean[i] = ["ensemble_run_"+str(i)];
-      predator_life_std[i] = ["ensemble_run_"+str(i)];
-      grass_available_mean[i] = ["ensemble_run_"+str(i)];
-      grass_dead_cycles_mean[i] = ["ensemble_run_"+str(i)];
-      grass_dead_cycles_std[i] = ["ensemble_run_"+str(i)];
-      pred_kill[i] = ["ensemble_run_"+str(i)];
-      min_speed[i] = ["ensemble_run_"+str(i)];
-      grass_eat[i] = ["ensemble_run_"+str(i)];
-      current_id[i] = ["ensemble_run_"+str(i)];
-      for step in sl:
-        # Collect step data
-        prey_agents = step.getAgent("Prey");
-        predator_agents = step.getAgent("Predator");
-        grass_agents = step.getAgent("Grass");
-        pred_kill[i].append(step.getEnvironmentPropertyFloat("PREDATOR_KILL_DISTANCE"));
-        min_speed[i].append(step.getEnvironmentPropertyFloat("MIN_SPEED"));
-        grass_eat[i].append(step.getEnvironmentPropertyFloat("GRASS_EAT_DISTANCE"));
-        current_id[i].append(step.getEnvironmentPropertyUInt("CURRENT_ID"));
-        # Collect agent data from step
-        prey_life_mean[i].append(prey_agents.getMean("life"));
-        prey_life_std[i].append(prey_agents.getStandardDev("life"));
-        agent_counts[i][0].append(prey_agents.getCount());
-
-        predator_life_mean[i].append(predator_agents.getMean("life"));
-        predator_life_std[i].append(predator_agents.getStandardDev("life"));
-        agent_counts[i][1].append(predator_agents.getCount());
-
-        grass_dead_cycles_mean[i].append(grass_agents.getMean("dead_cycles"));
-        grass_dead_cycles_std[i].append(grass_agents.getStandardDev("dead_cycles"));
-        agent_counts[i][2].append(int(grass_agents.getMean("available")*grass_agents.getCount()));
-        #agent_counts[i][2].append(grass_agents.getCount());
-        #grass_available_mean[i].append(grass_agents.getMean("available"));
-        #agent_counts[i][2].append(grass_agents.getCount());
-
-    # Print log data    
-    # print("prey life mean",prey_life_mean);
-    # print("prey life std",prey_life_std);
-    # print()
-    # print("predator life mean",predator_life_mean);
-    # print("predator life std",predator_life_std);
-    # print()
-    # print("grass available mean",grass_available_mean);
-    # print("grass dead cycles mean",grass_dead_cycles_mean);
-    # print("grass dead cycles std",grass_dead_cycles_std);
-    print()
-
-
-    #Print warning data
-    print("Agent counts per step per ensemble run")
-    for j in range(len(agent_counts)):
-      for k in range(len(agent_counts[j])):
-        print(agent_counts[j][k])
-    print()
-    # print("Predator kill distance environment variable (cut to 9 steps/40 for readability)")
-    # for l in range(len(pred_kill)):
-    #   print(pred_kill[l][:10])
-    # print()
-    # print("Min speed environment variable (cut to 9 steps/40 for readability)")
-    # for m in range(len(min_speed)):
-    #   print(min_speed[m][:10])
-    # print()
-    # print("Grass eat distance environment variable (cut to 9 steps/40 for readability) - No curve warning")
-    # for n in range(len(grass_eat)):
-    #   print(grass_eat[n][:10])
-    #print("grass eat distance environment property",grass_eat);
-    #print("current_id environment property",current_id);
+    if PARAMETER_EXPERIMENT:
+      #MU = 100
+      #LAM = 25
+      MU = 10
+      LAM = 2
+      experiment = create_experiment(model, logging_config);
+      ga_search = exp.Search();
+      #ga_search.parameter_limits = [(0,100),(0,100),(0,100)]
+      ga_search.parameter_limits = {"PREY_POPULATION_TO_GENERATE":(0,5000),"PREDATOR_POPULATION_TO_GENERATE":(0,5000),"GRASS_POPULATION_TO_GENERATE":(0,5000),"PREY_REPRODUCTION_CHANCE":(0.0,0.25),"PREDATOR_REPRODUCTION_CHANCE":(0.0,0.25),"GAIN_FROM_FOOD_PREY":(0,200),"GAIN_FROM_FOOD_PREDATOR":(0,200),"GRASS_REGROW_CYCLES":(0,200)}
+      ga_search.mu = MU;
+      ga_search.lamda = LAM;
+      ga_search.max_time = 10000000000
+      #ga_search.max_generations = 196
+      ga_search.max_generations = 10
+      ga_search.verbose = True;
+      #ga_search.eval_func = evaluator;
+      #ga_search.setBatchEvaluation(True);
+      #ga_search.setPoolEvaluator(exp.PoolEvaluator(create_experiment, slots=[0,0]));
+      #ga_search.setFitnessMemoization(True, cache_size=4096);
+      #ga_search.setSteadyState(True);
+      #ga_search.setMultiFidelity([100, 300], promotion_ratio=0.5);
+      #ga_search.setReplicateRacing(initial=2, maximum=8);
+      #ga_search.setSurrogateScreening(4);
+      #ga_search.setResultStore();
+      #ga_search.setCheckpoint("ga_temp/ga_checkpoint.pickle", generations=1, seconds=600);
+      ga_search.setPopEvaluationExperiment(experiment);
+      ga_search.GA();
+      #ga_search.GA(resume="ga_temp/ga_checkpoint.pickle");
+      del ga_search
+    else:
+      simulation = pyflamegpu.CUDASimulation(model);
+      if BULK_POPULATION_INIT:
+        set_initial_populations(simulation, model);
+      if not VISUALISATION:
+        simulation.SimulationConfig().steps = STEPS;
 
+      simulation.setStepLog(step_log);
+      simulation.setExitLog(logging_config)
 
-    """
-      Boid graph generation for future reference
-    """
-    # Generate graphs 
-    # for j in range(ENSEMBLE_RUNS):
-    #     # Plot 3d graph of average flock position over simulation for individual model run
-    #     fig = plt.figure(figsize=(8,8));
-    #     ax = fig.gca(projection='3d');
-    #     ax.set_xlabel("Model environment x");
-    #     ax.set_ylabel("Model environment y");
-    #     ax.set_zlabel("Model environment z");
-    #     fig.suptitle("Ensemble run "+str(j)+" boids mean flock positions",fontsize=16);
-    #     label = "Boids mean flock position, ensemble run "+str(j);
-    #     fname = "average_flock_positions_run"+str(j)+".png";
-    #     # Position start and finish flock position text
-    #     for k in text_pos[j]:
-    #         ax.text(k[0],k[1],k[2],k[3],None);
-    #     ax.plot(positions_mean[j][0], positions_mean[j][1], positions_mean[j][2], label=label);
-    #     ax.set_xlim3d([-1.0,1.0]);
-    #     ax.set_ylim3d([-1.0,1.0]);
-    #     ax.set_zlim3d([-1.0,1.0]);
-    #     ax.legend();
-    #     plt.savefig(fname,format='png');
-    #     plt.close(fig);
-
-    #     # Plot graphs for average of each fx, fy, and fz with standard deviation error bars
-    #     steplist = range(STEPS);
-    #     fig,(axx,axy,axz) = plt.subplots(1,3, figsize=(21,6));
-    #     fig.suptitle("Ensemble run "+str(j)+" mean boid velocities with std errorbar",fontsize=16);
-    #     velfname = "mean_velocities_run"+str(j)+".png";
-    #     axx.errorbar(steplist,velocities_mean[j][0],yerr=velocities_std[j][0],elinewidth=0.5,capsize=1.0);
-    #     axx.set_xlabel("Simulation step");
-    #     axx.set_ylabel("Boid agents average fx");
-    #     axy.errorbar(steplist,velocities_mean[j][1],yerr=velocities_std[j][1],elinewidth=0.5,capsize=1.0);
-    #     axy.set_xlabel("Simulation step");
-    #     axy.set_ylabel("Boid agents average fy");
-    #     axz.errorbar(steplist,velocities_mean[j][2],yerr=velocities_std[j][2],elinewidth=0.5,capsize=1.0);
-    #     axz.set_xlabel("Simulation step");
-    #     axz.set_ylabel("Boid agents average fz");
-    #     plt.savefig(velfname,format='png');
-    #     plt.close(fig);
-
-    # # Plot every model in esemble's average flock position over simulation on the same 3d graph
-    # fig = plt.figure(figsize=(12,12));
-    # fig.suptitle("Ensemble Boids mean flock positions",fontsize=16);
-    # ax = fig.gca(projection='3d');
-    # ax.set_xlabel("Model environment x");
-    # ax.set_ylabel("Model environment y");
-    # ax.set_zlabel("Model environment z");
-    # fname = "ensemble_average_flock_positions.png";
-    # ## Plot start and finish text for each flock path ---VERY CLUTTERED---
-    # # for i in text_pos:
-    # #     for k in i:
-    # #         ax.text(k[0],k[1],k[2],k[3],'x');
-    # jcount = 0;
-    # for j in positions_mean:
-    #     label1 = "Run "+str(jcount);
-    #     ax.plot(j[0], j[1], j[2], label=label1);
-    #     jcount+=1;
-    # #ax.set_xlim3d([-1.0,1.0]);
-    # #ax.set_ylim3d([-1.0,1.0]);
-    # #ax.set_zlim3d([-1.0,1.0]);
-    # ax.legend();
-    # plt.savefig(fname,format='png');
-    # plt.close(fig);
-else:
-  if not PARAMETER_EXPERIMENT:
-    steps = logs.getStepLog();
-    prey_agent_counts = [None]*len(steps)
-    predator_agent_counts = [None]*len(steps)
-    grass_agent_counts = [None]*len(steps)
-    counter = 0;
-    for step in steps:
-        stepcount = step.getStepCount();
-        prey_agents = step.getAgent("Prey");
-        predator_agents = step.getAgent("Predator");
-        grass_agents = step.getAgent("Grass");
-        prey_agent_counts[counter] = prey_agents.getCount();
-        predator_agent_counts[counter] = predator_agents.getCount();
-        grass_agent_counts[counter] = grass_agents.getCount();
-        counter+=1;
-    # print()
-    print("Agent counts per step")
-    for j in range(len(steps)):
-      print("step",j,"prey",prey_agent_counts[j],"predators",predator_agent_counts[j],"grass",grass_agent_counts[j]) 
\ No newline at end of file
+  """
+    Create Visualisation
+  """
+  if pyflamegpu.VISUALISATION and VISUALISATION and not ENSEMBLE and not PARAMETER_EXPERIMENT:
+      visualisation = simulation.getVisualisation();
+      # Configure vis
+      envWidth = env.getPropertyFloat("MAX_POSITION") - env.getPropertyFloat("MIN_POSITION");
+      INIT_CAM = env.getPropertyFloat("MAX_POSITION") * 1.5;
+      visualisation.setInitialCameraLocation(0.0, 0.0, INIT_CAM);
+      visualisation.setCameraSpeed(0.002 * envWidth);
+      circ_prey_agt = visualisation.addAgent("Prey");
+      circ_predator_agt = visualisation.addAgent("Predator");
+      circ_grass_agt = visualisation.addAgent("Grass");
+      #circ_uagrass_agt = visualisation.addAgent("Unavailable_Grass");
+      # Position vars are named x, y, z; so they are used by default
+      circ_prey_agt.setModel(pyflamegpu.ICOSPHERE);
+      circ_predator_agt.setModel(pyflamegpu.ICOSPHERE);
+      circ_grass_agt.setModel(pyflamegpu.ICOSPHERE);
+      #circ_uagrass_agt.setModel(pyflamegpu.ICOSPHERE);
+      circ_prey_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
+      circ_prey_agt.setColor(pyflamegpu.BLUE);
+      circ_predator_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
+      circ_predator_agt.setColor(pyflamegpu.RED);
+      circ_grass_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
+      circ_grass_agt.setColor(pyflamegpu.GREEN);
+      #circ_uagrass_agt.setModelScale(env.getPropertyFloat("PRED_PREY_INTERACTION_RADIUS")/7.5);
+      #circ_uagrass_agt.setColor(pyflamegpu.WHITE);
+      visualisation.activate();
+
+
+  """
+    Execution
+  """
+  if ENSEMBLE:
+      simulation.simulate(run_plan_vector);
+  else:
+    if not PARAMETER_EXPERIMENT:
+      simulation.simulate();
+
+  """
+    Export Pop
+  """
+  # simulation.exportData("end.xml");
+
+  # Join Visualisation
+  if pyflamegpu.VISUALISATION and VISUALISATION and not ENSEMBLE:
+      visualisation.join();
+
+
+
+  # Deal with logs
+  if ENSEMBLE:
+      logs = simulation.getLogs();
+  else:
+    if not PARAMETER_EXPERIMENT:
+      logs = simulation.getRunLog();
+
+
+  if ENSEMBLE:
+      agent_counts = [None]*ENSEMBLE_RUNS
+      prey_life_mean = [None]*ENSEMBLE_RUNS
+      predator_life_mean = [None]*ENSEMBLE_RUNS
+      prey_life_std = [None]*ENSEMBLE_RUNS
+      predator_life_std = [None]*ENSEMBLE_RUNS
+      grass_available_mean = [None]*ENSEMBLE_RUNS
+      grass_dead_cycles_mean = [None]*ENSEMBLE_RUNS
+      grass_dead_cycles_std = [None]*ENSEMBLE_RUNS
+      pred_kill = [None]*ENSEMBLE_RUNS
+      min_speed = [None]*ENSEMBLE_RUNS
+      grass_eat = [None]*ENSEMBLE_RUNS
+      current_id = [None]*ENSEMBLE_RUNS
+      # Read logs of every run in a single pass, as arrays shaped (runs, steps)
+      log_data = log_extractor.extract(logs);
+      available_grass = (log_data["Grass_mean_available"]*log_data["Grass_count"]).astype(int);
+      for i in range(len(logs)):
+        steps = log_data["steps"][i];
+        run = "ensemble_run_"+str(i);
+        agent_counts[i] = [[run+"_prey"]+log_data["Prey_count"][i,:steps].astype(int).tolist(),[run+"_pred"]+log_data["Predator_count"][i,:steps].astype(int).tolist(),[run+"_gras"]+available_grass[i,:steps].tolist()];
+        prey_life_mean[i] = [run]+log_data["Prey_mean_life"][i,:steps].tolist();
+        prey_life_std[i] = [run]+log_data["Prey_standard_dev_life"][i,:steps].tolist();
+        predator_life_mean[i] = [run]+log_data["Predator_mean_life"][i,:steps].tolist();
+        predator_life_std[i] = [run]+log_data["Predator_standard_dev_life"][i,:steps].tolist();
+        grass_available_mean[i] = [run];
+        grass_dead_cycles_mean[i] = [run]+log_data["Grass_mean_dead_cycles"][i,:steps].tolist();
+        grass_dead_cycles_std[i] = [run]+log_data["Grass_standard_dev_dead_cycles"][i,:steps].tolist();
+        pred_kill[i] = [run]+log_data["PREDATOR_KILL_DISTANCE"][i,:steps].tolist();
+        min_speed[i] = [run]+log_data["MIN_SPEED"][i,:steps].tolist();
+        grass_eat[i] = [run]+log_data["GRASS_EAT_DISTANCE"][i,:steps].tolist();
+        current_id[i] = [run]+log_data["CURRENT_ID"][i,:steps].astype(int).tolist();
+
+      # Print log data    
+      # print("prey life mean",prey_life_mean);
+      # print("prey life std",prey_life_std);
+      # print()
+      # print("predator life mean",predator_life_mean);
+      # print("predator life std",predator_life_std);
+      # print()
+      # print("grass available mean",grass_available_mean);
+      # print("grass dead cycles mean",grass_dead_cycles_mean);
+      # print("grass dead cycles std",grass_dead_cycles_std);
+      print()
+
+
+      #Print warning data
+      print("Agent counts per step per ensemble run")
+      for j in range(len(agent_counts)):
+        for k in range(len(agent_counts[j])):
+          print(agent_counts[j][k])
+      print()
+      # print("Predator kill distance environment variable (cut to 9 steps/40 for readability)")
+      # for l in range(len(pred_kill)):
+      #   print(pred_kill[l][:10])
+      # print()
+      # print("Min speed environment variable (cut to 9 steps/40 for readability)")
+      # for m in range(len(min_speed)):
+      #   print(min_speed[m][:10])
+      # print()
+      # print("Grass eat distance environment variable (cut to 9 steps/40 for readability) - No curve warning")
+      # for n in range(len(grass_eat)):
+      #   print(grass_eat[n][:10])
+      #print("grass eat distance environment property",grass_eat);
+      #print("current_id environment property",current_id);
+
+
+      """
+        Boid graph generation for future reference
+      """
+      # Generate graphs 
+      # for j in range(ENSEMBLE_RUNS):
+      #     # Plot 3d graph of average flock position over simulation for individual model run
+      #     fig = plt.figure(figsize=(8,8));
+      #     ax = fig.gca(projection='3d');
+      #     ax.set_xlabel("Model environment x");
+      #     ax.set_ylabel("Model environment y");
+      #     ax.set_zlabel("Model environment z");
+      #     fig.suptitle("Ensemble run "+str(j)+" boids mean flock positions",fontsize=16);
+      #     label = "Boids mean flock position, ensemble run "+str(j);
+      #     fname = "average_flock_positions_run"+str(j)+".png";
+      #     # Position start and finish flock position text
+      #     for k in text_pos[j]:
+      #         ax.text(k[0],k[1],k[2],k[3],None);
+      #     ax.plot(positions_mean[j][0], positions_mean[j][1], positions_mean[j][2], label=label);
+      #     ax.set_xlim3d([-1.0,1.0]);
+      #     ax.set_ylim3d([-1.0,1.0]);
+      #     ax.set_zlim3d([-1.0,1.0]);
+      #     ax.legend();
+      #     plt.savefig(fname,format='png');
+      #     plt.close(fig);
+
+      #     # Plot graphs for average of each fx, fy, and fz with standard deviation error bars
+      #     steplist = range(STEPS);
+      #     fig,(axx,axy,axz) = plt.subplots(1,3, figsize=(21,6));
+      #     fig.suptitle("Ensemble run "+str(j)+" mean boid velocities with std errorbar",fontsize=16);
+      #     velfname = "mean_velocities_run"+str(j)+".png";
+      #     axx.errorbar(steplist,velocities_mean[j][0],yerr=velocities_std[j][0],elinewidth=0.5,capsize=1.0);
+      #     axx.set_xlabel("Simulation step");
+      #     axx.set_ylabel("Boid agents average fx");
+      #     axy.errorbar(steplist,velocities_mean[j][1],yerr=velocities_std[j][1],elinewidth=0.5,capsize=1.0);
+      #     axy.set_xlabel("Simulation step");
+      #     axy.set_ylabel("Boid agents average fy");
+      #     axz.errorbar(steplist,velocities_mean[j][2],yerr=velocities_std[j][2],elinewidth=0.5,capsize=1.0);
+      #     axz.set_xlabel("Simulation step");
+      #     axz.set_ylabel("Boid agents average fz");
+      #     plt.savefig(velfname,format='png');
+      #     plt.close(fig);
+
+      # # Plot every model in esemble's average flock position over simulation on the same 3d graph
+      # fig = plt.figure(figsize=(12,12));
+      # fig.suptitle("Ensemble Boids mean flock positions",fontsize=16);
+      # ax = fig.gca(projection='3d');
+      # ax.set_xlabel("Model environment x");
+      # ax.set_ylabel("Model environment y");
+      # ax.set_zlabel("Model environment z");
+      # fname = "ensemble_average_flock_positions.png";
+      # ## Plot start and finish text for each flock path ---VERY CLUTTERED---
+      # # for i in text_pos:
+      # #     for k in i:
+      # #         ax.text(k[0],k[1],k[2],k[3],'x');
+      # jcount = 0;
+      # for j in positions_mean:
+      #     label1 = "Run "+str(jcount);
+      #     ax.plot(j[0], j[1], j[2], label=label1);
+      #     jcount+=1;
+      # #ax.set_xlim3d([-1.0,1.0]);
+      # #ax.set_ylim3d([-1.0,1.0]);
+      # #ax.set_zlim3d([-1.0,1.0]);
+      # ax.legend();
+      # plt.savefig(fname,format='png');
+      # plt.close(fig);
+  else:
+    if not PARAMETER_EXPERIMENT:
+      log_data = log_extractor.extract(logs);
+      steps = range(log_data["steps"][0]);
+      prey_agent_counts = log_data["Prey_count"][0].astype(int).tolist();
+      predator_agent_counts = log_data["Predator_count"][0].astype(int).tolist();
+      grass_agent_counts = log_data["Grass_count"][0].astype(int).tolist();
+      # print()
+      print("Agent counts per step")
+      for j in range(len(steps)):
+        print("step",j,"prey",prey_agent_counts[j],"predators",predator_agent_counts[j],"grass",grass_agent_counts[j]) 
\ No newline at end of file
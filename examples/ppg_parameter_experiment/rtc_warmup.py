@@ -0,0 +1,20 @@
+from pyflamegpu import *
+import sys
+import experiment_generator as exp
+import ppg_ga_experiment as ppg
+
+"""
+  Pre-compile every RTC agent function of the Prey Predator Grass GA evaluation model into the FLAME GPU 2 JIT cache,
+  so the first generation of a fresh GA process loads rather than compiles them.
+  Usage: python rtc_warmup.py [report.csv]
+"""
+if __name__ == "__main__":
+  model, logging_config = ppg.create_model(ppg.EVALUATION_STEPS, ppg.EXTINCTION_EXIT);
+  warmup = exp.RTCCacheWarmup();
+  warmup.verbose = True;
+  report = warmup.warmup(model, exp.findRTCSources(vars(ppg)), "Prey_Predator_Grass");
+  print(warmup.formatReport(report));
+  if len(sys.argv)>1:
+    report_file = open(sys.argv[1],"w");
+    report_file.write(warmup.formatReport(report)+"\n");
+    report_file.close();
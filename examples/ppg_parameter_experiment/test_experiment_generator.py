@@ -0,0 +1,1021 @@
+import os
+import tempfile
+import types
+import random
+import numpy as np
+import pytest
+from unittest import TestCase
+from pyflamegpu import *
+import experiment_generator as exp
+
+PARAMETER_LIMITS = {"PREY_POPULATION_TO_GENERATE":(0,5000),"PREY_REPRODUCTION_CHANCE":(0.0,0.25)}
+SEARCH_MU = 4
+SEARCH_LAMBDA = 3
+SEARCH_GENERATIONS = 2
+EXPERIMENT_STEPS = 25
+POOL_WORKERS = 2
+
+#Number of experiments built by the current pool worker process
+pool_worker_builds = 0
+
+
+class StubRunPlan(object):
+	r"""CPU-only stand in for a pyflamegpu.RunPlan, recording the properties applied to it"""
+
+	def __init__(self):
+		self.properties = {}
+
+	def setPropertyUInt(self, name, value):
+		self.properties[name] = ('UInt', value)
+
+	def setPropertyInt(self, name, value):
+		self.properties[name] = ('Int', value)
+
+	def setPropertyFloat(self, name, value):
+		self.properties[name] = ('Float', value)
+
+
+class StubRunPlanVec(list):
+	r"""CPU-only stand in for a pyflamegpu.RunPlanVec"""
+
+	def __init__(self, model, runs):
+		list.__init__(self, [StubRunPlan() for i in range(runs)])
+		self.steps = 0
+
+	def setSteps(self, steps):
+		self.steps = steps
+
+	def setRandomSimulationSeed(self, seed, step):
+		self.seed = (seed, step)
+
+
+class StubLogFrame(object):
+
+	def __init__(self, fitnesses):
+		self.fitnesses = fitnesses
+
+	def getEnvironmentPropertyArrayFloat(self, name):
+		return self.fitnesses
+
+
+class StubRunLog(object):
+
+	def __init__(self, fitnesses):
+		self.exit_log = StubLogFrame(fitnesses)
+
+	def getExitLog(self):
+		return self.exit_log
+
+
+class StubEnsemble(object):
+	r"""CPU-only stand in for a pyflamegpu.CUDAEnsemble. The logged fitnesses of each run are derived from the properties of its run plan"""
+
+	def __init__(self):
+		self.launches = []
+		self.logs = []
+
+	def simulate(self, run_plans):
+		self.launches.append(run_plans)
+		self.logs = [StubRunLog(self.fitnesses(plan.properties)) for plan in run_plans]
+
+	def fitnesses(self, properties):
+		prey = properties["PREY_POPULATION_TO_GENERATE"][1]
+		return [float(prey), 0.0, 0.0]
+
+	def getLogs(self):
+		return self.logs
+
+
+def build_pool_experiment():
+	r"""CPU-only experiment factory for PoolEvaluator workers"""
+	global pool_worker_builds
+	pool_worker_builds += 1
+	return exp.Experiment()
+
+
+def simulate_pool_parameters(experiment, parameter_names, parameters):
+	r"""CPU-only PoolEvaluator simulate function returning the prey population, worker pid and worker build count"""
+	return (float(parameters[parameter_names.index("PREY_POPULATION_TO_GENERATE")]), os.getpid(), pool_worker_builds)
+
+
+def simulate_pool_steps(experiment, parameter_names, parameters):
+	r"""CPU-only PoolEvaluator simulate function returning the number of steps of the worker experiment"""
+	return (float(experiment.steps),)
+
+
+class BatchEvaluationTest(TestCase):
+
+	def test_experiment_begin_batch(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setSimulationSteps(EXPERIMENT_STEPS)
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		parameter_sets = [{"PREY_POPULATION_TO_GENERATE":i, "PREY_REPRODUCTION_CHANCE":0.1, "chromosome_id":i} for i in range(5)]
+		ex1.beginBatch(parameter_sets)
+		assert len(ensemble.launches)==1
+		run_plans = ensemble.launches[0]
+		assert len(run_plans)==len(parameter_sets)
+		assert run_plans.steps==EXPERIMENT_STEPS
+		for i in range(len(parameter_sets)):
+			assert run_plans[i].properties["PREY_POPULATION_TO_GENERATE"]==('UInt', i)
+			assert run_plans[i].properties["PREY_REPRODUCTION_CHANCE"]==('Float', 0.1)
+			assert not "chromosome_id" in run_plans[i].properties
+		assert len(ex1.sim_log)==len(parameter_sets)
+		ex1.setPropertyType("PREY_POPULATION_TO_GENERATE", 'Int')
+		ex1.beginBatch(parameter_sets)
+		assert ensemble.launches[1][0].properties["PREY_POPULATION_TO_GENERATE"]==('Int', 0)
+		assert exp.Experiment.property_types=={}
+		del ex1
+
+	def test_search_batch_evaluation(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.GA()
+		# One ensemble launch for the initial population and one per generation
+		assert len(ensemble.launches)==SEARCH_GENERATIONS+1
+		assert len(ensemble.launches[0])==SEARCH_MU
+		for launch in ensemble.launches[1:]:
+			assert len(launch)==SEARCH_LAMBDA
+		assert os.path.exists(ga.cwd+ga.output_file)
+		del ga
+
+
+class PoolEvaluationTest(TestCase):
+
+	def test_pool_evaluator(self):
+		pool = exp.PoolEvaluator(build_pool_experiment, slots=[None]*POOL_WORKERS, simulate=simulate_pool_parameters)
+		assert pool.workers==POOL_WORKERS
+		pool.start(list(PARAMETER_LIMITS.keys()))
+		parameter_vectors = [(i, 0.1) for i in range(10)]
+		results = pool.evaluate(parameter_vectors)
+		results += pool.evaluate(parameter_vectors)
+		pool.close()
+		assert [r[0] for r in results]==[float(i) for i in range(10)]*2
+		# Each worker builds its experiment once and reuses it for every evaluation
+		assert len(set(r[1] for r in results))<=POOL_WORKERS
+		assert all(r[2]==1 for r in results)
+		assert pool.pool==None
+
+	def test_search_pool_evaluation(self):
+		pool = exp.PoolEvaluator(build_pool_experiment, workers=POOL_WORKERS, simulate=simulate_pool_parameters)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPoolEvaluator(pool)
+		ga.GA()
+		pool.close()
+		assert os.path.exists(ga.cwd+ga.output_file)
+		del ga
+
+
+class FitnessMemoizationTest(TestCase):
+
+	def test_search_fitness_memoization(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		# Only 3 distinct chromosomes exist so duplicates are guaranteed
+		ga.parameter_limits = {"PREY_POPULATION_TO_GENERATE":(0,2),"PREY_REPRODUCTION_CHANCE":(0.1,0.1)}
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setFitnessMemoization(True)
+		ga.GA()
+		hits = ga.logbook.select("cache_hits")
+		misses = ga.logbook.select("cache_misses")
+		assert sum(hits)+sum(misses)==SEARCH_MU+SEARCH_GENERATIONS*SEARCH_LAMBDA
+		assert sum(misses)==sum(len(launch) for launch in ensemble.launches)
+		assert sum(misses)<=3
+		assert sum(hits)>0
+		del ga
+
+	def test_fitness_memoization_eviction(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setFitnessMemoization(True, cache_size=2)
+		population = [{"PREY_POPULATION_TO_GENERATE":i, "PREY_REPRODUCTION_CHANCE":0.1, "chromosome_id":i} for i in range(3)]
+		evaluation = ga._Search__evaluate_population(population)
+		assert len(ga.fitness_cache)==2
+		# Chromosome 0 was evicted, the others differ only by chromosome_id and float noise below the cache precision
+		duplicates = [{"PREY_POPULATION_TO_GENERATE":i, "PREY_REPRODUCTION_CHANCE":0.1+1e-9, "chromosome_id":i+3} for i in range(3)]
+		assert ga._Search__evaluate_population(duplicates)==evaluation
+		assert len(ensemble.launches[1])==1
+		assert ga.fitness_cache_hits==2
+		assert ga.fitness_cache_misses==4
+		del ga
+
+
+class SteadyStateTest(TestCase):
+
+	def test_search_steady_state(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setSteadyState(True)
+		ga.GA()
+		# Without a pool evaluator each offspring is evaluated on its own as soon as it is created
+		assert len(ensemble.launches)==1+SEARCH_GENERATIONS*SEARCH_LAMBDA
+		assert ga.logbook.select("generation")==list(range(SEARCH_GENERATIONS+1))
+		assert ga.logbook.select("evaluations")==[SEARCH_MU]+[SEARCH_LAMBDA]*SEARCH_GENERATIONS
+		# The population fitness can never decrease under (mu+1) replacement
+		maxima = ga.logbook.select("max")
+		assert all(maxima[i]<=maxima[i+1] for i in range(len(maxima)-1))
+		assert ga.steady_state_in_flight==0
+		del ga
+
+	def test_search_steady_state_generational_options(self):
+		for enable in [lambda ga: ga.setMultiFidelity([5]), lambda ga: ga.setReplicateRacing(), lambda ga: ga.setSurrogateScreening(model=StubSurrogate())]:
+			ga = exp.Search()
+			ga.cwd = tempfile.mkdtemp()+"/"
+			ga.parameter_limits = PARAMETER_LIMITS
+			ga.setSteadyState(True)
+			enable(ga)
+			with pytest.raises(ValueError):
+				ga.GA()
+			assert not os.path.exists(ga.cwd+"ga_temp/")
+
+	def test_search_steady_state_pool(self):
+		pool = exp.PoolEvaluator(build_pool_experiment, workers=POOL_WORKERS, simulate=simulate_pool_parameters)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPoolEvaluator(pool)
+		ga.setSteadyState(True)
+		ga.GA()
+		pool.close()
+		assert ga.logbook.select("evaluations")==[SEARCH_MU]+[SEARCH_LAMBDA]*SEARCH_GENERATIONS
+		assert ga.steady_state_in_flight==0
+		assert os.path.exists(ga.cwd+ga.output_file)
+		del ga
+
+
+class StubSimulation(object):
+	r"""CPU-only stand in for a pyflamegpu.CUDASimulation, counting its constructions, resets and log attachments"""
+	created = 0
+
+	def __init__(self, model):
+		StubSimulation.created += 1
+		#The environment a simulation is created with is copied from the model
+		self.environment = dict(model.Environment().properties) if hasattr(model, "Environment") else None
+		self.config = types.SimpleNamespace(steps=0)
+		self.resets = 0
+		self.logs_attached = 0
+		self.simulated_steps = []
+
+	def SimulationConfig(self):
+		return self.config
+
+	def reset(self):
+		self.resets += 1
+
+	def setStepLog(self, step_log):
+		self.logs_attached += 1
+
+	def setExitLog(self, log):
+		pass
+
+	def simulate(self):
+		self.simulated_steps.append(self.config.steps)
+
+	def getRunLog(self):
+		return StubRunLog([0.0, 0.0, 0.0])
+
+
+class StubEnvironment(object):
+	r"""CPU-only stand in for a pyflamegpu.EnvironmentDescription or HostEnvironment"""
+
+	def __init__(self, properties=None):
+		self.properties = dict(properties) if not properties==None else {}
+
+	def getPropertyUInt(self, name):
+		return self.properties[name]
+
+	def setPropertyUInt(self, name, value):
+		self.properties[name] = value
+
+
+class StubEnvironmentModel(object):
+	r"""CPU-only stand in for a pyflamegpu.ModelDescription with only an environment"""
+
+	def __init__(self):
+		self.environment = StubEnvironment({"PREY_POPULATION_TO_GENERATE":10})
+
+	def Environment(self):
+		return self.environment
+
+
+class SessionTest(TestCase):
+
+	def setUp(self):
+		self.pyflamegpu = exp.pyflamegpu
+		exp.pyflamegpu = types.SimpleNamespace(CUDASimulation=StubSimulation, StepLoggingConfig=lambda log: types.SimpleNamespace(setFrequency=lambda frequency: None))
+		StubSimulation.created = 0
+
+	def tearDown(self):
+		exp.pyflamegpu = self.pyflamegpu
+
+	def test_experiment_session(self):
+		ex1 = exp.Experiment()
+		ex1.setLog("log")
+		ex1.setSimulationSteps(EXPERIMENT_STEPS)
+		ex1.setSession(True)
+		for i in range(3):
+			ex1.begin()
+		simulation = ex1.simulation
+		assert StubSimulation.created==1
+		assert simulation.logs_attached==1
+		assert simulation.resets==2
+		assert simulation.simulated_steps==[EXPERIMENT_STEPS]*3
+		ex1.setSession(False)
+		ex1.begin()
+		ex1.begin()
+		assert StubSimulation.created==3
+		assert ex1.simulation.resets==0
+
+	def test_experiment_session_globals(self):
+		model = StubEnvironmentModel()
+		generator = exp.InitialStateGenerator()
+		generator.setGlobalInt("PREY_POPULATION_TO_GENERATE", (100,5000))
+		ex1 = exp.Experiment()
+		ex1.setModel(model)
+		ex1.initialStateGenerator(generator)
+		ex1.setSession(True)
+		#Without an environment override each run needs a simulation created with its global values
+		for i in range(3):
+			ex1.begin()
+			assert ex1.simulation.environment==ex1.initial_states[0][0]
+			assert model.environment.properties=={"PREY_POPULATION_TO_GENERATE":10}
+		assert StubSimulation.created==3
+		#With an environment override one simulation is reused, the global values being applied by its init function
+		override = exp.EnvironmentOverride()
+		ex1.setEnvironmentOverride(override)
+		for i in range(3):
+			ex1.begin()
+			environment = StubEnvironment(model.environment.properties)
+			override.run(types.SimpleNamespace(environment=environment))
+			assert environment.properties==ex1.initial_states[0][0]
+		assert StubSimulation.created==3
+		assert ex1.simulation.resets==3
+		assert model.environment.properties=={"PREY_POPULATION_TO_GENERATE":10}
+		#The steps are set by the simulation config, so changing them keeps the simulation
+		ex1.setSimulationSteps(EXPERIMENT_STEPS)
+		ex1.begin()
+		assert StubSimulation.created==3
+		assert ex1.simulation.config.steps==EXPERIMENT_STEPS
+
+	def test_experiment_session_steps(self):
+		model = StubEnvironmentModel()
+		model.environment.properties["STEPS"] = EXPERIMENT_STEPS
+		ex1 = exp.Experiment()
+		ex1.setModel(model)
+		ex1.setStepsProperty("STEPS")
+		ex1.setSession(True)
+		#Without an environment override the steps property is part of the environment the simulation is created with
+		for steps in [5, 10, 5]:
+			ex1.setSimulationSteps(steps)
+			ex1.begin()
+			assert ex1.simulation.environment["STEPS"]==steps
+		assert StubSimulation.created==3
+		#With an environment override alternating steps, e.g. multi-fidelity rungs, reuse one simulation
+		override = exp.EnvironmentOverride()
+		ex1.setEnvironmentOverride(override)
+		for steps in [5, 10, 5, 10]:
+			ex1.setSimulationSteps(steps)
+			ex1.begin()
+			assert override.values["STEPS"]==steps
+		assert StubSimulation.created==4
+		assert ex1.simulation.simulated_steps==[5, 10, 5, 10]
+		#Ensembles set the steps of each launch by its run plans
+		ensembles = []
+		exp.pyflamegpu.CUDAEnsemble = lambda model: ensembles.append(StubEnsemble()) or ensembles[-1]
+		exp.pyflamegpu.RunPlanVec = StubRunPlanVec
+		generator = exp.InitialStateGenerator()
+		generator.setGlobalInt("PREY_POPULATION_TO_GENERATE", (100,5000))
+		ex1.initialStateGenerator(generator)
+		ex1.setRuns(2)
+		for steps in [5, 10, 5]:
+			ex1.setSimulationSteps(steps)
+			ex1.begin()
+		assert len(ensembles)==1
+		assert [launch.steps for launch in ensembles[0].launches]==[5, 10, 5]
+		assert all(plan.properties["STEPS"]==('UInt', 10) for plan in ensembles[0].launches[1])
+
+	def test_experiment_override_batch(self):
+		generator = exp.InitialStateGenerator()
+		generator.setGlobalInt("PREY_POPULATION_TO_GENERATE", (100,5000))
+		ensemble = StubEnsemble()
+		override = exp.EnvironmentOverride()
+		ex1 = exp.Experiment()
+		ex1.setModel(StubEnvironmentModel())
+		ex1.initialStateGenerator(generator)
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ex1.setEnvironmentOverride(override)
+		ex1.setSession(True)
+		ex1.begin()
+		assert len(override.values)>0
+		#The override is the first init function of every run, applied over the run plan's values
+		simulate = ensemble.simulate
+		def simulate_with_override(run_plans):
+			for plan in run_plans:
+				override.run(types.SimpleNamespace(environment=plan))
+			simulate(run_plans)
+		ensemble.simulate = simulate_with_override
+		ex1.beginBatch([{"PREY_POPULATION_TO_GENERATE":i} for i in range(3)])
+		assert [plan.properties["PREY_POPULATION_TO_GENERATE"] for plan in ensemble.launches[-1]]==[('UInt', i) for i in range(3)]
+		assert [fitness[0] for fitness in ex1.fitnessComponents()]==[0.0, 1.0, 2.0]
+
+	def test_experiment_batch_session(self):
+		ensemble = StubEnsemble()
+		ensemble.setStepLog = lambda step_log: ensemble.launches.append("step_log")
+		ensemble.setExitLog = lambda log: None
+		ex1 = exp.Experiment()
+		ex1.setLog("log")
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ex1.setSession(True)
+		parameter_sets = [{"PREY_POPULATION_TO_GENERATE":i} for i in range(2)]
+		ex1.beginBatch(parameter_sets)
+		ex1.beginBatch(parameter_sets)
+		assert ensemble.launches.count("step_log")==1
+		assert len(ex1.sim_log)==len(parameter_sets)
+
+
+RTC_SOURCES = {
+	"agent_a":"FLAMEGPU_AGENT_FUNCTION(agent_a, MsgNone, MsgNone) {\n  return ALIVE;\n}\n",
+	"agent_b":"/* FLAMEGPU_AGENT_FUNCTION(commented, MsgNone, MsgNone) */\nFLAMEGPU_AGENT_FUNCTION(agent_b, MsgNone, MsgNone) {\n  return ALIVE;\n}\n"}
+
+
+class MockCompile(object):
+	r"""Headless stand in for compiling a model, writing a cache file per RTC source not already cached"""
+
+	def __init__(self, cache_directory, rtc_sources):
+		self.cache_directory = cache_directory
+		self.rtc_sources = rtc_sources
+
+	def __call__(self, model):
+		times = {}
+		for name, source in self.rtc_sources.items():
+			cache_file = os.path.join(self.cache_directory, str(abs(hash(source))))
+			if not os.path.exists(cache_file):
+				open(cache_file, "w").close()
+				times[name] = 1.0
+		return times
+
+
+class RTCCacheWarmupTest(TestCase):
+
+	def test_find_rtc_sources(self):
+		namespace = dict(("source_"+name, source) for name, source in RTC_SOURCES.items())
+		namespace["not_rtc"] = "FLAMEGPU_HOST_FUNCTION(host) {}"
+		namespace["number"] = 1
+		assert exp.findRTCSources(namespace)==RTC_SOURCES
+
+	def test_rtc_cache_warmup(self):
+		cache_directory = tempfile.mkdtemp()
+		rtc_sources = dict(RTC_SOURCES)
+		warmup = exp.RTCCacheWarmup(cache_directory, MockCompile(cache_directory, rtc_sources))
+		report = warmup.warmup(None, rtc_sources, "test_model")
+		assert [entry["function"] for entry in report]==["agent_a", "agent_b"]
+		assert [entry["cache"] for entry in report]==["miss", "miss"]
+		assert [entry["compile_time"] for entry in report]==[1.0, 1.0]
+		assert report[0]["source_hash"]==warmup.sourceHash(rtc_sources["agent_a"])
+		report = warmup.warmup(None, rtc_sources, "test_model")
+		assert [entry["cache"] for entry in report]==["hit", "hit"]
+		assert [entry["compile_time"] for entry in report]==[0.0, 0.0]
+		rtc_sources["agent_b"] = rtc_sources["agent_b"].replace("ALIVE", "DEAD")
+		report = warmup.warmup(None, rtc_sources, "test_model")
+		assert [entry["cache"] for entry in report]==["hit", "miss"]
+		lines = warmup.formatReport(report).split("\n")
+		assert len(lines)==len(report)+2
+		assert lines[-1].startswith("functions,2,cache_hits,1,cache_misses,1")
+		assert lines[2].endswith(",measured")
+
+	def test_rtc_cache_warmup_estimated(self):
+		cache_directory = tempfile.mkdtemp()
+		compile_model = MockCompile(cache_directory, RTC_SOURCES)
+		warmup = exp.RTCCacheWarmup(cache_directory, lambda model: sum(compile_model(model).values()))
+		report = warmup.warmup(None, RTC_SOURCES, "test_model")
+		assert [entry["cache"] for entry in report]==["miss", "miss"]
+		assert [entry["compile_time"] for entry in report]==[1.0, 1.0]
+		assert all(entry["estimated"] for entry in report)
+		assert warmup.formatReport(report).split("\n")[1].endswith(",estimated")
+
+
+class StubAgentVector(list):
+	r"""CPU-only stand in for a pyflamegpu.AgentVector of agents recording their variables"""
+
+	def __init__(self, agent_description, count):
+		list.__init__(self, [StubRunPlan() for i in range(count)])
+		self.agent_description = agent_description
+
+	def __getitem__(self, index):
+		agent = list.__getitem__(self, index)
+		agent.setVariableFloat = agent.setPropertyFloat
+		agent.setVariableInt = agent.setPropertyInt
+		agent.setVariableArrayFloat = agent.setPropertyFloat
+		return agent
+
+
+class StubModelEnvironment(StubRunPlan):
+	r"""CPU-only stand in for a pyflamegpu.EnvironmentDescription, recording the properties applied to it"""
+
+	def __init__(self, properties):
+		StubRunPlan.__init__(self)
+		self.properties = dict(properties)
+
+	def getPropertyUInt(self, name):
+		return self.properties[name][1]
+
+	def getPropertyFloat(self, name):
+		return self.properties[name][1]
+
+
+class StubModel(object):
+
+	def __init__(self):
+		self.environment = StubModelEnvironment({"PREY_POPULATION_TO_GENERATE":('UInt', 0), "PREY_REPRODUCTION_CHANCE":('Float', 0.0)})
+
+	def Environment(self):
+		return self.environment
+
+	def getAgent(self, name):
+		return name
+
+
+class MaterialiseTest(TestCase):
+
+	def setUp(self):
+		self.pyflamegpu = exp.pyflamegpu
+		exp.pyflamegpu = types.SimpleNamespace(CUDASimulation=StubSimulation, AgentVector=StubAgentVector)
+		StubSimulation.created = 0
+		StubSimulation.setPopulationData = lambda simulation, agents, state: simulation.__dict__.setdefault("populations", []).append((agents, state))
+
+	def tearDown(self):
+		exp.pyflamegpu = self.pyflamegpu
+		del StubSimulation.setPopulationData
+
+	def test_agent_population_materialise(self):
+		prey = exp.AgentPopulation("Prey")
+		prey.setPopSize((100, 200))
+		prey.setVariableRandomPerAgent("x", (-1.0, 1.0))
+		prey.setVariableRandomPerAgent("life", (0, 50), distribution=random.randint)
+		prey.setVariableFloat("type", 2.0)
+		prey.setVariableInt("energy", (5, 10))
+		prey.setVariableList("colour", [0.1, 0.2, 0.3])
+		grass = exp.AgentPopulation("Grass")
+		grass.setPopSizeList([7, 9])
+		grass.setVariableInt("available", 1)
+		population = prey.materialise()
+		assert 100<=len(population)<=200
+		assert population["x"].dtype==np.float32 and population["life"].dtype==np.int32
+		assert population["x"].min()>=-1.0 and population["x"].max()<=1.0
+		assert population["life"].min()>=0 and population["life"].max()<=50
+		# Per agent variables are drawn for each agent, population variables once for the population
+		assert len(np.unique(population["x"]))>1
+		assert len(np.unique(population["energy"]))==1 and 5<=population["energy"][0]<=10
+		assert (population["type"]==2.0).all()
+		assert population["colour"].shape==(len(population), 3)
+		assert len(grass.materialise(0))==7 and len(grass.materialise(1))==9
+		assert grass.materialise().dtype.names==("available",)
+
+	def test_experiment_begin_materialised(self):
+		generator = exp.InitialStateGenerator()
+		generator.setGlobalInt("PREY_POPULATION_TO_GENERATE", 100)
+		generator.setGlobalFloat("PREY_REPRODUCTION_CHANCE", (0.01, 0.1))
+		generator.setGlobalString("NAME", "ignored")
+		prey = exp.AgentPopulation("Prey")
+		prey.setPopSize(5)
+		prey.setVariableRandomPerAgent("x", (-1.0, 1.0))
+		generator.addAgentPopulation(prey)
+		assert exp.InitialStateGenerator().agent_list==[]
+		ex1 = exp.Experiment()
+		ex1.setModel(StubModel())
+		ex1.initialStateGenerator(generator)
+		ex1.begin()
+		properties = ex1.simulation.environment
+		assert properties["PREY_POPULATION_TO_GENERATE"]==('UInt', 100)
+		assert 0.01<=properties["PREY_REPRODUCTION_CHANCE"][1]<=0.1
+		assert not "NAME" in properties
+		# The global values only apply to the simulation, the model environment is left unchanged
+		assert ex1.model.environment.properties=={"PREY_POPULATION_TO_GENERATE":('UInt', 0), "PREY_REPRODUCTION_CHANCE":('Float', 0.0)}
+		agents, state = ex1.simulation.populations[0]
+		assert state==prey.agent_state and len(agents)==5
+		assert agents[0].properties["x"][1]==float(ex1.initial_states[0][1][0][2]["x"][0])
+
+
+class StubAgentLogFrame(object):
+
+	def __init__(self, count, life):
+		self.count = count
+		self.life = life
+
+	def getCount(self):
+		return self.count
+
+	def getMean(self, variable_name):
+		return float(np.mean(self.life))
+
+	def getStandardDev(self, variable_name):
+		return float(np.std(self.life))
+
+	def getMaxInt(self, variable_name):
+		return int(np.max(self.life))
+
+
+class StubStepLogFrame(object):
+	r"""CPU-only stand in for a pyflamegpu.LogFrame, with only Float and ArrayFloat environment properties"""
+
+	def __init__(self, step, prey):
+		self.step = step
+		self.prey = prey
+
+	def getStepCount(self):
+		return self.step
+
+	def getAgent(self, agent_name):
+		return StubAgentLogFrame(len(self.prey), self.prey)
+
+	def getEnvironmentPropertyFloat(self, property_name):
+		if not property_name=="MIN_SPEED":
+			raise TypeError(property_name)
+		return -1.0
+
+	def getEnvironmentPropertyArrayFloat(self, property_name):
+		return (float(self.step), 0.0, 1.0)
+
+
+class StubStepRunLog(object):
+
+	def __init__(self, populations):
+		self.frames = [StubStepLogFrame(step, populations[step]) for step in range(len(populations))]
+
+	def getStepLog(self):
+		return self.frames
+
+
+class LogExtractorTest(TestCase):
+
+	def test_log_extractor(self):
+		log_extractor = exp.LogExtractor()
+		log_extractor.logEnvironment("MIN_SPEED")
+		log_extractor.logEnvironment("fitnesses")
+		prey_log = log_extractor.agent("Prey")
+		prey_log.logCount()
+		prey_log.logMeanInt("life")
+		prey_log.logStandardDevInt("life")
+		prey_log.logMaxInt("life")
+		# The second run ends early, as if stopped by an exit condition
+		logs = [StubStepRunLog([[1,2,3],[4,5],[6]]), StubStepRunLog([[7,8]])]
+		log_data = log_extractor.extract(logs)
+		assert log_data["steps"].tolist()==[3,1]
+		assert log_data["Prey_count"].shape==(2,3)
+		assert log_data["Prey_count"][0].tolist()==[3,2,1]
+		assert log_data["Prey_mean_life"][0].tolist()==[2.0,4.5,6.0]
+		assert log_data["Prey_max_life"][1,0]==8
+		assert np.isnan(log_data["Prey_count"][1,1:]).all()
+		assert np.allclose(log_data["Prey_standard_dev_life"][0], [np.std([1,2,3]),0.5,0.0])
+		assert (log_data["MIN_SPEED"][0]==-1.0).all()
+		assert log_data["fitnesses"].shape==(2,3,3)
+		assert log_data["fitnesses"][0,:,0].tolist()==[0.0,1.0,2.0]
+		assert log_data["step"][1].tolist()==[0,-1,-1]
+		# A single run log is extracted as one run
+		assert log_extractor.extract(logs[1])["Prey_count"].shape==(1,1)
+		with pytest.raises(AttributeError):
+			prey_log.logMedianInt("life")
+
+	def test_log_extractor_data_frame(self):
+		pytest.importorskip("pandas")
+		log_extractor = exp.LogExtractor()
+		log_extractor.agent("Prey").logCount()
+		log_extractor.logEnvironment("fitnesses")
+		log_data = log_extractor.extract([StubStepRunLog([[1,2,3],[4,5],[6]]), StubStepRunLog([[7,8]])])
+		data_frame = log_extractor.dataFrame(log_data)
+		assert len(data_frame)==4
+		assert data_frame["run"].tolist()==[0,0,0,1]
+		assert data_frame["Prey_count"].tolist()==[3,2,1,2]
+		assert not "fitnesses" in data_frame.columns
+
+
+class ResultStoreTest(TestCase):
+
+	def test_result_store(self):
+		path = tempfile.mkdtemp()+"/store/"
+		store = exp.ResultStore(path, ["a", "b"], 3, chunk_size=4)
+		for i in range(10):
+			store.append(i//5, i, [i, 0.5*i], float(i), [i, 1.0, 2.0], 0.1*i, (i-1, -1))
+		# Only complete chunks are written until the store is flushed
+		assert len(store)==8
+		store.flush()
+		# A chunk interrupted part way through being written is ignored
+		with open(path+"genes.bin", "ab") as column_file:
+			column_file.write(np.zeros(3).tobytes())
+		data = exp.ResultStore(path).read()
+		assert isinstance(data["genes"], np.memmap)
+		assert data["genes"].shape==(10, 2)
+		assert data["fitness_components"].shape==(10, 3)
+		assert list(data["generation"])==[0]*5+[1]*5
+		assert list(data["chromosome_id"])==list(range(10))
+		assert data["genes"][9, 1]==4.5
+		assert list(data["parent_ids"][3])==[2, -1]
+		loaded = exp.readResultStores([path], mmap=False)[path]
+		assert not isinstance(loaded["wallclock"], np.memmap)
+		np.testing.assert_allclose(loaded["wallclock"], 0.1*np.arange(10))
+		csv_path = path+"export.csv"
+		exp.ResultStore(path).exportCSV(csv_path)
+		lines = open(csv_path).read().splitlines()
+		assert lines[0]=="SimulationGA,generation,0"
+		assert lines[1]=="\tChromosome_ID,0,Parameters,0.0,0.0,Fitness,0.0"
+		assert len(lines)==12
+
+	def test_search_result_store(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setFitnessMemoization(True)
+		ga.setResultStore()
+		ga.GA()
+		data = exp.ResultStore(ga.results_path).read()
+		# The population of every generation is recorded
+		assert list(data["generation"])==[g for g in range(SEARCH_GENERATIONS+1) for i in range(SEARCH_MU)]
+		assert data["genes"].shape==(SEARCH_MU*(SEARCH_GENERATIONS+1), len(PARAMETER_LIMITS))
+		# The stub ensemble logs the prey population as the first fitness component
+		np.testing.assert_array_equal(data["fitness_components"][:, 0], data["genes"][:, 0])
+		np.testing.assert_allclose(data["fitness"], 0.001*data["genes"][:, 0])
+		assert np.all(data["parent_ids"]<data["chromosome_id"][:, np.newaxis])
+		assert np.all(data["wallclock"]>=0.0)
+		del ga
+
+
+class CheckpointTest(TestCase):
+
+	def run_search(self, cwd, generations, checkpoint=None, resume=None):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = cwd
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = generations
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setFitnessMemoization(True)
+		ga.setResultStore()
+		if not checkpoint==None:
+			ga.setCheckpoint(checkpoint)
+		ga.GA(resume=resume)
+		return ga
+
+	def test_search_resume(self):
+		generations = 2*SEARCH_GENERATIONS
+		random.seed(5)
+		np.random.seed(5)
+		uninterrupted = self.run_search(tempfile.mkdtemp()+"/", generations)
+		random.seed(5)
+		np.random.seed(5)
+		cwd = tempfile.mkdtemp()+"/"
+		checkpoint = cwd+"ga.checkpoint"
+		interrupted = self.run_search(cwd, SEARCH_GENERATIONS, checkpoint)
+		assert os.path.exists(checkpoint) and not os.path.exists(checkpoint+".tmp")
+		# Records written after the last checkpoint, e.g. by a generation interrupted by a crash, are discarded on resume
+		interrupted_csv = [f for f in os.listdir(cwd+"ga_temp/") if f.endswith(".csv") and not f.startswith("optimal")][0]
+		with open(cwd+"ga_temp/"+interrupted_csv, "a") as population_record:
+			population_record.write("SimulationGA,generation,"+str(SEARCH_GENERATIONS+1)+"\n")
+		# Scramble the random number generators, which are restored from the checkpoint
+		random.seed(99)
+		np.random.seed(99)
+		resumed = self.run_search(cwd, generations, resume=checkpoint)
+		assert resumed.logbook.select("generation")==list(range(generations+1))
+		for column in ["max", "mean", "evaluations", "cache_hits", "cache_misses"]:
+			assert resumed.logbook.select(column)==uninterrupted.logbook.select(column)
+		assert resumed.ga_individual_id==uninterrupted.ga_individual_id
+		expected = exp.ResultStore(uninterrupted.results_path).read()
+		results = exp.ResultStore(resumed.results_path).read()
+		for column in ["generation", "chromosome_id", "genes", "fitness", "fitness_components", "parent_ids"]:
+			np.testing.assert_array_equal(results[column], expected[column])
+		uninterrupted_csv = uninterrupted.results_path[:-len(".results/")]+".csv"
+		assert open(cwd+"ga_temp/"+interrupted_csv).read()==open(uninterrupted_csv).read()
+		# Resuming a GA which had already finished runs no further generations
+		finished = self.run_search(cwd, generations, resume=checkpoint)
+		assert finished.logbook.select("generation")==list(range(generations+1))
+		assert len(open(cwd+"search_times.csv").readlines())==3
+		del uninterrupted, interrupted, resumed, finished
+
+
+class MultiFidelityTest(TestCase):
+
+	def test_search_multi_fidelity(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setSimulationSteps(EXPERIMENT_STEPS)
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = 8
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setMultiFidelity([5, 10], promotion_ratio=0.5)
+		ex1.setStepsProperty("STEPS")
+		ga.GA()
+		assert [launch.steps for launch in ensemble.launches]==[EXPERIMENT_STEPS]+[5, 10, EXPERIMENT_STEPS]*SEARCH_GENERATIONS
+		# Every run of a rung is told the steps it simulates
+		for launch in ensemble.launches:
+			assert all(plan.properties["STEPS"]==('UInt', launch.steps) for plan in launch)
+		assert [len(launch) for launch in ensemble.launches]==[SEARCH_MU]+[8, 4, 2]*SEARCH_GENERATIONS
+		assert ga.logbook.select("evaluations_5")==[0]+[8]*SEARCH_GENERATIONS
+		assert ga.logbook.select("evaluations_10")==[0]+[4]*SEARCH_GENERATIONS
+		assert ga.logbook.select("evaluations_full")==[SEARCH_MU]+[2]*SEARCH_GENERATIONS
+		# The offspring with the best partial fitness are promoted to the full length evaluation
+		for g in range(SEARCH_GENERATIONS):
+			partial = sorted(plan.properties["PREY_POPULATION_TO_GENERATE"][1] for plan in ensemble.launches[1+3*g])
+			full = sorted(plan.properties["PREY_POPULATION_TO_GENERATE"][1] for plan in ensemble.launches[3+3*g])
+			assert full==partial[-2:]
+		assert ex1.steps==EXPERIMENT_STEPS
+		# No result store is written unless enabled
+		assert ga.results_path==None and not any(f.endswith(".results") for f in os.listdir(ga.cwd+"ga_temp/"))
+		del ga
+
+	def test_pool_evaluator_steps(self):
+		pool = exp.PoolEvaluator(build_pool_experiment, slots=[None], simulate=simulate_pool_steps)
+		pool.start(list(PARAMETER_LIMITS.keys()))
+		assert pool.evaluate([(1, 0.1)]*2, 7)==[(7.0,)]*2
+		assert pool.evaluate([(1, 0.1)])==[(float(exp.Experiment.steps),)]
+		pool.close()
+
+
+class NoisyStubEnsemble(StubEnsemble):
+	r"""Stub ensemble whose logged prey fitness component includes Gaussian noise, as replicate simulations of a stochastic model"""
+
+	def __init__(self, noise):
+		StubEnsemble.__init__(self)
+		self.noise = noise
+		self.rng = np.random.default_rng(1)
+
+	def fitnesses(self, properties):
+		prey = properties["PREY_POPULATION_TO_GENERATE"][1]
+		return [float(prey)+self.rng.normal(0.0, self.noise), 0.0, 0.0]
+
+
+class StubFitness(object):
+
+	def __init__(self, fitness):
+		self.values = (fitness,)
+
+
+class ReplicateRacingTest(TestCase):
+
+	def test_racing(self):
+		ensemble = NoisyStubEnsemble(50.0)
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.mu = 2
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setReplicateRacing(initial=2, maximum=8)
+		ga.chromosome_evaluations = {}
+		ga.chromosome_replicates = {}
+		population = [types.SimpleNamespace(fitness=StubFitness(f)) for f in [3.0, 1.0]]
+		# The selection threshold is the 2nd best fitness, 3.0, which only the chromosome with 3000 prey is close to
+		candidates = [{"PREY_POPULATION_TO_GENERATE":prey, "PREY_REPRODUCTION_CHANCE":0.1, "chromosome_id":i} for i, prey in enumerate([3000, 0, 6000])]
+		fitness = ga._Search__evaluate_population_racing(candidates, population)
+		assert [ga.chromosome_replicates[i][0] for i in range(3)]==[8, 2, 2]
+		assert ga.racing_replicates==12
+		assert [len(launch) for launch in ensemble.launches]==[3, 3]+[1]*6
+		np.testing.assert_allclose(fitness, [3.0, 0.0, 6.0], atol=0.15)
+		assert 0.0<ga.chromosome_replicates[0][1]<0.05
+		# The recorded fitness components are the mean of the replicates
+		assert abs(ga.chromosome_evaluations[0][0][0]-1000*fitness[0])<1e-6
+		del ga
+
+	def test_search_racing(self):
+		ensemble = NoisyStubEnsemble(400.0)
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setReplicateRacing(initial=2, maximum=6)
+		ga.setResultStore()
+		ga.GA()
+		replicates = ga.logbook.select("replicates")
+		assert 2*SEARCH_MU<=replicates[0]<=6*SEARCH_MU
+		assert all(2*SEARCH_LAMBDA<=r<=6*SEARCH_LAMBDA for r in replicates[1:])
+		data = exp.ResultStore(ga.results_path).read()
+		assert np.all((data["replicates"]>=2) & (data["replicates"]<=6))
+		assert np.all(data["fitness_standard_error"]>0.0)
+		del ga
+
+	def test_racing_options(self):
+		ga = exp.Search()
+		ga.setReplicateRacing()
+		assert ga.racing and ga.racing_maximum>ga.racing_initial
+		ga.setReplicateRacing(False)
+		assert not ga.racing
+		with self.assertRaises(ValueError):
+			ga.setReplicateRacing(initial=4, maximum=4)
+		del ga
+
+
+class StubSurrogate(object):
+	r"""Surrogate predicting the fitness of a chromosome from its prey population, recording the training data and screened genes"""
+
+	def __init__(self):
+		self.updates = []
+		self.screened = []
+
+	def update(self, X, Y):
+		self.updates.append(len(Y))
+
+	def predict(self, X):
+		self.screened.append(X)
+		return 0.001*X[:, 0]
+
+
+class SurrogateScreeningTest(TestCase):
+
+	def test_search_surrogate_screening(self):
+		ensemble = StubEnsemble()
+		ex1 = exp.Experiment()
+		ex1.setEnsemble(ensemble, StubRunPlanVec)
+		surrogate = StubSurrogate()
+		ga = exp.Search()
+		ga.cwd = tempfile.mkdtemp()+"/"
+		ga.parameter_limits = PARAMETER_LIMITS
+		ga.mu = SEARCH_MU
+		ga.lamda = SEARCH_LAMBDA
+		ga.max_generations = SEARCH_GENERATIONS
+		ga.setPopEvaluationExperiment(ex1)
+		ga.setBatchEvaluation(True)
+		ga.setSurrogateScreening(3, surrogate)
+		ga.GA()
+		# Only the screened offspring are simulated, and the surrogate is retrained on every simulation
+		assert [len(launch) for launch in ensemble.launches]==[SEARCH_MU]+[SEARCH_LAMBDA]*SEARCH_GENERATIONS
+		assert surrogate.updates==[SEARCH_MU+i*SEARCH_LAMBDA for i in range(SEARCH_GENERATIONS+1)]
+		assert ga.logbook.select("screened")==[0]+[3*SEARCH_LAMBDA]*SEARCH_GENERATIONS
+		assert ga.ga_individual_id==SEARCH_MU+3*SEARCH_LAMBDA*SEARCH_GENERATIONS
+		for g in range(SEARCH_GENERATIONS):
+			simulated = sorted(plan.properties["PREY_POPULATION_TO_GENERATE"][1] for plan in ensemble.launches[1+g])
+			assert simulated==sorted(surrogate.screened[g][:, 0])[-SEARCH_LAMBDA:]
+		del ga
+
+	def test_surrogate_model(self):
+		pytest.importorskip("sklearn")
+		rng = np.random.default_rng(2)
+		X = rng.uniform(0.0, 1.0, (400, 3))
+		Y = 2.0*X[:, 0]-X[:, 1]+0.5
+		surrogate = exp.SurrogateModel(random_state=0)
+		surrogate.update(X[:200], Y[:200])
+		# Later updates continue training from the previous weights on every sample
+		surrogate.update(X, Y)
+		assert surrogate.samples==400
+		predicted = surrogate.predict(X)
+		assert predicted.shape==(400,)
+		assert np.corrcoef(predicted, Y)[0, 1]>0.95
@@ -0,0 +1,141 @@
+import numpy as np
+from unittest import TestCase
+from pyflamegpu import *
+import experiment_generator as exp
+import ppg_fitness
+
+FITNESS_RUNS = 200
+FITNESS_STEPS = 60
+
+
+def callback_fitness(prey_counts, predator_counts, total_steps, extinction_exit):
+	r"""Fitness components as computed by the step and exit fitness host callbacks of ppg_ga_experiment, from the populations after each step"""
+	iteration = 0
+	population_difference = 0
+	oscillations = 0
+	current_largest_pop = 0
+	death_check = 0
+	death_iteration = 0
+	extinction_difference = 0
+	for prey, predators in zip(prey_counts, predator_counts):
+		iteration += 1
+		population_difference += abs(predators-prey)
+		if current_largest_pop==1 and prey>predators:
+			oscillations += 1
+			current_largest_pop = 0
+		elif current_largest_pop==0 and predators>prey:
+			oscillations += 1
+			current_largest_pop = 1
+		if death_check==0 and (prey==0 or predators==0):
+			death_iteration = iteration
+			death_check = 1
+			extinction_difference = abs(predators-prey)
+		if extinction_exit and death_check==1:
+			break
+	remaining_steps = total_steps-iteration
+	if death_check==1 and remaining_steps>0:
+		population_difference += remaining_steps*extinction_difference
+		iteration = total_steps
+	return (float(death_iteration), float(oscillations), float(population_difference)/iteration)
+
+
+def random_populations(rng, steps):
+	r"""Prey and predator populations of a run, small enough that ties and extinctions are common. Populations of some runs never go extinct"""
+	survivors = rng.integers(0, 2)
+	prey = np.maximum(rng.integers(-2, 8, steps).cumsum()%12-rng.integers(0, 3), 0)+survivors
+	predators = np.maximum(rng.integers(-2, 8, steps).cumsum()%12-rng.integers(0, 3), 0)+survivors
+	return prey, predators
+
+
+class StubAgentLogFrame(object):
+
+	def __init__(self, count):
+		self.count = count
+
+	def getCount(self):
+		return self.count
+
+
+class StubLogFrame(object):
+
+	def __init__(self, step, prey, predators, total_steps=FITNESS_STEPS):
+		self.step = step
+		self.counts = {"Prey":prey, "Predator":predators}
+		self.total_steps = total_steps
+
+	def getStepCount(self):
+		return self.step
+
+	def getEnvironmentPropertyUInt(self, name):
+		return self.total_steps
+
+	def getAgent(self, agent_name):
+		return StubAgentLogFrame(self.counts[agent_name])
+
+
+class StubRunLog(object):
+	r"""Step log of a run, including the initial state logged as step 0"""
+
+	def __init__(self, prey_counts, predator_counts, total_steps=FITNESS_STEPS):
+		self.frames = [StubLogFrame(0, 64, 10, total_steps)]+[StubLogFrame(i+1, int(prey_counts[i]), int(predator_counts[i]), total_steps) for i in range(len(prey_counts))]
+
+	def getStepLog(self):
+		return self.frames
+
+
+class FitnessTest(TestCase):
+
+	def test_matches_step_callback(self):
+		rng = np.random.default_rng(7)
+		runs = [random_populations(rng, FITNESS_STEPS) for _ in range(FITNESS_RUNS)]
+		prey = np.array([run[0] for run in runs])
+		predators = np.array([run[1] for run in runs])
+		expected = np.array([callback_fitness(run[0], run[1], FITNESS_STEPS, False) for run in runs])
+		np.testing.assert_allclose(ppg_fitness.fitness_components(prey, predators), expected)
+		np.testing.assert_allclose(ppg_fitness.fitness_components(prey, predators, total_steps=FITNESS_STEPS), expected)
+
+	def test_matches_extinction_exit(self):
+		rng = np.random.default_rng(11)
+		runs = [random_populations(rng, FITNESS_STEPS) for _ in range(FITNESS_RUNS)]
+		logs = []
+		for prey, predators in runs:
+			#An extinction exit condition ends the run at the first step with an extinct population
+			extinct = np.flatnonzero((prey==0) | (predators==0))
+			logged_steps = extinct[0]+1 if len(extinct)>0 else FITNESS_STEPS
+			logs.append(StubRunLog(prey[:logged_steps], predators[:logged_steps]))
+		expected = np.array([callback_fitness(run[0], run[1], FITNESS_STEPS, True) for run in runs])
+		assert any(len(log.frames)<=FITNESS_STEPS for log in logs) and any(expected[:,0]==0)
+		fitness = ppg_fitness.CountLogFitness(FITNESS_STEPS)
+		np.testing.assert_allclose(fitness(logs), expected)
+		np.testing.assert_allclose(fitness(logs[0]), expected[:1])
+
+	def test_experiment_fitness_components(self):
+		rng = np.random.default_rng(3)
+		runs = [random_populations(rng, FITNESS_STEPS) for _ in range(4)]
+		experiment = exp.Experiment("fitness_test")
+		experiment.setFitnessFunction(ppg_fitness.CountLogFitness(FITNESS_STEPS))
+		experiment.sim_log = [StubRunLog(prey, predators) for prey, predators in runs]
+		components = experiment.fitnessComponents()
+		assert len(components)==4
+		for i in range(4):
+			assert components[i]==callback_fitness(runs[i][0], runs[i][1], FITNESS_STEPS, False)
+
+	def test_rung_steps(self):
+		rng = np.random.default_rng(5)
+		runs = [random_populations(rng, FITNESS_STEPS) for _ in range(FITNESS_RUNS)]
+		rung_steps = FITNESS_STEPS//4
+		logs = []
+		expected = []
+		for i, (prey, predators) in enumerate(runs):
+			#Runs of a shortened rung and of the full length are scored together, each completed to the steps it was simulated for
+			total_steps = rung_steps if i%2==0 else FITNESS_STEPS
+			extinct = np.flatnonzero((prey[:total_steps]==0) | (predators[:total_steps]==0))
+			logged_steps = extinct[0]+1 if len(extinct)>0 else total_steps
+			logs.append(StubRunLog(prey[:logged_steps], predators[:logged_steps], total_steps))
+			expected.append(callback_fitness(prey[:total_steps], predators[:total_steps], total_steps, True))
+		expected = np.array(expected)
+		assert any(expected[0::2, 0]>0)
+		fitness = ppg_fitness.CountLogFitness(FITNESS_STEPS, steps_property="STEPS")
+		np.testing.assert_allclose(fitness(logs), expected)
+		# Completing a rung to the full steps instead weights its extinct runs by steps never simulated
+		assert not np.allclose(ppg_fitness.CountLogFitness(FITNESS_STEPS)(logs)[0::2], expected[0::2])
@@ -7,6 +7,11 @@ import threading
 import queue
 import datetime
 import numpy as np
+import re
+import json
+import hashlib
+import tempfile
+import time
 from deap import base
 from deap import creator
 from deap import tools
@@ -685,4 +690,127 @@ class Search(object):
 			open(self.cwd+"search_times.csv","w").close()
 		time = open(self.cwd+"search_times.csv","a")
 		time.write("ga_seed,"+str(unique_run_seed)+",started_at,"+str(start_time)+",ended_at,"+str(end_time)+",total_time,"+str(time_taken)+"\n")
-		time.close()
\ No newline at end of file
+		time.close()
+
+def findRTCSources(namespace):
+	r"""Finds the RTC agent function sources defined as strings within a namespace, e.g. vars() of an imported model script
+	:type namespace: dict
+	:param namespace: Names and values to search for RTC agent function sources
+	:rtype: dict
+	:return: RTC source of each agent function, keyed by the function name declared in its FLAMEGPU_AGENT_FUNCTION"""
+	rtc_sources = {};
+	for value in namespace.values():
+		if type(value)==type(''):
+			declaration = re.search(r"^FLAMEGPU_AGENT_FUNCTION\(\s*(\w+)\s*,", value, re.MULTILINE);
+			if not declaration==None:
+				rtc_sources[declaration.group(1)] = value;
+	return rtc_sources
+
+def compile_model(model):
+	r"""Default compile step of an RTCCacheWarmup. Initialising a simulation of the model on its device compiles every RTC agent function into the on-disk JIT cache, or loads it from the cache if already present.
+	Creating the simulation alone compiles nothing, RTC functions are only compiled once the simulation is configured, stepped or given a population
+	:type model: py:class:`pyflamegpu.ModelDescription`
+	:param model: FLAME-GPU2 model
+	:rtype: float
+	:return: Elapsed time initialising the simulation, including device initialisation, which RTC compilation dominates on a cache miss"""
+	simulation = pyflamegpu.CUDASimulation(model);
+	start = time.perf_counter();
+	simulation.applyConfig();
+	return time.perf_counter()-start
+
+class RTCCacheWarmup(object):
+	r"""This class pre-compiles the RTC agent functions of a FLAME-GPU2 model into the on-disk JIT cache ahead of a search, so that fresh GA processes load rather than compile them. A manifest of the source hashes warmed is kept alongside the cache to report per-function cache hits and misses.
+	The JIT cache is not exposed to Python, so cache hits and misses are inferred from the manifest and whether the compile step wrote to the cache, and compile times are only measured per function if the compile step reports them"""
+
+	#Register default internal values
+	cache_directory = None;
+	manifest_file = "rtc_warmup_manifest.json";
+	compile = None;
+	verbose = False;
+
+	def __init__(self, cache_directory=None, compile=compile_model):
+		r"""
+		:type cache_directory: string
+		:param cache_directory: Location of the JIT cache. Defaults to the FLAMEGPU2_TMP_DIR (or system temporary) fgpu2/jitifycache directory used by FLAME-GPU2
+		:type compile: function
+		:param compile: Function called as compile(model) which compiles every RTC function of the model. Returns the total compile time in seconds, or a dictionary of compile time per function name
+		"""
+		if cache_directory==None:
+			tmp = os.environ["FLAMEGPU2_TMP_DIR"] if "FLAMEGPU2_TMP_DIR" in os.environ else tempfile.gettempdir();
+			cache_directory = os.path.join(tmp, "fgpu2", "jitifycache");
+		self.cache_directory = cache_directory;
+		self.compile = compile;
+
+	def sourceHash(self, source):
+		r"""Hash identifying an RTC agent function source
+		:type source: string
+		:param source: RTC agent function source"""
+		return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+	def __cacheFiles(self):
+		if not os.path.exists(self.cache_directory):
+			return set()
+		return set(f for f in os.listdir(self.cache_directory) if not f==self.manifest_file)
+
+	def __loadManifest(self):
+		manifest = os.path.join(self.cache_directory, self.manifest_file);
+		if not os.path.exists(manifest):
+			return {}
+		with open(manifest, "r") as f:
+			return json.load(f)
+
+	def __saveManifest(self, warmed):
+		if not os.path.exists(self.cache_directory):
+			os.makedirs(self.cache_directory);
+		manifest = os.path.join(self.cache_directory, self.manifest_file);
+		with open(manifest+".tmp", "w") as f:
+			json.dump(warmed, f, indent=1, sort_keys=True);
+		os.replace(manifest+".tmp", manifest);
+
+	def warmup(self, model, rtc_sources, model_name=None):
+		r"""Compile every RTC agent function of a model into the JIT cache
+		:type model: py:class:`pyflamegpu.ModelDescription`
+		:param model: FLAME-GPU2 model
+		:type rtc_sources: dict
+		:param rtc_sources: RTC source of each agent function of the model keyed by function name, see findRTCSources
+		:type model_name: string
+		:param model_name: Name of the model within the report and manifest
+		:rtype: list
+		:return: One report entry per function with its model, function name, source hash, cache status ('hit' or 'miss'), compile time in seconds and whether the compile time is estimated.
+			If the compile step only reports a total, the compile times are estimates dividing it evenly between the functions which missed the cache"""
+		model_name = "model" if model_name==None else model_name;
+		warmed = self.__loadManifest();
+		previous = warmed[model_name] if model_name in warmed else {};
+		hashes = dict((name, self.sourceHash(source)) for name, source in rtc_sources.items());
+		cache_files = self.__cacheFiles();
+		if (self.verbose):
+			print("Warming RTC cache for", model_name, "with", len(hashes), "functions in", self.cache_directory);
+		start = time.perf_counter();
+		compile_times = self.compile(model);
+		total_time = time.perf_counter()-start if compile_times==None else compile_times;
+		estimated = not type(total_time)==type({});
+		#Nothing was written to the cache, so every function was loaded from it
+		compiled = len(self.__cacheFiles()-cache_files)>0;
+		status = dict((name, 'miss' if compiled and not (name in previous and previous[name]==hashes[name]) else 'hit') for name in hashes);
+		misses = [name for name in status if status[name]=='miss'];
+		report = [];
+		for name in sorted(hashes):
+			if not estimated:
+				compile_time = total_time[name] if name in total_time else 0.0;
+			else:
+				compile_time = total_time/len(misses) if status[name]=='miss' else 0.0;
+			report.append({"model":model_name, "function":name, "source_hash":hashes[name], "cache":status[name], "compile_time":compile_time, "estimated":estimated});
+		warmed[model_name] = hashes;
+		self.__saveManifest(warmed);
+		return report
+
+	def formatReport(self, report):
+		r"""Formats a warmup report as comma separated lines, one per function. Compile times which are estimated rather than measured per function are labelled 'estimated'
+		:type report: list
+		:param report: Report returned by warmup"""
+		lines = ["model,function,source_hash,cache,compile_time,timing"];
+		for entry in report:
+			lines.append(",".join([entry["model"], entry["function"], entry["source_hash"], entry["cache"], "%.6f"%(entry["compile_time"]), "estimated" if entry["estimated"] else "measured"]));
+		hits = len([entry for entry in report if entry["cache"]=='hit']);
+		lines.append("functions,"+str(len(report))+",cache_hits,"+str(hits)+",cache_misses,"+str(len(report)-hits)+",compile_time,"+"%.6f"%(sum(entry["compile_time"] for entry in report)));
+		return "\n".join(lines)
@@ -1127,6 +1127,24 @@ model.newLayer("L7").addAgentFunction("Unavailable_Grass", "grass_growth");
 model.Layer("L7").addAgentFunction("Prey", "prey_reproduce");
 model.Layer("L7").addAgentFunction("Predator", "predator_reproduce");
 
+"""
+  RTC Cache Warmup
+  With --rtc-warmup [report.csv], pre-compile every RTC agent function into the FLAME GPU 2 JIT cache,
+  report the cache status of each function and exit without simulating
+"""
+if "--rtc-warmup" in sys.argv:
+  import experiment_generator as exp
+  warmup = exp.RTCCacheWarmup();
+  warmup.verbose = True;
+  report = warmup.warmup(model, exp.findRTCSources(globals()), "Prey_Predator_Grass");
+  print(warmup.formatReport(report));
+  report_index = sys.argv.index("--rtc-warmup")+1;
+  if report_index<len(sys.argv) and not sys.argv[report_index].startswith("-"):
+    report_file = open(sys.argv[report_index],"w");
+    report_file.write(warmup.formatReport(report)+"\n");
+    report_file.close();
+  sys.exit(0);
+
 # Create and configure logging details 
 logging_config = pyflamegpu.LoggingConfig(model);
 logging_config.logEnvironment("PREDATOR_KILL_DISTANCE");
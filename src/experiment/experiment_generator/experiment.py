@@ -21,16 +21,106 @@ import itertools
 import sys
 import threading
 import queue
+import collections
+import time
 import datetime
 import numpy as np
-import pycuda.driver as cuda
-import pycuda.autoinit
 
 BASE_DIRECTORY = os.getcwd()+"/"
 PROJECT_DIRECTORY = BASE_DIRECTORY
-GPUS_AVAILABLE = cuda.Device(0).count()
 OS_NAME = os.name
 
+#ResourcePool
+#Number of CUDA devices, detected on first use so experiments can be run and imported on machines without a GPU or pycuda. None if the devices could not be detected
+detected_gpus = None
+gpus_detected = False
+#Number of simulations run concurrently on each device
+RUNS_PER_DEVICE = 1
+#Number of simulations run concurrently when CUDA reports no devices, defaults to the number of processors
+CPU_SLOTS = None
+
+def gpus_available():
+	global detected_gpus, gpus_detected
+	if not gpus_detected:
+		try:
+			import pycuda.driver as cuda
+			cuda.init()
+			detected_gpus = cuda.Device.count()
+		except Exception:
+			detected_gpus = None
+		gpus_detected = True
+	return detected_gpus
+
+#Slots simulations are run on, as (device, run) pairs for each concurrent run of each CUDA device, or (None, run) for each processor when CUDA reports no devices.
+#If the devices could not be detected, e.g. pycuda is not installed, simulations are run one at a time on the default device
+def simulation_slots():
+	devices = gpus_available()
+	if devices==None:
+		return [(0,0)]
+	if devices>0:
+		return [(d,r) for r in range(RUNS_PER_DEVICE) for d in range(devices)]
+	return [(None,r) for r in range(CPU_SLOTS or os.cpu_count() or 1)]
+
+#Name of a slot, as named in the slot statistics of resource_pool. Single run devices are named by their device number
+def slot_name(slot):
+	if slot[0]==None:
+		return "cpu"+str(slot[1])
+	if slot[1]==0:
+		return str(slot[0])
+	return str(slot[0])+"_"+str(slot[1])
+
+#Call function(slot, item) for every item across the simulation slots. Items are dealt to the slots in turn, and slots which run out of items steal the
+#last queued item of the slot with the most queued items. Returns the results in the order of the items, and the statistics of each slot as rows of
+#slot name, device, items completed, items failed, items stolen, seconds busy and throughput (items completed per second busy)
+def run_on_slots(items, function):
+	slots = simulation_slots()
+	queues = [collections.deque() for s in slots]
+	for i in range(len(items)):
+		queues[i%len(slots)].append(i)
+	lock = threading.Lock()
+	results = [None]*len(items)
+	errors = []
+	completed = [0]*len(slots)
+	failed = [0]*len(slots)
+	stolen = [0]*len(slots)
+	busy_seconds = [0.0]*len(slots)
+	def work(s):
+		while True:
+			with lock:
+				if queues[s]:
+					i = queues[s].popleft()
+				else:
+					busiest = max(range(len(queues)), key=lambda q: len(queues[q]))
+					if not queues[busiest]:
+						return
+					i = queues[busiest].pop()
+					stolen[s] += 1
+			start = time.perf_counter()
+			try:
+				results[i] = function(slots[s], items[i])
+				completed[s] += 1
+			except Exception as e:
+				errors.append(e)
+				failed[s] += 1
+			busy_seconds[s] += time.perf_counter()-start
+	threads = [threading.Thread(target=work, args=(s,)) for s in range(len(slots))]
+	for t in threads:
+		t.start()
+	for t in threads:
+		t.join()
+	if len(errors)>0:
+		raise errors[0]
+	return results, [[slot_name(slots[s]),slots[s][0],completed[s],failed[s],stolen[s],busy_seconds[s],completed[s]/busy_seconds[s] if busy_seconds[s]>0 else 0.0] for s in range(len(slots))]
+
+#Columns of the slot statistics, the same as those written by resource_pool
+SLOT_STATISTICS_HEADER = "slot,device,completed,failed,stolen,busy_seconds,throughput\n"
+
+#Write the statistics of each slot returned by run_on_slots to a file
+def write_slot_statistics(f, slot_statistics):
+	f.write(SLOT_STATISTICS_HEADER)
+	for row in slot_statistics:
+		f.write(",".join(str(a) for a in row)+"\n")
+
 PROJECT_DIRECTORY = BASE_DIRECTORY+"/"
 #InitialStates
 
@@ -178,15 +268,16 @@ def setup():
 		#ef = open(PROJECT_DIRECTORY+"experiment/experiment_information.csv","a")
 		#ef.write("repeat,"+str(i)+"\ninitial_states_generated,"+str(generation_time)+"\n")
 		#ef.close()
-		#Model executable
-		executable = ""
-		simulation_command = ""
 		os_walk = list(os.walk(base_output_directory+location_name))
 		if len(os_walk[0][1])>1:
 			initial_states = [x[0] for x in os_walk][1:]
 		else:
 			initial_states = [x[0] for x in os_walk]
-		for j in initial_states:
+		#Simulate each initial state on the next free simulation slot, returning its results
+		def simulate(slot, j):
+			#Model executable
+			executable = ""
+			simulation_command = ""
 			current_initial_state = j+"/0.xml"
 			if OS_NAME=='nt':
 				executable = PROJECT_DIRECTORY+"//PreyPredator.exe"
@@ -194,6 +285,8 @@ def setup():
 			else:
 				executable = "./"+PROJECT_DIRECTORY+"//PreyPredator"
 				simulation_command = executable+" "+current_initial_state+" 1000"
+			if not slot[0]==None:
+				simulation_command = simulation_command+" "+str(slot[0])
 			print(simulation_command)
 			#Run simulation
 			os.system(simulation_command)
@@ -202,12 +295,19 @@ def setup():
 			results_file = open(j+"/log.csv","r")
 			results = results_file.readlines()
 			results_file.close()
+			return results
+		simulation_results, slot_statistics = run_on_slots(initial_states, simulate)
+		for results in simulation_results:
 			sim_results_file = open(PROJECT_DIRECTORY+"experiment/simulation_results.csv","a")
 			for res in results:
 				sim_results_file.write(res)
 			sim_results_file.write("\n")
 			sim_results_file.close()
 			print(results)
+		ef = open(PROJECT_DIRECTORY+"experiment/experiment_information.csv","a")
+		ef.write("repeat,"+str(i)+"\n")
+		write_slot_statistics(ef, slot_statistics)
+		ef.close()
 	experiment_completion_time = datetime.datetime.now()
 	time_taken = experiment_completion_time-experiment_start_time
 	ef = open(PROJECT_DIRECTORY+"experiment/experiment_information.csv","a")